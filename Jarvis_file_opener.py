@@ -6,8 +6,11 @@ import asyncio
 import os
 import subprocess
 import sys
+import threading
 import time
+from typing import Optional
 from fuzzywuzzy import process
+from jarvis_fs_watcher import FsEvent, IndexWatcher, fs_watcher, normalize_path
 from jarvis_logger import setup_logger
 try:
     import pygetwindow as gw
@@ -67,48 +70,125 @@ async def focus_window(title_keyword: str) -> bool:
 
 
 # --- Global Index Cache ---
-global_file_index: list[dict] = []
-LAST_INDEX_TIME: float = 0.0
+# Seconds before an unwatched search directory is walked again
 INDEX_CACHE_TIMEOUT = 300  # 5 minutes
+# Folders to index for better performance (can add more)
+FILE_SEARCH_DIRS = ["D:/"]
 
 
-async def index_files(search_dirs):
+def _walk_dir(base_dir: str) -> dict[str, dict]:
+    """Every file below `base_dir`, keyed by path."""
+    found = {}
+    for root, _, files in os.walk(base_dir):
+        for f in files:
+            path = os.path.join(root, f)
+            found[path] = {"name": f, "path": path, "type": "file"}
+    return found
+
+
+class FileIndex:
     """
-    Recursively scans specified directories and indexes all files found.
-    Uses a global cache to avoid repetitive slow indexing.
+    In-memory index of every file in the search directories. Filesystem
+    watcher events keep it current; full walks only reconcile it.
     """
-    global global_file_index, LAST_INDEX_TIME  # pylint: disable=global-statement
 
-    current_time = time.time()
-    if global_file_index and (current_time - LAST_INDEX_TIME < INDEX_CACHE_TIMEOUT):
-        logger.info("⚡ Using cached file index (%d files).",
-                    len(global_file_index))
-        return global_file_index
+    def __init__(self, watcher: Optional[IndexWatcher] = None):
+        self.watcher = watcher or fs_watcher
+        self._lock = threading.Lock()
+        self._items: dict[str, dict] = {}
+        self._scanned_at: dict[str, float] = {}
+        self._snapshot: Optional[list[dict]] = None
+        # Events seen while a walk is running; replayed onto its result
+        self._replay: Optional[list[FsEvent]] = None
+        self._walk_lock: Optional[asyncio.Lock] = None
+
+    def items(self) -> list[dict]:
+        """Snapshot of the indexed files."""
+        with self._lock:
+            if self._snapshot is None:
+                self._snapshot = list(self._items.values())
+            return self._snapshot
+
+    def _drop(self, path: str, is_directory: bool) -> None:
+        if self._items.pop(path, None) is not None and not is_directory:
+            return
+        prefix = path.rstrip(os.sep) + os.sep
+        for key in [k for k in self._items if k.startswith(prefix)]:
+            del self._items[key]
+
+    def _add(self, path: str, is_directory: bool) -> None:
+        if is_directory:
+            self._items.update(_walk_dir(path))
+        elif os.path.isfile(path):
+            self._items[path] = {"name": os.path.basename(path), "path": path, "type": "file"}
+
+    def _apply(self, events: list[FsEvent]) -> None:
+        for kind, path, dest, is_directory in events:
+            if kind in ("deleted", "moved"):
+                self._drop(path, is_directory)
+            if kind == "moved" and dest:
+                self._add(dest, is_directory)
+            elif kind == "created":
+                self._add(path, is_directory)
+        self._snapshot = None
+
+    def apply_events(self, events: list[FsEvent]) -> None:
+        """Applies filesystem watcher events (kind, path, dest, is_directory) in order."""
+        with self._lock:
+            if self._replay is not None:
+                self._replay.extend(events)
+            self._apply(events)
+
+    def _walk(self, roots: list[str]) -> None:
+        with self._lock:
+            self._replay = []
+        try:
+            for root in roots:
+                logger.info("🔍 Indexing directory: %s", root)
+                started = time.time()
+                found = _walk_dir(root)
+                with self._lock:
+                    self._drop(root, True)
+                    self._items.update(found)
+                    self._scanned_at[root] = started
+                    self._snapshot = None
+        finally:
+            with self._lock:
+                replay, self._replay = self._replay, None
+                # The walk may have listed a directory before these changes landed
+                self._apply(replay)
+
+    async def refresh(self, search_dirs: list[str]) -> list[dict]:
+        """
+        Returns the indexed files, walking directories that are not watched
+        and older than INDEX_CACHE_TIMEOUT, or watched but due for reconciliation.
+        """
+        if self._walk_lock is None:
+            self._walk_lock = asyncio.Lock()
+        max_age = await asyncio.to_thread(
+            self.watcher.index_max_age, search_dirs, self, INDEX_CACHE_TIMEOUT)
+        async with self._walk_lock:
+            now = time.time()
+            stale = [normalize_path(d) for d in search_dirs if os.path.exists(d)]
+            stale = [d for d in stale if now - self._scanned_at.get(d, 0.0) >= max_age]
+            if stale:
+                logger.info("📂 Indexing %s (Ho sakta hai thoda time lage)...", stale)
+                await asyncio.to_thread(self._walk, stale)
+                logger.info("✅ %s se kul %d files ko index kiya gaya.",
+                            search_dirs, len(self.items()))
+            else:
+                logger.info("⚡ Using live file index (%d files).", len(self.items()))
+        return self.items()
 
-    def walk_dirs():
-        index = []
-        for base_dir in search_dirs:
-            if not os.path.exists(base_dir):
-                continue
-            logger.info("🔍 Indexing directory: %s", base_dir)
-            for root, _, files in os.walk(base_dir):
-                for f in files:
-                    index.append({
-                        "name": f,
-                        "path": os.path.join(root, f),
-                        "type": "file"
-                    })
-        return index
 
-    logger.info("📂 Indexing %s (Ho sakta hai thoda time lage)...", search_dirs)
-    file_index = await asyncio.to_thread(walk_dirs)
+file_index = FileIndex()
 
-    global_file_index = file_index
-    LAST_INDEX_TIME = current_time
 
-    logger.info("✅ %s se kul %d files ko index kiya gaya.",
-                search_dirs, len(file_index))
-    return file_index
+async def index_files(search_dirs):
+    """
+    Returns every file in the specified directories from the live file index.
+    """
+    return await file_index.refresh(search_dirs)
 
 
 async def search_file(query, index):
@@ -208,8 +288,6 @@ async def play_file(name: str) -> dict:
         logger.info("⚡ Direct path detected, skipping indexing: %s", name)
         return await open_file({"name": os.path.basename(name), "path": name})
 
-    # Specific folders to index for better performance (can add more)
-    folders_to_index = ["D:/"]
-    index = await index_files(folders_to_index)
+    index = await index_files(FILE_SEARCH_DIRS)
     command = name.strip()
     return await handle_command(command, index)
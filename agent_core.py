@@ -5,9 +5,9 @@ Core logic for the BrainAssistant agent.
 
 # pylint: disable=protected-access, broad-exception-caught
 
-import re
 import asyncio
 import json
+from collections import deque
 from typing import Any, Optional
 
 from livekit.agents import Agent, AgentSession, StopResponse, llm
@@ -17,12 +17,12 @@ from jarvis_logger import setup_logger
 from jarvis_prompt import BEHAVIOR_PROMPT, ANNA_BEHAVIOR_PROMPT
 from jarvis_reasoning import (
     analyze_user_intent, generate_smart_response, process_with_advanced_reasoning,
-    context_analyzer
+    detect_wake_words, get_turn_reasoning
 )
 from jarvis_search import (
     get_formatted_datetime, search_internet
 )
-from jarvis_get_weather import get_weather
+from jarvis_get_weather import get_weather, get_weather_forecast
 from jarvis_notepad_automation import (
     create_template_code, open_notepad_simple, run_cmd_command, write_custom_code
 )
@@ -36,7 +36,7 @@ from jarvis_system_info import get_laptop_info
 from jarvis_whatsapp_automation import automate_whatsapp
 from jarvis_youtube_automation import automate_youtube
 from jarvis_vision import analyze_screen
-from jarvis_rag import ask_about_document
+from jarvis_rag import ask_about_document, ask_about_documents
 from jarvis_image_gen import tool_generate_image
 from jarvis_advanced_tools import download_images, zip_files, send_email
 from jarvis_qr_gen import generate_qr_code
@@ -54,8 +54,12 @@ from jarvis_researcher import perform_web_research, autonomous_research_and_emai
 from jarvis_self_healing import autonomous_self_repair
 from jarvis_bug_hunter import tool_investigate_recent_bugs
 from jarvis_diagnostics import tool_perform_diagnostics
+from jarvis_workflow import execute_workflow
 from jarvis_youtube_downloader import download_youtube_media
 from agent_memory import MemoryExtractor
+from agent_state import HISTORY_MAX_TURNS
+from agent_prefetch import SpeculativePrefetcher
+from jarvis_context_budget import ContextBudget, CONTEXT_TOKEN_BUDGET, truncate_to_tokens
 
 logger = setup_logger("JARVIS-CORE")
 
@@ -68,9 +72,12 @@ class BrainAssistant(Agent):
     """
 
     def __init__(self, chat_ctx: Any, current_date: Optional[str] = None,
-                 current_city: Optional[str] = None) -> None:
+                 current_city: Optional[str] = None,
+                 memory_extractor: Optional[MemoryExtractor] = None,
+                 conversation_history: Optional[deque] = None) -> None:
         """
         Initialize the BRAIN assistant with context, LLM, and tools.
+        A warm memory extractor and history can be passed in to survive session retries.
         """
         identity_context = jarvis_id.get_context()
         prompt_with_info = f"{INSTRUCTIONS_PROMPT}\n{identity_context}"
@@ -81,8 +88,11 @@ class BrainAssistant(Agent):
                 current_city=current_city
             )
 
-        self.memory_extractor = MemoryExtractor()
-        self.conversation_history: list[dict] = []
+        self.memory_extractor = memory_extractor or MemoryExtractor()
+        self.conversation_history: deque[dict] = (
+            conversation_history if conversation_history is not None
+            else deque(maxlen=HISTORY_MAX_TURNS))
+        self.prefetcher = SpeculativePrefetcher(self.memory_extractor.memory)
         self._wake_word_mode = True
         self._active_session: Optional[AgentSession] = None
         self._muted = False
@@ -94,7 +104,7 @@ class BrainAssistant(Agent):
             llm=google.realtime.RealtimeModel(
                 voice="charon", model="models/gemini-2.5-flash-native-audio-latest"),
             tools=[
-                search_internet, get_formatted_datetime, get_weather,
+                search_internet, get_formatted_datetime, get_weather, get_weather_forecast,
                 create_template_code, write_custom_code, run_cmd_command,
                 open_notepad_simple, shutdown_system, restart_system,
                 sleep_system, lock_screen, create_folder, folder_file,
@@ -105,9 +115,9 @@ class BrainAssistant(Agent):
                 scroll_cursor_tool, type_text_tool, press_key_tool,
                 press_hotkey_tool, control_volume_tool, set_volume_tool,
                 swipe_gesture_tool, automate_youtube,
-                analyze_screen, ask_about_document, download_images,
+                analyze_screen, ask_about_document, ask_about_documents, download_images,
                 zip_files, send_email, set_reminder, list_reminders,
-                perform_web_research, autonomous_research_and_email,
+                perform_web_research, autonomous_research_and_email, execute_workflow,
                 autonomous_self_repair, tool_investigate_recent_bugs,
                 tool_perform_diagnostics, tool_generate_image,
                 generate_qr_code, start_file_access_server,
@@ -243,9 +253,7 @@ class BrainAssistant(Agent):
 
     async def _handle_wake_word(self, text: str) -> tuple[bool, bool]:
         """Checks for wake words."""
-        is_j = bool(re.search(r"\bjarvis\b", text, re.IGNORECASE))
-        is_a = bool(
-            re.search(r"\b(anna|babu|jaan|myra|kiara|zoya)\b", text, re.IGNORECASE))
+        is_j, is_a = detect_wake_words(text)
         if not is_j and not is_a:
             return False, False
         await self._handle_persona_switch(is_a, is_j)
@@ -254,8 +262,9 @@ class BrainAssistant(Agent):
     async def _inject_emotional_context(self, text: str, turn_ctx: Any):
         """Injects emotional hints."""
         try:
-            mem = await self.memory_extractor.memory.get_recent_context(max_messages=5)
-            curr = context_analyzer.analyze_context(text, mem)
+            # Same context object the reasoning pipeline uses later this turn
+            curr = get_turn_reasoning(text).context_for(
+                self.conversation_history)
             if self._gf_mode_active and curr.get("user_mood") == "upset":
                 turn_ctx.chat_ctx.items.append(llm.ChatMessage(
                     role="assistant", content=["Manao him."]))
@@ -277,16 +286,30 @@ class BrainAssistant(Agent):
                 role="assistant", content=["Demand sorry."]))
 
     async def _inject_reasoning_and_memory(self, text: str, turn_ctx: Any, is_anna: bool):
-        """Injects reasoning and memory."""
+        """Injects reasoning and memory, packed into the per-turn token budget."""
         try:
-            sem = await self.memory_extractor.memory.get_semantic_context(query=text, n_results=3)
-            if sem:
-                turn_ctx.chat_ctx.items.append(llm.ChatMessage(
-                    role="system", content=[f"[LONG-TERM MEMORY CONTEXT]: {sem}"]))
+            sem = await self.prefetcher.claim(text)
+            if sem is None:
+                sem = await self.memory_extractor.memory.get_semantic_context(
+                    query=text, n_results=5, with_scores=True)
             res = await process_with_advanced_reasoning(text, self.conversation_history, is_anna=is_anna)
+
+            budget = ContextBudget(CONTEXT_TOKEN_BUDGET)
+            plan_msg = None
             if res.get("is_agentic") and res.get("plan"):
+                # The plan drives tool use, so it is budgeted before memories
+                plan_msg = (f"[EXECUTION PLAN]: {res['plan']} "
+                            "(use execute_workflow to run independent steps in one call)")
+                if not budget.reserve(plan_msg):
+                    plan_msg = truncate_to_tokens(plan_msg, budget.remaining)
+                    budget.reserve(plan_msg)
+            memories = budget.pack(sem or [])
+            if memories:
+                turn_ctx.chat_ctx.items.append(llm.ChatMessage(
+                    role="system", content=[f"[LONG-TERM MEMORY CONTEXT]: {memories}"]))
+            if plan_msg:
                 turn_ctx.chat_ctx.items.append(llm.ChatMessage(
-                    role="system", content=[f"[EXECUTION PLAN]: {res['plan']}"]))
+                    role="system", content=[plan_msg]))
         except Exception as e:  # pylint: disable=broad-exception-caught
             logger.exception("Reasoning error: %s", e)
 
@@ -303,9 +326,8 @@ class BrainAssistant(Agent):
             await self._inject_emotional_context(text, turn_ctx)
             new_message.content = text
             await self._inject_reasoning_and_memory(text, turn_ctx, is_anna=is_a)
+            # Bounded deque drops the oldest turn automatically
             self.conversation_history.append({"role": "user", "content": text})
-            if len(self.conversation_history) > 20:
-                self.conversation_history.pop(0)
             try:
                 return await super().on_user_turn_completed(turn_ctx, new_message)
             except (StopResponse, asyncio.CancelledError):
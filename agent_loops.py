@@ -8,10 +8,13 @@ Background loops for reminders, bug hunting, and UI communication.
 import asyncio
 import json
 import socket
-from typing import TYPE_CHECKING
+import sqlite3
+from typing import TYPE_CHECKING, Awaitable, Callable, Sequence
 from jarvis_logger import setup_logger
+from jarvis_fs_watcher import INDEX_RECONCILE_INTERVAL
 from jarvis_reminders import check_due_reminders
 from jarvis_bug_hunter import monitor_logs
+from jarvis_get_weather import WEATHER_PREFETCH_INTERVAL, prefetch_home_weather
 
 if TYPE_CHECKING:
     from agent_core import BrainAssistant
@@ -76,6 +79,39 @@ async def start_bug_hunter_loop(session: "AgentSession"):
     await monitor_logs(on_error_detected)
 
 
+async def start_weather_prefetch_loop(interval: float = WEATHER_PREFETCH_INTERVAL):
+    """Keeps the home city's weather and forecast cached."""
+    while True:
+        try:
+            await prefetch_home_weather()
+            await asyncio.sleep(interval)
+        except asyncio.CancelledError:
+            logger.info("Weather prefetch loop stopping gracefully...")
+            break
+        except (IOError, OSError, ValueError, RuntimeError) as e:
+            logger.error("Weather prefetch loop error: %s", e)
+            await asyncio.sleep(interval)
+
+
+async def start_index_reconcile_loop(refreshers: Sequence[Callable[[], Awaitable[object]]],
+                                     interval: float = INDEX_RECONCILE_INTERVAL):
+    """
+    Builds the file indexes at startup and reconciles them every `interval`;
+    filesystem watcher events keep them live in between.
+    """
+    while True:
+        try:
+            for refresh in refreshers:
+                await refresh()
+            await asyncio.sleep(interval)
+        except asyncio.CancelledError:
+            logger.info("Index reconcile loop stopping gracefully...")
+            break
+        except (IOError, OSError, RuntimeError, sqlite3.Error) as e:
+            logger.error("Index reconcile loop error: %s", e)
+            await asyncio.sleep(interval)
+
+
 async def start_ui_command_listener(assistant: "BrainAssistant"):
     """Listens for UDP commands from the UI (Mute/Unmute)."""
     server_address = ("127.0.0.1", 5006)
@@ -0,0 +1,116 @@
+"""
+# agent_prefetch.py
+Speculative memory retrieval on interim transcripts.
+
+While the user is still speaking, interim transcripts that already contain a
+wake word start the semantic memory query in the background.
+When the final transcript arrives the prefetched result is reused if it is
+similar enough, otherwise the speculative work is cancelled.
+"""
+
+import asyncio
+import re
+from collections import OrderedDict
+from difflib import SequenceMatcher
+from typing import Any, List, Optional
+from jarvis_logger import setup_logger
+from jarvis_metrics import perf_stats
+from jarvis_reasoning import detect_wake_words
+
+logger = setup_logger("JARVIS-PREFETCH")
+
+_NON_WORD_RE = re.compile(r"[^\w\s]+", re.UNICODE)
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_transcript(text: str) -> str:
+    """Lowercases and strips punctuation so interim and final text compare cleanly."""
+    return _SPACE_RE.sub(" ", _NON_WORD_RE.sub(" ", text.lower())).strip()
+
+
+class SpeculativePrefetcher:
+    """
+    Runs memory retrieval ahead of the final transcript, keyed by the
+    normalized transcript prefix.
+    """
+
+    def __init__(self, memory: Any, n_results: int = 5,
+                 min_similarity: float = 0.75, min_chars: int = 10,
+                 max_inflight: int = 3):
+        self.memory = memory
+        self.n_results = n_results
+        self.min_similarity = min_similarity
+        self.min_chars = min_chars
+        self.max_inflight = max_inflight
+        self._inflight: "OrderedDict[str, asyncio.Task]" = OrderedDict()
+
+    async def _prefetch(self, text: str) -> List:
+        return await self.memory.get_semantic_context(
+            query=text, n_results=self.n_results, with_scores=True)
+
+    def on_partial(self, text: str) -> Optional[asyncio.Task]:
+        """Starts a prefetch for an interim transcript that contains a wake word."""
+        key = normalize_transcript(text or "")
+        if len(key) < self.min_chars or key in self._inflight:
+            return None
+        is_jarvis, is_anna = detect_wake_words(key)
+        if not is_jarvis and not is_anna:
+            return None
+
+        task = asyncio.create_task(self._prefetch(key))
+        self._inflight[key] = task
+        perf_stats.incr("prefetch.started")
+        while len(self._inflight) > self.max_inflight:
+            _, oldest = self._inflight.popitem(last=False)
+            oldest.cancel()
+            perf_stats.incr("prefetch.cancelled")
+        return task
+
+    def _best_match(self, key: str) -> Optional[str]:
+        best_key, best_score = None, 0.0
+        for candidate in self._inflight:
+            matcher = SequenceMatcher(None, candidate, key, autojunk=False)
+            if matcher.real_quick_ratio() < self.min_similarity:
+                continue
+            score = matcher.ratio()
+            if score > best_score:
+                best_key, best_score = candidate, score
+        return best_key if best_score >= self.min_similarity else None
+
+    async def claim(self, final_text: str) -> Optional[List]:
+        """
+        Returns the prefetched memories for the final transcript, or None when
+        no speculative result is close enough. Unused prefetches are cancelled.
+        """
+        key = normalize_transcript(final_text or "")
+        best_key = self._best_match(key) if key else None
+        task = self._inflight.pop(best_key) if best_key else None
+        self.cancel_all()
+
+        result = None
+        if task is not None:
+            try:
+                result = await task
+            except asyncio.CancelledError:
+                result = None
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.warning("Speculative memory prefetch failed: %s", e)
+                result = None
+
+        perf_stats.incr("prefetch.hit" if result is not None else "prefetch.miss")
+        logger.info("🔮 Memory prefetch %s (hit rate %.0f%%)",
+                    "hit" if result is not None else "miss", self.hit_rate * 100)
+        return result
+
+    def cancel_all(self) -> None:
+        """Cancels every in-flight speculative query."""
+        for task in self._inflight.values():
+            if not task.done():
+                task.cancel()
+                perf_stats.incr("prefetch.cancelled")
+        self._inflight.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of final turns served from a prefetch."""
+        return perf_stats.hit_rate("prefetch.hit", "prefetch.miss")
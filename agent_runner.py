@@ -5,7 +5,6 @@ Entrypoint and session management for the JARVIS agent.
 
 # pylint: disable=broad-exception-caught
 
-import httpx
 import asyncio
 import socket
 import json
@@ -14,13 +13,20 @@ from livekit import agents, rtc
 from livekit.agents import AgentSession, llm
 from jarvis_logger import setup_logger
 from jarvis_diagnostics import diagnostics
+from jarvis_http import http_client
 from jarvis_search import get_current_city, get_formatted_datetime
 from jarvis_clipboard import ClipboardMonitor
+from jarvis_researcher import set_research_progress_handler
+from jarvis_file_opener import FILE_SEARCH_DIRS, index_files
+from jarvis_rag import rag_system
+from jarvis_doc_text_cache import doc_text_cache
 from agent_memory import MemoryExtractor
 from agent_loops import (
-    start_reminder_loop, start_bug_hunter_loop, start_ui_command_listener
+    start_reminder_loop, start_bug_hunter_loop, start_ui_command_listener,
+    start_weather_prefetch_loop, start_index_reconcile_loop
 )
 from agent_core import BrainAssistant
+from agent_state import agent_state
 from jarvis_window_ctrl import (
     maximize_window, minimize_window
 )
@@ -35,11 +41,10 @@ logger = setup_logger("JARVIS-RUNNER")
 async def notify_ui(status: str):
     """Sends a notification to the STONIX UI Bridge."""
     try:
-        async with httpx.AsyncClient() as client:
-            await client.post("http://127.0.0.1:5001/notify", json={
-                "type": "status",
-                "payload": status
-            }, timeout=0.1)
+        await http_client.post("http://127.0.0.1:5001/notify", json={
+            "type": "status",
+            "payload": status
+        }, timeout=0.1)
     except Exception as e:
         logger.debug("Bridge Notification failed: %s", e)
 
@@ -47,22 +52,22 @@ async def notify_ui(status: str):
 async def notify_transcription(role: str, text: str):
     """Sends a transcription update to the STONIX UI Bridge."""
     try:
-        async with httpx.AsyncClient() as client:
-            await client.post("http://127.0.0.1:5001/notify", json={
-                "type": "transcription",
-                "payload": {
-                    "role": role,
-                    "text": text,
-                    "timestamp": get_formatted_datetime().get("formatted", "").split(" ")[-1]
-                }
-            }, timeout=0.2)
+        await http_client.post("http://127.0.0.1:5001/notify", json={
+            "type": "transcription",
+            "payload": {
+                "role": role,
+                "text": text,
+                "timestamp": get_formatted_datetime().get("formatted", "").split(" ")[-1]
+            }
+        }, timeout=0.2)
     except Exception as e:
         logger.debug("Transcription Notification failed: %s", e)
 
 
-async def start_memory_loop(session: AgentSession):
+async def start_memory_loop(session: AgentSession,
+                            memory_extractor: Optional[MemoryExtractor] = None):
     """Continuous memory extraction loop."""
-    memory_extractor = MemoryExtractor()
+    memory_extractor = memory_extractor or MemoryExtractor()
     while True:
         try:
             if session is None or not hasattr(session, 'history'):
@@ -114,39 +119,69 @@ async def perform_startup_diagnostics():
         logger.error("Startup diagnostics failed: %s", e)
 
 
+async def _on_clipboard_detected(solution):
+    """Pushes a clipboard solution into whichever session is currently active."""
+    print(f"📋 Clipboard Detection: {solution}")
+    session = agent_state.session
+    if session and hasattr(session, "history"):
+        session.history.append(
+            role="assistant",
+            content=f"[SYSTEM NOTIFICATION: CLIPBOARD ERROR DETECTED]\n{solution}"
+        )
+    try:
+        if session:
+            session.inference()
+    except Exception as e:
+        logger.warning("Proactive inference failed: %s", e)
+
+
+async def _on_research_progress(update):
+    """Lets the active session start a preliminary summary once the first source arrives."""
+    session = agent_state.session
+    # Only worth it while more sources are still loading
+    if session is None or update["found"] != 1 or update["completed"] >= update["total"]:
+        return
+    session.say(
+        (
+            "Sir ko Roman Urdu main mukhtasar batayein ke research jari hai aur pehle source "
+            f"se ab tak ye mila hai:\n{update['preview']}"
+        ),
+        allow_interruptions=True
+    )
+
+
+def _ensure_warm_tasks():
+    """Starts process-level tasks once; they keep running across session retries."""
+    agent_state.ensure_task("diagnostics", perform_startup_diagnostics)
+    agent_state.ensure_task("weather_prefetch", start_weather_prefetch_loop)
+    agent_state.ensure_task(
+        "clipboard", lambda: ClipboardMonitor().start(_on_clipboard_detected))
+    agent_state.ensure_task("index_reconcile", lambda: start_index_reconcile_loop(
+        [lambda: index_files(FILE_SEARCH_DIRS), rag_system.refresh_index]))
+    agent_state.ensure_task("doc_pre_extract", doc_text_cache.run_worker)
+
+
 async def _start_background_tasks(session: AgentSession, assistant: Any):
-    """Starts all background loops and monitors."""
+    """Starts the room-bound loops for this session and any missing warm tasks."""
     logger.info("🔄 Starting background tasks...")
+    agent_state.bind_session(session, assistant)
+    set_research_progress_handler(_on_research_progress)
     tasks = [
-        asyncio.create_task(start_memory_loop(session)),
+        asyncio.create_task(start_memory_loop(
+            session, agent_state.get_memory_extractor())),
         asyncio.create_task(start_reminder_loop(session)),
         asyncio.create_task(start_bug_hunter_loop(session)),
-        asyncio.create_task(start_ui_command_listener(assistant)),
-        asyncio.create_task(perform_startup_diagnostics())
+        asyncio.create_task(start_ui_command_listener(assistant))
     ]
-
-    clip_monitor = ClipboardMonitor()
-
-    async def _on_clipboard_detected(solution):
-        print(f"📋 Clipboard Detection: {solution}")
-        if session and hasattr(session, "history"):
-            session.history.append(
-                role="assistant",
-                content=f"[SYSTEM NOTIFICATION: CLIPBOARD ERROR DETECTED]\n{solution}"
-            )
-        try:
-            if session:
-                session.inference()
-        except Exception as e:
-            logger.warning("Proactive inference failed: %s", e)
-
-    tasks.append(asyncio.create_task(
-        clip_monitor.start(_on_clipboard_detected)))
+    _ensure_warm_tasks()
     return tasks
 
 
 async def _cleanup_session_resources(session: Optional[AgentSession], tasks: list):
-    """Cancels tasks and stops the session safely."""
+    """Cancels room-bound tasks and stops the session safely."""
+    if agent_state.assistant is not None:
+        agent_state.assistant.prefetcher.cancel_all()
+    agent_state.release_session()
     # 1. Stop the session first to signal generators to close
     if session:
         try:
@@ -168,6 +203,9 @@ async def _cleanup_session_resources(session: Optional[AgentSession], tasks: lis
         except asyncio.TimeoutError:
             logger.warning("Background task cleanup timed out.")
 
+    # 3. Release pooled HTTP connections; the next session opens a fresh pool
+    await http_client.aclose()
+
 
 def _print_startup_banner():
     """Prints the JARVIS startup banner to console."""
@@ -193,13 +231,13 @@ async def entrypoint(ctx: agents.JobContext):
         try:
             logger.info(
                 "Attempting to start session (Attempt %d/%d)...", attempt + 1, max_retries)
+            agent_state.mark_attempt_start()
 
-            # 1. Parallelize initial data gathering (Date/Time + City)
-            current_dt_task = asyncio.create_task(get_formatted_datetime())
-            city_task = asyncio.create_task(get_current_city())
-
-            # Wait for both together
-            current_dt_result, city = await asyncio.gather(current_dt_task, city_task)
+            # 1. Initial data (Date/Time + City). The city comes from the
+            # persisted location cache and is refreshed in the background,
+            # so startup never waits on the geolocation API.
+            current_dt_result = await get_formatted_datetime()
+            city = await get_current_city(wait=False)
 
             session = AgentSession(
                 preemptive_generation=False,
@@ -218,7 +256,9 @@ async def entrypoint(ctx: agents.JobContext):
             assistant = BrainAssistant(
                 chat_ctx=chat_ctx,
                 current_date=current_dt_result.get("formatted"),
-                current_city=city
+                current_city=city,
+                memory_extractor=agent_state.get_memory_extractor(),
+                conversation_history=agent_state.conversation_history
             )
 
             await session.start(room=ctx.room, agent=assistant)
@@ -249,14 +289,21 @@ async def entrypoint(ctx: agents.JobContext):
                     asyncio.create_task(
                         notify_transcription("user", transcript.text))
 
+            @session.on("user_input_transcribed")
+            def _on_user_input_transcribed(event):
+                # Interim transcripts start memory retrieval before the turn ends
+                if event and not event.is_final and event.transcript:
+                    assistant.prefetcher.on_partial(event.transcript)
+
             @session.on("agent_transcription")
             def _on_agent_transcript(transcript):
                 if transcript and transcript.text:
                     asyncio.create_task(
                         notify_transcription("agent", transcript.text))
 
-            _print_startup_banner()
             tasks = await _start_background_tasks(session, assistant)
+            agent_state.mark_session_ready()
+            _print_startup_banner()
             await asyncio.Event().wait()
 
         except (asyncio.CancelledError, KeyboardInterrupt):
@@ -270,3 +317,5 @@ async def entrypoint(ctx: agents.JobContext):
                 await asyncio.sleep(wait)
         finally:
             await _cleanup_session_resources(session, tasks)
+
+    await agent_state.shutdown()
@@ -0,0 +1,103 @@
+"""
+# agent_state.py
+Process-level state that survives session retries.
+
+The LiveKit session and everything bound to its room are rebuilt on every
+retry; the components held here (memory, clipboard monitor, diagnostics,
+conversation history) are created once and reused so reconnects stay warm.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Optional
+from jarvis_logger import setup_logger
+from jarvis_metrics import perf_stats
+from agent_memory import MemoryExtractor
+
+logger = setup_logger("JARVIS-STATE")
+
+# User turns kept for reasoning context
+HISTORY_MAX_TURNS = 20
+
+
+class AgentState:
+    """
+    Holds warmed components across `entrypoint` retries.
+    """
+
+    def __init__(self):
+        self.memory_extractor: Optional[MemoryExtractor] = None
+        self.conversation_history: deque[dict] = deque(maxlen=HISTORY_MAX_TURNS)
+        self.session: Optional[Any] = None
+        self.assistant: Optional[Any] = None
+        self.session_count = 0
+        self._warm_tasks: dict[str, asyncio.Task] = {}
+        self._attempt_started: Optional[float] = None
+
+    @property
+    def is_warm(self) -> bool:
+        """True once a session has been started in this process."""
+        return self.session_count > 0
+
+    def get_memory_extractor(self) -> MemoryExtractor:
+        """Returns the shared MemoryExtractor, creating it on first use."""
+        if self.memory_extractor is None:
+            self.memory_extractor = MemoryExtractor()
+        return self.memory_extractor
+
+    def bind_session(self, session: Any, assistant: Any) -> None:
+        """Points warm components at the currently active session."""
+        self.session = session
+        self.assistant = assistant
+        # The new session starts with an empty history, so the extraction
+        # cursor has to restart from zero.
+        self.get_memory_extractor().clear_context()
+
+    def release_session(self) -> None:
+        """Drops references to the session being torn down."""
+        self.session = None
+        self.assistant = None
+
+    def ensure_task(self, name: str, factory: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """
+        Starts a process-level task once; later calls reuse it. Only a task
+        that failed or was cancelled is started again.
+        """
+        task = self._warm_tasks.get(name)
+        if task is None or (task.done() and (task.cancelled() or task.exception() is not None)):
+            task = asyncio.create_task(factory())
+            self._warm_tasks[name] = task
+        return task
+
+    def mark_attempt_start(self) -> None:
+        """Records the start of a session attempt for reconnect timing."""
+        self._attempt_started = time.perf_counter()
+
+    def mark_session_ready(self) -> float:
+        """Logs and records how long the current attempt took to become ready."""
+        started = self._attempt_started or time.perf_counter()
+        elapsed = time.perf_counter() - started
+        metric = "session.warm_restart" if self.is_warm else "session.cold_start"
+        perf_stats.observe(metric, elapsed)
+        logger.info("⏱️ Session ready in %.2fs (%s)", elapsed,
+                    "warm restart" if self.is_warm else "cold start")
+        self.session_count += 1
+        self._attempt_started = None
+        return elapsed
+
+    async def shutdown(self) -> None:
+        """Cancels process-level tasks on final shutdown."""
+        tasks = [t for t in self._warm_tasks.values() if not t.done()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            try:
+                await asyncio.wait_for(asyncio.gather(*tasks, return_exceptions=True), timeout=2.0)
+            except asyncio.TimeoutError:
+                logger.warning("Warm task cleanup timed out.")
+        self._warm_tasks.clear()
+
+
+# Global Instance
+agent_state = AgentState()
@@ -0,0 +1,130 @@
+"""
+# benchmarks/bench_doc_index.py
+Compares the old document discovery in jarvis_rag (a full os.walk of the
+tree on every cache expiry) with the persistent incremental DocumentIndex.
+
+A tree of empty files (default 500k, about 1 in 5 of them PDF/DOCX) is
+generated under a temporary directory. Measured:
+  - os.walk full walk (old path, repeated every 5 minutes)
+  - first index scan (cold, builds the SQLite index)
+  - rescan with nothing changed
+  - rescan after adding and removing documents in a few directories
+  - loading the file list from a fresh process-level instance (restart)
+
+Usage: python benchmarks/bench_doc_index.py [--files 500000] [--per-dir 100] [--keep DIR]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jarvis_doc_index import DocumentIndex  # noqa: E402  pylint: disable=wrong-import-position
+
+EXTENSIONS = (".pdf", ".docx", ".txt", ".jpg", ".xlsx", ".mp3", ".py", ".log", ".png", ".csv")
+
+
+def generate_tree(root: str, files: int, per_dir: int, fanout: int = 10) -> int:
+    """Creates `files` empty files, `per_dir` per directory, in a tree `fanout` wide."""
+    rng = random.Random(3)
+    dirs = files // per_dir
+    created = 0
+    for d in range(dirs):
+        parts, n = [], d
+        while True:
+            parts.append(f"dir{n % fanout}")
+            n //= fanout
+            if n == 0:
+                break
+        directory = os.path.join(root, *reversed(parts), f"leaf{d}")
+        os.makedirs(directory, exist_ok=True)
+        for i in range(per_dir):
+            name = f"file_{d}_{i}{rng.choice(EXTENSIONS)}"
+            with open(os.path.join(directory, name), "wb"):
+                pass
+            created += 1
+    return created
+
+
+def old_walk(root: str):
+    """The previous jarvis_rag discovery loop."""
+    results = []
+    for dirpath, _, files in os.walk(root):
+        for f in files:
+            if f.lower().endswith((".pdf", ".docx")):
+                results.append(os.path.join(dirpath, f))
+    return results
+
+
+def timed(label: str, fn):
+    """Runs fn once and prints its wall time."""
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<44} {elapsed * 1000:10.1f} ms")
+    return result
+
+
+def backdate(root: str) -> None:
+    """Moves directory mtimes out of the index's racy window, as on a real disk."""
+    past = time.time() - 3600
+    for dirpath, _, _ in os.walk(root):
+        os.utime(dirpath, (past, past))
+
+
+def main():
+    """Generates the tree and runs every measurement."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=500000)
+    parser.add_argument("--per-dir", type=int, default=100)
+    parser.add_argument("--keep", help="Reuse/keep the generated tree in this directory")
+    args = parser.parse_args()
+
+    workdir = args.keep or tempfile.mkdtemp(prefix="jarvis_doc_index_")
+    tree = os.path.join(workdir, "tree")
+    db_path = os.path.join(workdir, "index.sqlite3")
+    try:
+        if not os.path.isdir(tree):
+            start = time.perf_counter()
+            count = generate_tree(tree, args.files, args.per_dir)
+            print(f"Generated {count} files in {time.perf_counter() - start:.1f}s")
+            backdate(tree)
+        if os.path.exists(db_path):
+            os.remove(db_path)
+
+        docs = timed("old: os.walk full walk", lambda: old_walk(tree))
+        index = DocumentIndex(db_path)
+        timed("index: first scan (cold)", lambda: index.scan([tree]))
+        stats = timed("index: rescan, nothing changed", lambda: index.scan([tree]))
+        print(f"{'':<44} listed {stats['dirs_scanned']} dirs, skipped {stats['dirs_skipped']}")
+
+        leaves = sorted({os.path.dirname(p) for p in docs})[:: max(1, len(docs) // 50)][:10]
+        for i, leaf in enumerate(leaves):
+            with open(os.path.join(leaf, f"added_{i}.pdf"), "wb"):
+                pass
+        victims = docs[:: max(1, len(docs) // 10)][:10]
+        for path in victims:
+            os.remove(path)
+        stats = timed(f"index: rescan after {len(leaves)}+{len(victims)} changes",
+                      lambda: index.scan([tree]))
+        print(f"{'':<44} listed {stats['dirs_scanned']} dirs, "
+              f"+{stats['files_added']}/-{stats['files_removed']} files")
+        index.close()
+
+        restarted = DocumentIndex(db_path)
+        files = timed("index: file list after restart", lambda: restarted.files([tree]))
+        restarted.close()
+        print(f"\n{len(docs)} documents found by os.walk, {len(files)} in the index now "
+              f"(+{len(leaves)} added, -{len(victims)} removed)")
+    finally:
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
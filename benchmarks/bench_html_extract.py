@@ -0,0 +1,171 @@
+"""
+# benchmarks/bench_html_extract.py
+Corpus benchmark for the HTML-to-text backends in jarvis_html_extract.
+
+For every installed backend it reports pages per second and text quality.
+Quality is the word-level F1 against a reference text when the corpus has
+one (page.html + page.txt), and the similarity to the html.parser baseline
+otherwise. It also compares extracting a 5-page research batch in-process
+against the process pool.
+
+Without --corpus a synthetic corpus is generated: article pages wrapped in
+navigation, cookie banners, share widgets, sidebars and footers, with the
+article text as the reference.
+
+Usage: python benchmarks/bench_html_extract.py [--corpus DIR] [--pages 40] [--show-diff]
+"""
+
+import argparse
+import asyncio
+import difflib
+import glob
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import jarvis_html_extract  # noqa: E402  pylint: disable=wrong-import-position
+from jarvis_html_extract import (  # noqa: E402  pylint: disable=wrong-import-position
+    available_backends, extract_text, extract_text_async, shutdown_extract_pool)
+
+WORDS = ("market energy climate policy research river city school health water data "
+         "model system report growth science power season travel music history").split()
+MAX_CHARS = 20000
+
+
+def _sentence(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 16))).capitalize() + "."
+
+
+def synthetic_page(rng: random.Random):
+    """Returns (html, reference_text) for one noisy article page."""
+    title = _sentence(rng)[:-1]
+    paragraphs = [" ".join(_sentence(rng) for _ in range(rng.randint(3, 6)))
+                  for _ in range(rng.randint(6, 14))]
+    links = "".join(f"<li><a href='/s{i}'>{rng.choice(WORDS).title()} section</a></li>"
+                    for i in range(40))
+    script = "<script>" + "window.dataLayer.push({event: 'view'});" * 200 + "</script>"
+    html = (
+        f"<!DOCTYPE html><html><head><title>{title} | Site</title>{script}"
+        "<style>.a{color:red}</style></head><body>"
+        f"<header class='site-header'><nav><ul>{links}</ul></nav></header>"
+        "<div id='cookie-consent'>We use cookies to improve your experience. "
+        "<button>Accept all</button></div>"
+        "<div class='layout'><main><article>"
+        f"<h1>{title}</h1>"
+        "<div class='share-bar'>Share on Facebook Share on X</div>"
+        + "".join(f"<p>{p}</p>" for p in paragraphs) +
+        "</article></main>"
+        "<aside class='sidebar'><h3>Related stories</h3><ul>"
+        + "".join(f"<li>{_sentence(rng)}</li>" for _ in range(8)) +
+        "</ul></aside></div>"
+        "<div class='newsletter-signup'>Subscribe to our newsletter for weekly updates</div>"
+        "<footer><p>Copyright 2026 Example Media. All rights reserved.</p></footer>"
+        "</body></html>")
+    reference = "\n".join([title] + paragraphs)
+    return html, reference
+
+
+def load_corpus(directory: str):
+    """Reads page.html files and optional page.txt references from a directory."""
+    pages = []
+    for path in sorted(glob.glob(os.path.join(directory, "**", "*.htm*"), recursive=True)):
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            html = f.read()
+        reference = None
+        ref_path = os.path.splitext(path)[0] + ".txt"
+        if os.path.exists(ref_path):
+            with open(ref_path, "r", encoding="utf-8", errors="replace") as f:
+                reference = f.read()
+        pages.append((os.path.relpath(path, directory), html, reference))
+    return pages
+
+
+def word_f1(candidate: str, reference: str) -> float:
+    """Bag-of-words F1 of extracted text against the reference text."""
+    got, want = Counter(candidate.lower().split()), Counter(reference.lower().split())
+    overlap = sum((got & want).values())
+    if not overlap:
+        return 0.0
+    precision, recall = overlap / sum(got.values()), overlap / sum(want.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+def similarity(a: str, b: str) -> float:
+    """Line-level similarity of two extractions."""
+    return difflib.SequenceMatcher(None, a.splitlines(), b.splitlines(), autojunk=False).ratio()
+
+
+def bench_backends(pages, show_diff: bool) -> None:
+    """Pages/s and quality per backend."""
+    baseline = {name: extract_text(html, "html.parser", MAX_CHARS) for name, html, _ in pages}
+    print(f"{'backend':<12} {'pages/s':>9} {'quality':>9}   (quality: "
+          f"{'F1 vs reference' if all(ref for *_, ref in pages) else 'similarity to html.parser'})")
+    for backend in available_backends():
+        start = time.perf_counter()
+        outputs = {name: extract_text(html, backend, MAX_CHARS) for name, html, _ in pages}
+        elapsed = time.perf_counter() - start
+        scores = [word_f1(outputs[name], ref) if ref else similarity(outputs[name], baseline[name])
+                  for name, _, ref in pages]
+        print(f"{backend:<12} {len(pages) / elapsed:9.1f} {sum(scores) / len(scores):9.3f}")
+        if show_diff and backend != "html.parser":
+            name = pages[0][0]
+            diff = difflib.unified_diff(baseline[name].splitlines(), outputs[name].splitlines(),
+                                        "html.parser", backend, lineterm="", n=0)
+            lines = list(diff)[:20]
+            if lines:
+                print("\n".join(lines))
+
+
+async def bench_pool(pages, backend: str, rounds: int) -> None:
+    """Extracts 5-page research batches in-process vs in the process pool."""
+    batches = [pages[i:i + 5] for i in range(0, len(pages) - 4, 5)][:rounds] or [pages[:5]]
+
+    start = time.perf_counter()
+    for batch in batches:
+        for _, html, _ in batch:
+            extract_text(html, backend, MAX_CHARS)
+    sequential = time.perf_counter() - start
+
+    # Warm the workers so process start-up is not counted
+    await asyncio.gather(*(extract_text_async(pages[0][1], backend, MAX_CHARS)
+                           for _ in range(jarvis_html_extract.EXTRACT_WORKERS)))
+    start = time.perf_counter()
+    for batch in batches:
+        await asyncio.gather(*(extract_text_async(html, backend, MAX_CHARS) for _, html, _ in batch))
+    pooled = time.perf_counter() - start
+    shutdown_extract_pool()
+
+    count = sum(len(batch) for batch in batches)
+    print(f"\n5-page batches with {backend}: in-process {count / sequential:7.1f} pages/s, "
+          f"process pool ({jarvis_html_extract.EXTRACT_WORKERS} workers) "
+          f"{count / pooled:7.1f} pages/s")
+
+
+def main():
+    """Builds or loads the corpus and runs both benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus", help="Directory of .html pages with optional .txt references")
+    parser.add_argument("--pages", type=int, default=40, help="Synthetic pages to generate")
+    parser.add_argument("--pool-backend", default="html.parser")
+    parser.add_argument("--show-diff", action="store_true")
+    args = parser.parse_args()
+
+    if args.corpus:
+        pages = load_corpus(args.corpus)
+    else:
+        rng = random.Random(7)
+        pages = [(f"synthetic_{i}", *synthetic_page(rng)) for i in range(args.pages)]
+    if not pages:
+        sys.exit("No pages found")
+    print(f"{len(pages)} pages, {sum(len(h) for _, h, _ in pages) / 1e6:.1f} MB of HTML\n")
+
+    bench_backends(pages, args.show_diff)
+    asyncio.run(bench_pool(pages, args.pool_backend, rounds=len(pages) // 5))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+# benchmarks/bench_http_pool.py
+Compares three ways of making outbound HTTP calls against a local stub server:
+`requests.get` inside `asyncio.to_thread` (the old pattern), a new
+`httpx.AsyncClient` per call (the old notify_ui pattern), and the shared pooled
+client from jarvis_http.
+
+Usage: python benchmarks/bench_http_pool.py [--requests 500] [--concurrency 20]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jarvis_http import SharedHTTPClient  # noqa: E402  pylint: disable=wrong-import-position
+from jarvis_metrics import nearest_rank_percentiles  # noqa: E402  pylint: disable=wrong-import-position
+
+BODY = b'{"status": "ok", "results": []}'
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Keep-alive JSON responder."""
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    connections = set()
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Answers every GET with a small JSON body."""
+        StubHandler.connections.add(self.client_address)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+async def _run(label: str, fetch, total: int, concurrency: int) -> None:
+    StubHandler.connections = set()
+    gate = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def _one():
+        async with gate:
+            start = time.perf_counter()
+            await fetch()
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_one() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+    pct = nearest_rank_percentiles(latencies, (50, 99))
+    print(f"{label:<26} {total / elapsed:8.0f} req/s   p50 {pct['p50']:6.2f} ms   "
+          f"p99 {pct['p99']:6.2f} ms   connections {len(StubHandler.connections)}")
+
+
+async def main_async(total: int, concurrency: int, url: str) -> None:
+    """Runs each client strategy against the stub server."""
+    async def thread_requests():
+        await asyncio.to_thread(requests.get, url, timeout=5)
+
+    async def client_per_call():
+        async with httpx.AsyncClient() as client:
+            await client.get(url, timeout=5)
+
+    shared = SharedHTTPClient()
+
+    async def pooled():
+        await shared.get(url, timeout=5)
+
+    await _run("requests + to_thread", thread_requests, total, concurrency)
+    await _run("httpx client per call", client_per_call, total, concurrency)
+    await _run("shared pooled client", pooled, total, concurrency)
+    await shared.aclose()
+
+
+def main():
+    """Starts the stub server and runs the comparison."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/search"
+    try:
+        asyncio.run(main_async(args.requests, args.concurrency, url))
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
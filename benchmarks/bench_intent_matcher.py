@@ -0,0 +1,89 @@
+"""
+# benchmarks/bench_intent_matcher.py
+Micro-benchmark: legacy per-rule `re.search` loop vs. the compiled
+MultiPatternMatcher, over a synthetic corpus of utterances.
+
+Usage: python benchmarks/bench_intent_matcher.py [--count 10000] [--seed 7]
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jarvis_reasoning import IntentAnalyzer, WAKE_WORD_PATTERNS  # noqa: E402  pylint: disable=wrong-import-position
+
+FILLER = [
+    "sir", "please", "zara", "mera", "aap", "yeh", "wo", "main", "abhi", "ke", "liye",
+    "ka", "ki", "se", "par", "bhai", "today", "the", "a", "my", "for", "with", "and"
+]
+
+
+def build_corpus(count: int, seed: int) -> list[str]:
+    """Creates utterances mixing rule keywords, wake words and filler."""
+    rnd = random.Random(seed)
+    analyzer = IntentAnalyzer()
+    keywords = []
+    for patterns in analyzer.intent_patterns.values():
+        for pattern in patterns:
+            keywords.extend(p for p in pattern.split(".*") if p)
+    wake = ["jarvis", "anna", "babu", "jaan"]
+    corpus = []
+    for _ in range(count):
+        words = [rnd.choice(FILLER) for _ in range(rnd.randint(3, 12))]
+        for _ in range(rnd.randint(0, 3)):
+            words.insert(rnd.randint(0, len(words)), rnd.choice(keywords))
+        if rnd.random() < 0.7:
+            words.insert(rnd.randint(0, len(words)), rnd.choice(wake))
+        corpus.append(" ".join(words))
+    return corpus
+
+
+def legacy_scan(groups: dict, text: str) -> dict:
+    """The pre-matcher behaviour: one re.search per rule."""
+    text_lower = text.lower()
+    counts = {}
+    for label, patterns in groups.items():
+        hits = sum(1 for pattern in patterns if re.search(pattern, text_lower))
+        if hits:
+            counts[label] = hits
+    return counts
+
+
+def main():
+    """Runs both engines over the corpus and reports throughput."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.count, args.seed)
+    analyzer = IntentAnalyzer()
+    groups = {**analyzer.intent_patterns, **WAKE_WORD_PATTERNS}
+    matcher = analyzer.matcher
+    rule_count = sum(len(p) for p in groups.values())
+
+    start = time.perf_counter()
+    legacy = [legacy_scan(groups, text) for text in corpus]
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compiled = [matcher.match(text) for text in corpus]
+    compiled_time = time.perf_counter() - start
+
+    mismatches = sum(1 for a, b in zip(legacy, compiled) if a != b)
+    print(f"Corpus: {len(corpus)} utterances, {rule_count} rules")
+    print(f"legacy re.search loop : {legacy_time * 1000:8.1f} ms "
+          f"({len(corpus) / legacy_time:10.0f} utt/s)")
+    print(f"compiled matcher      : {compiled_time * 1000:8.1f} ms "
+          f"({len(corpus) / compiled_time:10.0f} utt/s)")
+    print(f"speedup               : {legacy_time / compiled_time:8.2f}x")
+    print(f"mismatched results    : {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
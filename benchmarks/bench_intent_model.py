@@ -0,0 +1,74 @@
+"""
+# benchmarks/bench_intent_model.py
+Compares the regex intent rules with the linear n-gram classifier:
+primary-intent accuracy on the hand-labelled eval set and throughput on a
+synthetic corpus (per-utterance for regex, batched `predict_many` for linear).
+
+Usage: python benchmarks/bench_intent_model.py [--count 10000] [--batch 256]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jarvis_reasoning import IntentAnalyzer  # noqa: E402  pylint: disable=wrong-import-position
+from jarvis_intent_model import EVAL_DATA_PATH, train_from_file  # noqa: E402  pylint: disable=wrong-import-position
+from bench_intent_matcher import build_corpus  # noqa: E402  pylint: disable=wrong-import-position
+
+
+def load_eval(path: str) -> list[tuple[str, str]]:
+    """Reads {"text", "intent"} records of the eval set."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [(r["text"], r["intent"]) for r in map(json.loads, filter(str.strip, f))]
+
+
+def accuracy(analyzer: IntentAnalyzer, samples: list[tuple[str, str]]) -> float:
+    """Share of samples whose primary intent matches the label."""
+    results = analyzer.analyze_many([text for text, _ in samples])
+    correct = sum(1 for r, (_, label) in zip(results, samples) if r["primary_intent"] == label)
+    return correct / len(samples)
+
+
+def main():
+    """Trains the model, then reports accuracy and throughput for both backends."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--batch", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    model = train_from_file()
+    train_time = time.perf_counter() - start
+
+    regex = IntentAnalyzer(backend="regex")
+    linear = IntentAnalyzer(backend="linear")
+    linear._classifier = model  # pylint: disable=protected-access
+
+    samples = load_eval(EVAL_DATA_PATH)
+    corpus = build_corpus(args.count, args.seed)
+
+    start = time.perf_counter()
+    for text in corpus:
+        regex.analyze_intent(text)
+    regex_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(0, len(corpus), args.batch):
+        linear.analyze_many(corpus[i:i + args.batch])
+    linear_time = time.perf_counter() - start
+
+    print(f"Model trained in {train_time:.2f}s ({len(model.labels)} intents)")
+    print(f"Eval set: {len(samples)} labelled utterances")
+    print(f"regex rules   accuracy: {accuracy(regex, samples):6.1%}  "
+          f"throughput: {len(corpus) / regex_time:9.0f} utt/s")
+    print(f"linear model  accuracy: {accuracy(linear, samples):6.1%}  "
+          f"throughput: {len(corpus) / linear_time:9.0f} utt/s (batch {args.batch})")
+
+
+if __name__ == "__main__":
+    main()
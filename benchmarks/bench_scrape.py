@@ -0,0 +1,143 @@
+"""
+# benchmarks/bench_scrape.py
+Compares the old scrape path (download the whole page, parse the full DOM
+with BeautifulSoup's html.parser, keep 4000 characters) with the streaming
+scraper in jarvis_researcher (byte cap + incremental parser + early stop).
+
+Pages are served from a local stub server. Pass saved HTML files with
+--fixtures, or let the script generate large synthetic pages.
+
+Usage: python benchmarks/bench_scrape.py [--fixtures page1.html page2.html] [--repeat 3]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from functools import partial
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jarvis_crawler import crawl_scheduler  # noqa: E402  pylint: disable=wrong-import-position
+from jarvis_http import http_client  # noqa: E402  pylint: disable=wrong-import-position
+from jarvis_researcher import scrape_url  # noqa: E402  pylint: disable=wrong-import-position
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    """Static file server without request logging."""
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+    def copyfile(self, source, outputfile):
+        try:
+            super().copyfile(source, outputfile)
+        except (BrokenPipeError, ConnectionResetError):
+            # The streaming scraper hangs up early on purpose
+            pass
+
+
+def generate_fixture(path: str, size_mb: int) -> None:
+    """Writes a page with a heavy head (inline scripts/styles) and a long body."""
+    script = "<script>" + "var x = {a: [1, 2, 3], b: 'lorem ipsum'};\n" * 2000 + "</script>\n"
+    style = "<style>" + ".c{margin:0;padding:0;color:#333}\n" * 1000 + "</style>\n"
+    nav = "<nav>" + "".join(f"<a href='/l{i}'>Link {i}</a>" for i in range(300)) + "</nav>\n"
+    paragraph = ("<div class='c'><p>Lorem ipsum dolor sit amet, consectetur adipiscing elit, "
+                 "sed do eiusmod tempor incididunt ut labore et dolore magna aliqua.</p></div>\n")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("<!DOCTYPE html><html><head><title>Fixture</title>" + script + style + "</head>")
+        f.write("<body>" + nav)
+        written = f.tell()
+        target = size_mb * 1024 * 1024
+        while written < target:
+            f.write(paragraph * 100)
+            written += len(paragraph) * 100
+        f.write("</body></html>")
+
+
+async def old_scrape(url: str) -> str:
+    """Pre-streaming implementation: full download and full DOM."""
+    response = await http_client.get(url, timeout=30)
+    response.raise_for_status()
+    soup = BeautifulSoup(response.text, "html.parser")
+    for script_or_style in soup(["script", "style"]):
+        script_or_style.decompose()
+    text = soup.get_text()
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    return "\n".join(chunk for chunk in chunks if chunk)[:4000]
+
+
+async def measure(fn, url: str, repeat: int):
+    """Returns (best seconds, peak traced MB, text length)."""
+    best, length = float("inf"), 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        length = len(await fn(url))
+        best = min(best, time.perf_counter() - start)
+    # Memory is traced in a separate run; tracing slows the code down
+    tracemalloc.start()
+    await fn(url)
+    peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    tracemalloc.stop()
+    return best, peak, length
+
+
+async def main_async(base_url: str, names, repeat: int) -> None:
+    """Runs both strategies against every fixture."""
+    # Repeats hit the same local host; politeness delays would dominate the timings
+    crawl_scheduler.host_delay = 0
+    print(f"{'fixture':<24} {'strategy':<10} {'time':>9} {'peak mem':>10} {'chars':>6}")
+    for name, size in names:
+        url = f"{base_url}/{name}"
+        # The page cache would turn every repeat into a cache hit
+        stream = partial(scrape_url, backend="stream", use_cache=False)
+        for label, fn in (("old", old_scrape), ("stream", stream)):
+            seconds, peak, length = await measure(fn, url, repeat)
+            print(f"{name[:16]:<16} {size / 1e6:5.1f}MB {label:<10} {seconds * 1000:7.1f}ms "
+                  f"{peak:8.1f}MB {length:6d}")
+    await http_client.aclose()
+
+
+def main():
+    """Prepares fixtures, starts the stub server and runs the comparison."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fixtures", nargs="*", default=None)
+    parser.add_argument("--sizes", nargs="*", type=int, default=[1, 5, 20],
+                        help="Sizes (MB) of generated fixtures when --fixtures is not given")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.fixtures:
+            paths = [os.path.abspath(p) for p in args.fixtures]
+            root = os.path.commonpath([os.path.dirname(p) for p in paths])
+        else:
+            root = tmp
+            paths = []
+            for size in args.sizes:
+                path = os.path.join(tmp, f"page_{size}mb.html")
+                generate_fixture(path, size)
+                paths.append(path)
+        names = [(os.path.relpath(p, root).replace(os.sep, "/"), os.path.getsize(p)) for p in paths]
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), partial(QuietHandler, directory=root))
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            asyncio.run(main_async(f"http://127.0.0.1:{server.server_address[1]}", names, args.repeat))
+        finally:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
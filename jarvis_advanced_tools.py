@@ -12,10 +12,10 @@ from email.mime.text import MIMEText
 from email.mime.base import MIMEBase
 from email import encoders
 import asyncio
-import requests
 from duckduckgo_search import DDGS
 from livekit.agents import function_tool
 from jarvis_logger import setup_logger
+from jarvis_http import HTTP_ERRORS, http_client
 
 # Setup logging
 logger = setup_logger("JARVIS-ADVANCED")
@@ -62,12 +62,12 @@ async def download_images(query: str, count: int = 5, folder_name: str = "Downlo
                 file_name = f"{query.replace(' ', '_')}_{i}.{ext}"
                 file_path = os.path.join(target_dir, file_name)
 
-                response = await asyncio.to_thread(requests.get, url, timeout=10)
+                response = await http_client.get(url, timeout=10)
                 if response.status_code == 200:
                     with open(file_path, 'wb') as f:
                         f.write(response.content)
                     downloaded_count += 1
-            except (requests.RequestException, IOError, OSError) as e:
+            except (*HTTP_ERRORS, IOError, OSError) as e:
                 logger.warning("Failed to download image %d: %s", i, e)
 
         return {
@@ -80,7 +80,7 @@ async def download_images(query: str, count: int = 5, folder_name: str = "Downlo
                 f"karke '{target_dir}' mein save kar di hain, Sir Matloob."
             )
         }
-    except (requests.RequestException, IOError, OSError, ValueError, RuntimeError) as e:  # pylint: disable=broad-exception-caught
+    except (*HTTP_ERRORS, IOError, OSError, ValueError, RuntimeError) as e:  # pylint: disable=broad-exception-caught
         logger.exception("Error in download_images: %s", e)
         return {
             "status": "error",
@@ -0,0 +1,282 @@
+"""
+# jarvis_circuit.py
+Circuit breakers and health scoring for external providers.
+
+Each provider (Tavily, Google CSE, Gemini, Hugging Face, OpenWeather...) gets
+a breaker that tracks a rolling error rate and a latency EWMA. When a provider
+keeps failing, or reports an exhausted quota, its circuit opens and callers
+skip it immediately instead of waiting for another timeout. After a cooldown
+one probe request is let through (half-open); success closes the circuit,
+failure opens it again with a longer cooldown.
+"""
+
+import os
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+from jarvis_logger import setup_logger
+from jarvis_metrics import perf_stats
+
+logger = setup_logger("JARVIS-CIRCUIT")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Rolling window and trip threshold
+CIRCUIT_WINDOW = int(os.getenv("JARVIS_CIRCUIT_WINDOW", "20"))
+CIRCUIT_MIN_CALLS = int(os.getenv("JARVIS_CIRCUIT_MIN_CALLS", "4"))
+CIRCUIT_ERROR_RATE = float(os.getenv("JARVIS_CIRCUIT_ERROR_RATE", "0.5"))
+# Seconds an open circuit waits before a probe; doubles on failed probes
+CIRCUIT_COOLDOWN = float(os.getenv("JARVIS_CIRCUIT_COOLDOWN", "30"))
+CIRCUIT_MAX_COOLDOWN = 600.0
+# Quota/rate-limit errors will not clear quickly
+CIRCUIT_QUOTA_COOLDOWN = float(os.getenv("JARVIS_CIRCUIT_QUOTA_COOLDOWN", "300"))
+# Providers below this health score are tried after healthy ones
+DEGRADED_SCORE = 0.5
+
+_QUOTA_MARKERS = ("429", "resource_exhausted", "quota", "rate limit", "too many requests")
+
+
+# Query strings and user info carry API keys (e.g. Google CSE's ?key=...)
+_URL_RE = re.compile(r"(https?://)(?:[^/\s@]+@)?([^\s?#'\"]*)[^\s'\"]*")
+_SECRET_PARAM_RE = re.compile(r"\b((?:api[_-]?)?key|token|secret|password)=[^&\s'\"]+",
+                              re.IGNORECASE)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a call is refused because the provider's circuit is open."""
+
+
+def is_quota_error(error: Any) -> bool:
+    """True for rate-limit / exhausted-quota errors (HTTP 429, RESOURCE_EXHAUSTED...)."""
+    text = str(error).lower()
+    return any(marker in text for marker in _QUOTA_MARKERS)
+
+
+def redact_error(error: Any, limit: int = 200) -> str:
+    """
+    Error description safe to show in diagnostics: HTTP errors become their
+    class and status code, and URLs lose their query strings and credentials.
+    """
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None) if isinstance(error, Exception) else None
+    if isinstance(status, int):
+        return f"{type(error).__name__}: HTTP {status}"
+    text = _URL_RE.sub(r"\1\2", str(error))
+    return _SECRET_PARAM_RE.sub(r"\1=***", text)[:limit]
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open breaker with a rolling error rate and latency EWMA.
+    """
+
+    def __init__(self, name: str, window: int = CIRCUIT_WINDOW,
+                 min_calls: int = CIRCUIT_MIN_CALLS, error_rate: float = CIRCUIT_ERROR_RATE,
+                 cooldown: float = CIRCUIT_COOLDOWN, quota_cooldown: float = CIRCUIT_QUOTA_COOLDOWN,
+                 latency_alpha: float = 0.2, latency_budget: float = 5.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.min_calls = min_calls
+        self.error_rate_threshold = error_rate
+        self.base_cooldown = cooldown
+        self.quota_cooldown = quota_cooldown
+        self.latency_alpha = latency_alpha
+        self.latency_budget = latency_budget
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._outcomes: deque = deque(maxlen=window)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._cooldown = cooldown
+        self._probe_in_flight = False
+        self._latency_ewma: Optional[float] = None
+        self._last_error = ""
+        self._trips = 0
+
+    @property
+    def state(self) -> str:
+        """Current state; an open circuit past its cooldown reports half-open."""
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and self.clock() - self._opened_at >= self._cooldown:
+            self._state = HALF_OPEN
+        return self._state
+
+    def _error_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def allow(self) -> bool:
+        """
+        Whether a call may go through now. In half-open state only one
+        probe is allowed at a time.
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+        perf_stats.incr(f"circuit.{self.name}.rejected")
+        return False
+
+    def _observe_latency(self, latency: Optional[float]) -> None:
+        if latency is None:
+            return
+        if self._latency_ewma is None:
+            self._latency_ewma = latency
+        else:
+            self._latency_ewma += self.latency_alpha * (latency - self._latency_ewma)
+
+    def _trip(self, cooldown: float, reason: str) -> None:
+        self._state = OPEN
+        self._opened_at = self.clock()
+        self._cooldown = min(cooldown, CIRCUIT_MAX_COOLDOWN)
+        self._probe_in_flight = False
+        self._trips += 1
+        perf_stats.incr(f"circuit.{self.name}.opened")
+        logger.warning("Circuit for %s opened for %.0fs: %s", self.name, self._cooldown, reason)
+
+    def record_success(self, latency: Optional[float] = None) -> None:
+        """Records a successful call; a successful probe closes the circuit."""
+        with self._lock:
+            self._observe_latency(latency)
+            state = self._current_state()
+            if state == OPEN:
+                # A call that started before the trip; wait for a proper probe
+                return
+            if state == HALF_OPEN:
+                logger.info("Circuit for %s closed after successful probe", self.name)
+                self._outcomes.clear()
+                self._cooldown = self.base_cooldown
+                self._state = CLOSED
+                self._probe_in_flight = False
+            self._outcomes.append(True)
+
+    def record_failure(self, error: Any = "", latency: Optional[float] = None) -> None:
+        """Records a failed call and opens the circuit when warranted."""
+        quota = is_quota_error(error)
+        with self._lock:
+            self._observe_latency(latency)
+            self._outcomes.append(False)
+            self._last_error = redact_error(error)
+            state = self._current_state()
+            if state == OPEN:
+                return
+            if quota:
+                self._trip(max(self.quota_cooldown, self._cooldown), "quota exhausted")
+            elif state == HALF_OPEN:
+                self._trip(self._cooldown * 2, "probe failed")
+            elif (state == CLOSED and len(self._outcomes) >= self.min_calls
+                  and self._error_rate() >= self.error_rate_threshold):
+                self._trip(self.base_cooldown, f"error rate {self._error_rate():.0%}")
+
+    def release(self) -> None:
+        """Gives back a half-open probe slot without recording an outcome (e.g. cancelled)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def health_score(self) -> float:
+        """0.0 (open) .. 1.0; success rate discounted by latency relative to the budget."""
+        with self._lock:
+            if self._current_state() == OPEN:
+                return 0.0
+            score = 1.0 - self._error_rate()
+            if self._latency_ewma is not None:
+                score /= 1.0 + self._latency_ewma / self.latency_budget
+            return round(score, 3)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """State summary for diagnostics."""
+        with self._lock:
+            state = self._current_state()
+            retry_in = max(0.0, self._cooldown - (self.clock() - self._opened_at)) \
+                if state == OPEN else 0.0
+            info = {
+                "state": state,
+                "error_rate": round(self._error_rate(), 3),
+                "calls": len(self._outcomes),
+                "latency_ewma_s": round(self._latency_ewma, 3) if self._latency_ewma else None,
+                "trips": self._trips,
+                "retry_in_s": round(retry_in, 1),
+                "last_error": self._last_error,
+            }
+        info["health"] = self.health_score()
+        return info
+
+    async def call(self, fn: Callable[..., Awaitable[Any]], *args: Any,
+                   is_failure: Callable[[Any], Any] = lambda result: None, **kwargs: Any) -> Any:
+        """
+        Runs `fn` through the breaker. `is_failure(result)` returns a truthy
+        error description when a returned value should count as a failure.
+        Raises CircuitOpenError if the circuit is open.
+        """
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} is temporarily disabled (circuit open)")
+        started = time.perf_counter()
+        try:
+            result = await fn(*args, **kwargs)
+        except BaseException as e:
+            if isinstance(e, Exception):
+                self.record_failure(e, time.perf_counter() - started)
+            else:
+                # Cancellation says nothing about the provider's health
+                self.release()
+            raise
+        failure = is_failure(result)
+        if failure:
+            self.record_failure(failure, time.perf_counter() - started)
+        else:
+            self.record_success(time.perf_counter() - started)
+        return result
+
+
+class CircuitRegistry:
+    """
+    Named breakers plus health-based routing across providers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, name: str) -> CircuitBreaker:
+        """Returns the breaker for a provider, creating it on first use."""
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = CircuitBreaker(name)
+                self._breakers[name] = breaker
+            return breaker
+
+    def route(self, names: Iterable[str]) -> List[str]:
+        """
+        Filters out providers with open circuits and moves degraded ones
+        behind healthy ones, otherwise keeping the given priority order.
+        """
+        available = [name for name in names if self.get(name).state != OPEN]
+        healthy = [n for n in available if self.get(n).health_score() >= DEGRADED_SCORE]
+        return healthy + [n for n in available if n not in healthy]
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """State of every known breaker."""
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {name: breaker.snapshot() for name, breaker in sorted(breakers.items())}
+
+    def reset(self) -> None:
+        """Forgets all breakers."""
+        with self._lock:
+            self._breakers.clear()
+
+
+# Global Instance
+circuit_breakers = CircuitRegistry()
@@ -7,8 +7,8 @@ Detects errors and technical terms in the clipboard and suggests solutions.
 import asyncio
 import re
 import pyperclip
-from duckduckgo_search import DDGS
 from jarvis_logger import setup_logger
+from jarvis_search import search_duckduckgo
 
 # Setup logging
 logger = setup_logger("JARVIS-CLIPBOARD")
@@ -56,16 +56,14 @@ class ClipboardMonitor:
             query = f"{lines[-1]} solution" if len(
                 lines) > 0 else "technical error solution"
 
-            def _ddgs_search():
-                with DDGS() as ddgs:
-                    return list(ddgs.text(query, max_results=3))
-
-            results = await asyncio.to_thread(_ddgs_search)
+            # Recurring errors are answered from the search cache
+            response = await search_duckduckgo(query)
+            results = response.get("results") if response.get("status") == "success" else None
 
             if not results:
                 return "Maazrat Sir, is error ka koi fori solution nahi mila."
 
-            best_match = results[0]['body']
+            best_match = results[0]['snippet']
             return f"Sir, maine clipboard par ye error dekha hai. Iska aik mumkina solution ye hai: {best_match}"
         except (asyncio.TimeoutError, ConnectionError) as e:
             logger.error("Error searching for clipboard solution: %s", e)
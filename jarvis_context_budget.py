@@ -0,0 +1,104 @@
+"""
+# jarvis_context_budget.py
+Token budgeting for context injected into the realtime model.
+
+Uses a fast local approximation of token counts (no tokenizer download) and
+packs the most relevant snippets into a configurable budget.
+"""
+
+import math
+import os
+import re
+from typing import Iterable, List, Sequence, Tuple, Union
+from jarvis_logger import setup_logger
+
+logger = setup_logger("JARVIS-CONTEXT-BUDGET")
+
+# Tokens available for memories and plans injected on a single turn
+CONTEXT_TOKEN_BUDGET = int(os.getenv("JARVIS_CONTEXT_TOKEN_BUDGET", "600"))
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+# Sub-word tokenizers average roughly four characters per token on mixed
+# English / Roman Urdu text, with punctuation usually a token of its own.
+_CHARS_PER_TOKEN = 4
+_ELLIPSIS = "..."
+
+Candidate = Union[str, Tuple[str, float]]
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximates the model token count of `text`."""
+    if not text:
+        return 0
+    return sum(math.ceil(len(piece) / _CHARS_PER_TOKEN)
+               for piece in _TOKEN_RE.findall(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cuts `text` at the last whole piece that fits within `max_tokens`."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    limit = max_tokens - estimate_tokens(_ELLIPSIS)
+    used = 0
+    end = 0
+    for match in _TOKEN_RE.finditer(text):
+        cost = math.ceil(len(match.group()) / _CHARS_PER_TOKEN)
+        if used + cost > limit:
+            break
+        used += cost
+        end = match.end()
+    return text[:end].rstrip() + _ELLIPSIS if end else ""
+
+
+class ContextBudget:
+    """
+    Tracks a token budget for one turn and packs candidates into it.
+    """
+
+    def __init__(self, max_tokens: int = CONTEXT_TOKEN_BUDGET):
+        self.max_tokens = max_tokens
+        self.used = 0
+
+    @property
+    def remaining(self) -> int:
+        """Tokens still available."""
+        return max(0, self.max_tokens - self.used)
+
+    def reserve(self, text: str) -> bool:
+        """Claims budget for text that must be included; False if it does not fit."""
+        cost = estimate_tokens(text)
+        if cost > self.remaining:
+            return False
+        self.used += cost
+        return True
+
+    def pack(self, candidates: Iterable[Candidate]) -> List[str]:
+        """
+        Selects candidates by descending relevance score until the budget is
+        spent. Items that do not fit are skipped so smaller ones can still be
+        used; if not even the best item fits, it is truncated.
+        Plain strings are treated as score 0 and keep their order.
+        """
+        scored: List[Tuple[str, float]] = [
+            (c, 0.0) if isinstance(c, str) else (c[0], float(c[1]))
+            for c in candidates
+        ]
+        ranked: Sequence[Tuple[str, float]] = sorted(
+            (item for item in scored if item[0]), key=lambda item: -item[1])
+
+        packed: List[str] = []
+        for text, _ in ranked:
+            cost = estimate_tokens(text)
+            if cost <= self.remaining:
+                packed.append(text)
+                self.used += cost
+        if not packed and ranked and self.remaining > 0:
+            clipped = truncate_to_tokens(ranked[0][0], self.remaining)
+            if clipped:
+                packed.append(clipped)
+                self.used += estimate_tokens(clipped)
+
+        if len(packed) < len(ranked):
+            logger.info("Context budget kept %d/%d snippets (%d/%d tokens).",
+                        len(packed), len(ranked), self.used, self.max_tokens)
+        return packed
@@ -0,0 +1,229 @@
+"""
+# jarvis_crawler.py
+Polite crawl scheduling for JARVIS web research.
+
+Every page fetch goes through one scheduler that enforces a global
+concurrency limit, a per-host concurrency limit and a minimum delay between
+requests to the same host (raised to the site's robots.txt Crawl-delay).
+Transient failures (timeouts, connection errors, 429 and 5xx) are retried
+with exponential backoff and full jitter, honouring Retry-After. robots.txt
+is fetched once per host and cached.
+"""
+
+import asyncio
+import os
+import random
+import time
+from typing import Any, Awaitable, Callable, Collection, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+import httpx
+from jarvis_http import HTTP_ERRORS, http_client
+from jarvis_logger import setup_logger
+from jarvis_metrics import perf_stats
+from jarvis_passages import tokenize
+from jarvis_ratelimit import SingleFlight
+from jarvis_search_cache import normalize_query
+
+logger = setup_logger("JARVIS-CRAWLER")
+
+# Pages fetched at once across all hosts
+CRAWL_CONCURRENCY = int(os.getenv("JARVIS_CRAWL_CONCURRENCY", "6"))
+# Pages fetched at once from one host
+CRAWL_PER_HOST = int(os.getenv("JARVIS_CRAWL_PER_HOST", "2"))
+# Minimum seconds between request starts to the same host
+CRAWL_HOST_DELAY = float(os.getenv("JARVIS_CRAWL_HOST_DELAY", "1.0"))
+# Longest robots.txt Crawl-delay that is honoured
+MAX_CRAWL_DELAY = 10.0
+CRAWL_RETRIES = 2
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+ROBOTS_TTL = 24 * 3600.0
+ROBOTS_AGENT = "JARVIS"
+# Links to files that are not worth scraping as research pages
+SKIP_LINK_SUFFIXES = (
+    ".pdf", ".jpg", ".jpeg", ".png", ".gif", ".svg", ".webp", ".mp3", ".mp4", ".zip",
+    ".exe", ".apk", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx",
+)
+
+
+class CrawlDisallowedError(RuntimeError):
+    """Raised when robots.txt disallows fetching a URL."""
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_MAX,
+                  rng: Callable[[float, float], float] = random.uniform) -> float:
+    """Exponential backoff with full jitter for the given 0-based retry attempt."""
+    return rng(0.0, min(cap, base * 2 ** attempt))
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Timeouts, connection errors, 429 and 5xx are worth retrying; other errors are not."""
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(error, (*HTTP_ERRORS, asyncio.TimeoutError))
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    if not isinstance(error, httpx.HTTPStatusError):
+        return None
+    try:
+        return float(error.response.headers.get("retry-after", ""))
+    except ValueError:
+        return None
+
+
+def select_links(query: str, links: Sequence[Tuple[str, str]], limit: int,
+                 exclude: Collection[str] = ()) -> List[str]:
+    """
+    The `limit` links whose anchor text and URL share the most words with
+    the query, in page order on ties. Links sharing no words are skipped.
+    """
+    terms = set(tokenize(normalize_query(query)))
+    scored = []
+    for position, (url, text) in enumerate(links):
+        if url in exclude or urlsplit(url).path.lower().endswith(SKIP_LINK_SUFFIXES):
+            continue
+        overlap = len(terms & set(tokenize(f"{text} {urlsplit(url).path}")))
+        if overlap:
+            scored.append((-overlap, position, url))
+    return [url for _, _, url in sorted(scored)[:limit]]
+
+
+class RobotsCache:
+    """
+    robots.txt rules per origin, fetched on first use and kept for `ttl` seconds.
+    """
+
+    def __init__(self, ttl: float = ROBOTS_TTL, agent: str = ROBOTS_AGENT, timeout: float = 5.0):
+        self.ttl = ttl
+        self.agent = agent
+        self.timeout = timeout
+        self._rules: Dict[str, Tuple[float, RobotFileParser]] = {}
+        self._inflight = SingleFlight()
+
+    async def _fetch(self, origin: str) -> RobotFileParser:
+        parser = RobotFileParser(f"{origin}/robots.txt")
+        try:
+            response = await http_client.get(f"{origin}/robots.txt", timeout=self.timeout,
+                                             follow_redirects=True)
+            if response.status_code in (401, 403):
+                parser.disallow_all = True
+            elif response.status_code >= 400:
+                parser.allow_all = True
+            else:
+                parser.parse(response.text.splitlines())
+        except HTTP_ERRORS as e:
+            logger.debug("robots.txt unavailable for %s: %s", origin, e)
+            parser.allow_all = True
+        perf_stats.incr("crawl.robots_fetched")
+        self._rules[origin] = (time.monotonic(), parser)
+        return parser
+
+    async def rules(self, url: str) -> RobotFileParser:
+        """The robots.txt rules that apply to `url`."""
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc.lower()}"
+        cached = self._rules.get(origin)
+        if cached is not None and time.monotonic() - cached[0] < self.ttl:
+            return cached[1]
+        parser, _ = await self._inflight.do(origin, lambda: self._fetch(origin))
+        return parser
+
+    async def allowed(self, url: str) -> bool:
+        """Whether robots.txt lets this crawler fetch `url`."""
+        return (await self.rules(url)).can_fetch(self.agent, url)
+
+    async def crawl_delay(self, url: str) -> float:
+        """The host's Crawl-delay for this crawler, or 0."""
+        delay = (await self.rules(url)).crawl_delay(self.agent)
+        return min(float(delay), MAX_CRAWL_DELAY) if delay else 0.0
+
+    def clear(self) -> None:
+        """Forgets every cached robots.txt."""
+        self._rules.clear()
+
+
+class _HostState:
+    def __init__(self, per_host: int):
+        self.slots = asyncio.Semaphore(per_host)
+        self.turn = asyncio.Lock()
+        self.next_start = 0.0
+
+
+class CrawlScheduler:
+    """
+    Runs fetches under global and per-host limits with politeness delays,
+    robots.txt checks and jittered exponential backoff.
+    """
+
+    def __init__(self, concurrency: int = CRAWL_CONCURRENCY, per_host: int = CRAWL_PER_HOST,
+                 host_delay: float = CRAWL_HOST_DELAY, retries: int = CRAWL_RETRIES,
+                 robots: Optional[RobotsCache] = None):
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.host_delay = host_delay
+        self.retries = retries
+        self.robots = robots
+        self._slots = asyncio.Semaphore(concurrency)
+        self._hosts: Dict[str, _HostState] = {}
+
+    def _host(self, host: str) -> _HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = _HostState(self.per_host)
+            self._hosts[host] = state
+        return state
+
+    async def _wait_turn(self, state: _HostState, delay: float) -> None:
+        async with state.turn:
+            wait = state.next_start - time.monotonic()
+            if wait > 0:
+                perf_stats.observe("crawl.politeness_wait", wait)
+                await asyncio.sleep(wait)
+            state.next_start = time.monotonic() + delay
+
+    async def run(self, url: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Calls `fetch` for `url` once a slot and the host's turn are free,
+        retrying transient failures. Raises CrawlDisallowedError when
+        robots.txt forbids the URL.
+        """
+        delay = self.host_delay
+        if self.robots is not None:
+            if not await self.robots.allowed(url):
+                perf_stats.incr("crawl.disallowed")
+                raise CrawlDisallowedError(f"robots.txt disallows {url}")
+            delay = max(delay, await self.robots.crawl_delay(url))
+
+        state = self._host(urlsplit(url).netloc.lower())
+        async with state.slots:
+            attempt = 0
+            while True:
+                await self._wait_turn(state, delay)
+                async with self._slots:
+                    try:
+                        return await fetch()
+                    except Exception as e:  # pylint: disable=broad-exception-caught
+                        if attempt >= self.retries or not is_retryable(e):
+                            raise
+                        wait = backoff_delay(attempt)
+                        retry_after = _retry_after(e)
+                        if retry_after is not None:
+                            wait = min(max(wait, retry_after), BACKOFF_MAX)
+                        logger.info("Retrying %s in %.1fs (%s)", url, wait, e)
+                perf_stats.incr("crawl.retry")
+                await asyncio.sleep(wait)
+                attempt += 1
+
+    def reset(self) -> None:
+        """Drops per-host state and limits (e.g. for a new event loop)."""
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._hosts.clear()
+        if self.robots is not None:
+            self.robots.clear()
+
+
+# Global Instance
+crawl_scheduler = CrawlScheduler(robots=RobotsCache())
@@ -10,9 +10,11 @@ import os
 import sys
 import json
 from typing import Dict, Any
-import requests
 from dotenv import load_dotenv
 from jarvis_logger import setup_logger
+from jarvis_circuit import OPEN, circuit_breakers
+from jarvis_http import HTTP_ERRORS, http_client
+from jarvis_ratelimit import rate_limits
 
 # Setup logging
 logger = setup_logger("JARVIS-DIAGNOSTICS")
@@ -71,12 +73,12 @@ class SystemCheck:
         async def _check_endpoint(name: str, url: str) -> tuple:
             try:
                 # Simple HEAD request to verify endpoint is reachable
-                response = await asyncio.to_thread(requests.head, url, timeout=5)
+                response = await http_client.head(url, timeout=5)
                 if response.status_code < 500:
                     return name, "✅ Reachable"
                 else:
                     return name, f"⚠️ Server Error ({response.status_code})"
-            except (requests.RequestException, asyncio.TimeoutError):
+            except (*HTTP_ERRORS, asyncio.TimeoutError):
                 return name, "❌ Unreachable (Check Internet)"
 
         tasks = [_check_endpoint(name, url) for name, url in endpoints.items()]
@@ -108,6 +110,12 @@ class SystemCheck:
             "environment_variables": env_results,
             "dependencies": dep_results,
             "api_connectivity": api_results,
+            # Only what the report shows; error text never reaches the model
+            "provider_circuits": {
+                name: {key: info[key] for key in ("state", "health", "retry_in_s")}
+                for name, info in circuit_breakers.snapshot().items()
+            },
+            "rate_limits": rate_limits.stats(),
             "summary": "Elite Status" if health_score > 90 else "Action Required"
         }
 
@@ -137,6 +145,15 @@ def format_health_report(report: Dict[str, Any]) -> str:
     for name, status in report['api_connectivity'].items():
         msg += f"- {name}: {status}\n"
 
+    circuits = report.get('provider_circuits') or {}
+    if circuits:
+        msg += "\n⚡ **Provider Circuits:**\n"
+        for name, info in circuits.items():
+            line = f"- {name}: {info['state']} (health {info['health']:.2f}"
+            if info['state'] == OPEN:
+                line += f", retry in {info['retry_in_s']:.0f}s"
+            msg += line + ")\n"
+
     return msg
 
 
@@ -156,6 +173,11 @@ try:
             urdu_summary += "Kuch masle mile hain jinhe theek karne ki zaroorat hai."
         else:
             urdu_summary += "Saare systems bilkul theek kaam kar rahe hain."
+        open_circuits = [name for name, info in report['provider_circuits'].items()
+                         if info['state'] == OPEN]
+        if open_circuits:
+            urdu_summary += (f" Yeh providers abhi temporarily band hain: "
+                             f"{', '.join(open_circuits)}.")
 
         return {
             "status": "success",
@@ -0,0 +1,244 @@
+"""
+# jarvis_doc_chunks.py
+Chunked semantic retrieval over local documents for JARVIS.
+
+Every page (PDF) or section (DOCX) from the extracted-text cache is split
+into chunks, embedded locally with the same MiniLM model as vector memory
+(in batches), and stored in a persistent Chroma collection keyed by the
+file version. A question is answered from the top-k chunks across one or
+more documents, packed into a token budget, instead of each document's
+first few pages. When the embedding model is unavailable, chunks are
+ranked with BM25 instead.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from jarvis_context_budget import ContextBudget
+from jarvis_doc_text_cache import MAX_DOCUMENT_CHARS, DocTextCache, doc_text_cache
+from jarvis_logger import setup_logger
+from jarvis_metrics import perf_stats
+from jarvis_passages import BM25, chunk_text, tokenize
+
+logger = setup_logger("JARVIS-DOC-CHUNKS")
+logging.getLogger("chromadb").setLevel(logging.ERROR)
+
+DOC_CHUNKS_DB_PATH = os.path.join(os.getcwd(), "chroma_db")
+DOC_CHUNKS_COLLECTION = "jarvis_doc_chunks"
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+# MiniLM reads about 256 tokens, so chunks stay near 1000 characters
+CHUNK_CHARS = 1000
+EMBED_BATCH_SIZE = 32
+# Chunks retrieved per document
+DOC_TOP_K = 8
+# Tokens of document text sent to the LLM for one question
+DOC_TOKEN_BUDGET = int(os.getenv("JARVIS_DOC_TOKEN_BUDGET", "3000"))
+# Larger documents are embedded in the background; the first answer uses BM25
+FOREGROUND_EMBED_CHUNKS = 200
+
+_BASE_CHROMA_ERRORS = (ImportError, ValueError, KeyError, RuntimeError, OSError, AttributeError)
+
+Chunk = Dict[str, Any]
+
+
+def chroma_errors() -> Tuple[type, ...]:
+    """Exceptions raised by Chroma or the embedding model; chromadb is imported lazily."""
+    try:
+        from chromadb.errors import ChromaError  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return _BASE_CHROMA_ERRORS
+    return (*_BASE_CHROMA_ERRORS, ChromaError)
+
+
+def chunk_pages(pages: Sequence[str], max_chars: int = CHUNK_CHARS) -> List[Tuple[int, str]]:
+    """(page number, text) chunks of a document's pages, in reading order."""
+    return [(number, chunk) for number, page in enumerate(pages)
+            for chunk in chunk_text(page or "", max_chars)]
+
+
+class DocumentChunkIndex:
+    """
+    Persistent per-chunk embeddings of local documents with top-k retrieval.
+    """
+
+    def __init__(self, path: str = DOC_CHUNKS_DB_PATH, collection_name: str = DOC_CHUNKS_COLLECTION,
+                 embedding_function: Optional[Any] = None,
+                 text_cache: Optional[DocTextCache] = None):
+        self.path = path
+        self.collection_name = collection_name
+        self.embedding_func = embedding_function
+        self.text_cache = text_cache or doc_text_cache
+        self.client = None
+        self.collection = None
+        self._failed = False
+        self._lock = threading.Lock()
+        self._init_lock = threading.Lock()
+        self._pending: Dict[str, asyncio.Task] = {}
+
+    def _ensure_initialized(self) -> bool:
+        """Opens the collection and the embedding model on first use."""
+        with self._init_lock:
+            return self._initialize()
+
+    def _initialize(self) -> bool:
+        if self.collection is not None:
+            return True
+        if self._failed:
+            return False
+        try:
+            import chromadb  # pylint: disable=import-outside-toplevel
+            if self.embedding_func is None:
+                from chromadb.utils.embedding_functions import (  # pylint: disable=import-outside-toplevel
+                    SentenceTransformerEmbeddingFunction)
+                self.embedding_func = SentenceTransformerEmbeddingFunction(model_name=EMBEDDING_MODEL)
+            self.client = chromadb.PersistentClient(path=self.path)
+            self.collection = self.client.get_or_create_collection(
+                name=self.collection_name, embedding_function=None,
+                metadata={"hnsw:space": "cosine"})
+            return True
+        except chroma_errors() as e:
+            logger.warning("Document chunk index unavailable, using keyword ranking: %s", e)
+            self._failed = True
+            self.client = None
+            self.collection = None
+            return False
+
+    def _embed(self, texts: Sequence[str]) -> List[List[float]]:
+        vectors: List[List[float]] = []
+        for start in range(0, len(texts), EMBED_BATCH_SIZE):
+            batch = list(texts[start:start + EMBED_BATCH_SIZE])
+            vectors.extend([float(x) for x in v] for v in self.embedding_func(batch))
+        return vectors
+
+    def is_indexed(self, key: str) -> bool:
+        """True when this file version's chunks are embedded."""
+        if not self._ensure_initialized():
+            return False
+        with self._lock:
+            return bool(self.collection.get(where={"key": key}, limit=1)["ids"])
+
+    def index_document(self, path: str, key: str, pages: Sequence[str]) -> int:
+        """Embeds and stores a file version's chunks, replacing older versions. Returns the count."""
+        if not self._ensure_initialized() or self.is_indexed(key):
+            return 0
+        chunks = chunk_pages(pages)
+        started = time.perf_counter()
+        vectors = self._embed([text for _, text in chunks]) if chunks else []
+        with self._lock:
+            self.collection.delete(where={"path": path})
+            for start in range(0, len(chunks), EMBED_BATCH_SIZE):
+                batch = chunks[start:start + EMBED_BATCH_SIZE]
+                self.collection.upsert(
+                    ids=[f"{key}:{start + i}" for i in range(len(batch))],
+                    embeddings=vectors[start:start + len(batch)],
+                    documents=[text for _, text in batch],
+                    metadatas=[{"key": key, "path": path, "page": page, "position": start + i}
+                               for i, (page, _) in enumerate(batch)])
+        elapsed = time.perf_counter() - started
+        perf_stats.observe("doc_chunks.embed", elapsed)
+        logger.info("🧩 Embedded %d chunks of %s (%.1fs)", len(chunks), os.path.basename(path),
+                    elapsed)
+        return len(chunks)
+
+    async def on_extracted(self, path: str, key: str, pages: List[str]) -> None:
+        """Text-cache listener: embeds documents pre-extracted in the background."""
+        try:
+            await asyncio.to_thread(self.index_document, path, key, pages)
+        except chroma_errors() as e:
+            logger.warning("Embedding %s failed: %s", path, e)
+
+    def _embed_later(self, path: str, key: str, pages: List[str]) -> None:
+        task = self._pending.get(key)
+        if task is None or task.done():
+            self._pending[key] = asyncio.create_task(self.on_extracted(path, key, pages))
+
+    def _query(self, question_vector: List[float], key: str, k: int) -> List[Chunk]:
+        with self._lock:
+            results = self.collection.query(query_embeddings=[question_vector], n_results=k,
+                                            where={"key": key})
+        return [{"path": meta["path"], "page": meta["page"], "position": meta["position"],
+                 "text": text, "score": 1.0 - float(distance)}
+                for text, meta, distance in zip(results["documents"][0], results["metadatas"][0],
+                                                results["distances"][0])]
+
+    @staticmethod
+    def _keyword_rank(question: str, path: str, chunks: List[Tuple[int, str]], k: int) -> List[Chunk]:
+        scores = BM25([tokenize(text) for _, text in chunks]).scores(tokenize(question))
+        top = max(scores) or 1.0
+        ranked = sorted(range(len(chunks)), key=lambda i: (-scores[i], i))[:k]
+        # Scaled to 0..1 so documents ranked either way can be merged
+        return [{"path": path, "page": chunks[i][0], "position": i, "text": chunks[i][1],
+                 "score": scores[i] / top} for i in ranked]
+
+    async def retrieve(self, question: str, paths: Sequence[str], k: int = DOC_TOP_K) -> List[Chunk]:
+        """
+        The top `k` chunks of each document for the question, best first,
+        with every document's best chunk ahead of the rest.
+        """
+        semantic = await asyncio.to_thread(self._ensure_initialized)
+        question_vector = None
+        per_document: List[List[Chunk]] = []
+        for path in dict.fromkeys(paths):
+            # Only the leading pages are parsed now; the pre-extraction worker
+            # finishes the rest and embeds it for later questions
+            key, pages = await self.text_cache.pages(path, MAX_DOCUMENT_CHARS)
+            complete = await asyncio.to_thread(self.text_cache.is_complete, key)
+            if not complete and not self.text_cache.schedule(path):
+                # No worker to finish it, so the whole document is parsed now
+                key, pages = await self.text_cache.pages(path)
+                complete = True
+            chunks = chunk_pages(pages)
+            if not chunks:
+                continue
+            # Partly extracted documents are ranked by keywords until embedded
+            semantic_doc = semantic and complete
+            if semantic_doc and not await asyncio.to_thread(self.is_indexed, key):
+                if len(chunks) <= FOREGROUND_EMBED_CHUNKS:
+                    await asyncio.to_thread(self.index_document, path, key, pages)
+                else:
+                    self._embed_later(path, key, pages)
+            if semantic_doc and await asyncio.to_thread(self.is_indexed, key):
+                if question_vector is None:
+                    question_vector = (await asyncio.to_thread(self._embed, [question]))[0]
+                ranked = await asyncio.to_thread(self._query, question_vector, key,
+                                                 min(k, len(chunks)))
+                perf_stats.incr("doc_chunks.semantic")
+            else:
+                ranked = self._keyword_rank(question, path, chunks, k)
+                perf_stats.incr("doc_chunks.keyword")
+            per_document.append(sorted(ranked, key=lambda c: -c["score"]))
+
+        leaders = [chunks[0] for chunks in per_document]
+        rest = sorted((c for chunks in per_document for c in chunks[1:]), key=lambda c: -c["score"])
+        return leaders + rest
+
+    async def build_context(self, question: str, paths: Sequence[str],
+                            max_tokens: int = DOC_TOKEN_BUDGET, k: int = DOC_TOP_K) -> str:
+        """
+        Document payload for the LLM: the retrieved chunks that fit
+        `max_tokens`, grouped by document in page order.
+        """
+        budget = ContextBudget(max_tokens)
+        headers = {path: f"--- DOCUMENT {n + 1}: {os.path.basename(path)} ---"
+                   for n, path in enumerate(dict.fromkeys(paths))}
+        selected: Dict[str, List[Chunk]] = {}
+        for chunk in await self.retrieve(question, paths, k):
+            body = f"[Page {chunk['page'] + 1}] {chunk['text']}"
+            header = "" if chunk["path"] in selected else headers[chunk["path"]]
+            if not budget.reserve(f"{header}\n{body}" if header else body):
+                continue
+            selected.setdefault(chunk["path"], []).append(chunk)
+        blocks = []
+        for path, header in headers.items():
+            if path in selected:
+                chunks = sorted(selected[path], key=lambda c: c["position"])
+                body = "\n\n".join(f"[Page {c['page'] + 1}] {c['text']}" for c in chunks)
+                blocks.append(f"{header}\n{body}\n")
+        return "\n".join(blocks)
+
+
+# Global Instance
+doc_chunk_index = DocumentChunkIndex()
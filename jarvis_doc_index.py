@@ -0,0 +1,286 @@
+"""
+# jarvis_doc_index.py
+Persistent, incremental index of local documents for JARVIS.
+
+PDF and DOCX paths are stored with their size and mtime in SQLite
+(conversations/cache/doc_index.sqlite3), so the file list survives restarts.
+Rescans walk the tree with os.scandir but only list directories whose own
+mtime changed since the last scan: adding, removing or renaming an entry
+updates the parent directory's mtime, so an unchanged directory needs one
+stat() instead of a listing. Directories modified within the last couple of
+seconds of a scan are listed again next time, because a change in the same
+timestamp tick would otherwise go unnoticed. While jarvis_fs_watcher watches
+a root, its events are applied as they arrive and rescans become a rare
+reconciliation.
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from jarvis_logger import setup_logger
+from jarvis_metrics import perf_stats
+
+logger = setup_logger("JARVIS-DOC-INDEX")
+
+DOC_INDEX_PATH = os.path.join("conversations", "cache", "doc_index.sqlite3")
+DOC_EXTENSIONS = (".pdf", ".docx")
+# Directories changed this recently (seconds) are not trusted as unchanged
+RACY_WINDOW = 2.0
+
+
+def _root_key(root: str) -> str:
+    return os.path.normcase(os.path.abspath(root))
+
+
+def _subtree_range(root: str) -> Tuple[str, str]:
+    """Bounds for `path >= lo AND path < hi` matching everything below `root`."""
+    prefix = root if root.endswith(os.sep) else root + os.sep
+    return prefix, prefix[:-1] + chr(ord(os.sep) + 1)
+
+
+class DocumentIndex:
+    """
+    SQLite-backed document index with directory-mtime incremental rescans.
+    """
+
+    def __init__(self, path: str = DOC_INDEX_PATH, extensions: Sequence[str] = DOC_EXTENSIONS,
+                 racy_window: float = RACY_WINDOW):
+        self.path = path
+        self.extensions = tuple(ext.lower() for ext in extensions)
+        self.racy_window = racy_window
+        self._db_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._files_cache: Dict[Tuple[str, ...], List[str]] = {}
+        self._scan_lock: Optional[asyncio.Lock] = None
+        self._listeners: List[Callable[[List[str]], None]] = []
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript(
+                "CREATE TABLE IF NOT EXISTS dirs ("
+                "path TEXT PRIMARY KEY, parent TEXT, mtime REAL, scanned_at REAL NOT NULL);"
+                "CREATE INDEX IF NOT EXISTS dirs_parent ON dirs (parent);"
+                "CREATE TABLE IF NOT EXISTS files ("
+                "path TEXT PRIMARY KEY, dir TEXT NOT NULL, size INTEGER NOT NULL, "
+                "mtime REAL NOT NULL);"
+                "CREATE INDEX IF NOT EXISTS files_dir ON files (dir);"
+                "CREATE TABLE IF NOT EXISTS roots (path TEXT PRIMARY KEY, scanned_at REAL NOT NULL);")
+            self._conn.commit()
+        return self._conn
+
+    def _list_dir(self, directory: str) -> Tuple[List[str], Dict[str, Tuple[int, float]]]:
+        subdirs: List[str] = []
+        docs: Dict[str, Tuple[int, float]] = {}
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.name.lower().endswith(self.extensions) and entry.is_file():
+                        stat = entry.stat()
+                        docs[entry.path] = (stat.st_size, stat.st_mtime)
+                except OSError:
+                    continue
+        return subdirs, docs
+
+    def _scan_root(self, conn: sqlite3.Connection, root: str, stats: Dict[str, int],
+                   parent: Optional[str] = None) -> None:
+        lo, hi = _subtree_range(root)
+        known = {path: (parent, mtime) for path, parent, mtime in conn.execute(
+            "SELECT path, parent, mtime FROM dirs WHERE path = ? OR (path >= ? AND path < ?)",
+            (root, lo, hi))}
+        children: Dict[str, List[str]] = defaultdict(list)
+        for path, (parent, _) in known.items():
+            if parent is not None:
+                children[parent].append(path)
+
+        started = time.time()
+        seen = set()
+        stack: List[Tuple[str, Optional[str]]] = [(root, parent)]
+        while stack:
+            directory, parent = stack.pop()
+            try:
+                dir_mtime = os.stat(directory).st_mtime
+            except OSError:
+                continue
+            seen.add(directory)
+            stored = known.get(directory)
+            if stored is not None and stored[1] is not None and stored[1] == dir_mtime:
+                stats["dirs_skipped"] += 1
+                stack.extend((child, directory) for child in children.get(directory, ()))
+                continue
+
+            try:
+                subdirs, docs = self._list_dir(directory)
+            except OSError as e:
+                logger.debug("Cannot list %s: %s", directory, e)
+                continue
+            stats["dirs_scanned"] += 1
+            existing = {row[0] for row in conn.execute(
+                "SELECT path FROM files WHERE dir = ?", (directory,))}
+            removed = existing - docs.keys()
+            if removed:
+                conn.executemany("DELETE FROM files WHERE path = ?", ((p,) for p in removed))
+                stats["files_removed"] += len(removed)
+            stats["files_added"] += len(docs.keys() - existing)
+            conn.executemany(
+                "INSERT OR REPLACE INTO files (path, dir, size, mtime) VALUES (?, ?, ?, ?)",
+                ((path, directory, size, mtime) for path, (size, mtime) in docs.items()))
+            # A change within the racy window could share this mtime; rescan next time
+            trusted = dir_mtime if started - dir_mtime > self.racy_window else None
+            conn.execute(
+                "INSERT OR REPLACE INTO dirs (path, parent, mtime, scanned_at) VALUES (?, ?, ?, ?)",
+                (directory, parent, trusted, started))
+            stack.extend((sub, directory) for sub in subdirs)
+
+        gone = [path for path in known if path not in seen]
+        if gone:
+            conn.executemany("DELETE FROM dirs WHERE path = ?", ((p,) for p in gone))
+            before = conn.total_changes
+            conn.executemany("DELETE FROM files WHERE dir = ?", ((p,) for p in gone))
+            stats["files_removed"] += conn.total_changes - before
+
+    def scan(self, roots: Iterable[str]) -> Dict[str, int]:
+        """
+        Brings the index up to date for `roots`; returns counters for
+        directories listed/skipped and files added/removed.
+        """
+        stats = {"dirs_scanned": 0, "dirs_skipped": 0, "files_added": 0, "files_removed": 0}
+        started = time.perf_counter()
+        with self._db_lock:
+            conn = self._db()
+            for root in roots:
+                if os.path.isdir(root):
+                    scanned_at = time.time()
+                    self._scan_root(conn, _root_key(root), stats)
+                    conn.execute("INSERT OR REPLACE INTO roots (path, scanned_at) VALUES (?, ?)",
+                                 (_root_key(root), scanned_at))
+            conn.commit()
+        if stats["files_added"] or stats["files_removed"]:
+            self._files_cache.clear()
+        elapsed = time.perf_counter() - started
+        perf_stats.observe("doc_index.scan", elapsed)
+        logger.info("📂 Document index scan: %d dirs listed, %d unchanged, +%d/-%d files (%.2fs)",
+                    stats["dirs_scanned"], stats["dirs_skipped"], stats["files_added"],
+                    stats["files_removed"], elapsed)
+        return stats
+
+    def _forget(self, conn: sqlite3.Connection, path: str, stats: Dict[str, int]) -> None:
+        """Drops a file, or a directory and everything below it."""
+        lo, hi = _subtree_range(path)
+        before = conn.total_changes
+        conn.execute("DELETE FROM files WHERE path = ? OR (path >= ? AND path < ?)", (path, lo, hi))
+        stats["files_removed"] += conn.total_changes - before
+        conn.execute("DELETE FROM dirs WHERE path = ? OR (path >= ? AND path < ?)", (path, lo, hi))
+
+    def _note(self, conn: sqlite3.Connection, path: str, is_directory: bool,
+              stats: Dict[str, int]) -> bool:
+        """Indexes a created or changed entry as it is on disk now; True for a document."""
+        if is_directory:
+            if os.path.isdir(path) and not os.path.islink(path):
+                self._scan_root(conn, path, stats, parent=os.path.dirname(path))
+            return False
+        if not path.lower().endswith(self.extensions):
+            return False
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        if not os.path.isfile(path):
+            return False
+        before = conn.execute("SELECT 1 FROM files WHERE path = ?", (path,)).fetchone()
+        conn.execute("INSERT OR REPLACE INTO files (path, dir, size, mtime) VALUES (?, ?, ?, ?)",
+                     (path, os.path.dirname(path), stat.st_size, stat.st_mtime))
+        if before is None:
+            stats["files_added"] += 1
+        return True
+
+    def add_listener(self, callback: Callable[[List[str]], None]) -> None:
+        """
+        Calls `callback` with the documents created or modified by each batch
+        of watcher events (not with those found by rescans).
+        """
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def apply_events(self, events: Sequence[Tuple[str, str, Optional[str], bool]]) -> None:
+        """
+        Applies filesystem watcher events (kind, path, dest, is_directory) in
+        order. Created and moved-in directories are scanned; the parent
+        directories keep their old mtimes, so the next rescan relists them.
+        """
+        stats = {"dirs_scanned": 0, "dirs_skipped": 0, "files_added": 0, "files_removed": 0}
+        changed: List[str] = []
+        with self._db_lock:
+            conn = self._db()
+            for kind, path, dest, is_directory in events:
+                if kind in ("deleted", "moved"):
+                    self._forget(conn, path, stats)
+                target = dest if kind == "moved" else path
+                if (kind == "moved" and dest) or kind == "created" or (
+                        kind == "modified" and not is_directory):
+                    if self._note(conn, target, is_directory, stats):
+                        changed.append(target)
+            conn.commit()
+        if changed:
+            for callback in self._listeners:
+                callback(list(dict.fromkeys(changed)))
+        if stats["files_added"] or stats["files_removed"]:
+            self._files_cache.clear()
+            logger.debug("Document index events: +%d/-%d files",
+                         stats["files_added"], stats["files_removed"])
+
+    def last_scanned(self, root: str) -> Optional[float]:
+        """Wall-clock time of the last scan of `root`, or None."""
+        with self._db_lock:
+            row = self._db().execute("SELECT scanned_at FROM roots WHERE path = ?",
+                                     (_root_key(root),)).fetchone()
+        return row[0] if row else None
+
+    def files(self, roots: Iterable[str]) -> List[str]:
+        """Indexed document paths below `roots`."""
+        key = tuple(sorted(_root_key(root) for root in roots))
+        cached = self._files_cache.get(key)
+        if cached is not None:
+            return cached
+        paths: List[str] = []
+        with self._db_lock:
+            conn = self._db()
+            for root in key:
+                lo, hi = _subtree_range(root)
+                paths.extend(row[0] for row in conn.execute(
+                    "SELECT path FROM files WHERE path >= ? AND path < ?", (lo, hi)))
+        self._files_cache[key] = paths
+        return paths
+
+    async def refresh(self, roots: Sequence[str], max_age: float = 0.0) -> List[str]:
+        """
+        Rescans roots last scanned more than `max_age` seconds ago (one scan
+        at a time) and returns the indexed paths.
+        """
+        if self._scan_lock is None:
+            self._scan_lock = asyncio.Lock()
+        async with self._scan_lock:
+            now = time.time()
+            stale = [root for root in roots
+                     if now - (await asyncio.to_thread(self.last_scanned, root) or 0.0) >= max_age]
+            if stale:
+                await asyncio.to_thread(self.scan, stale)
+        return await asyncio.to_thread(self.files, roots)
+
+    def close(self) -> None:
+        """Closes the SQLite connection."""
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# Global Instance
+doc_index = DocumentIndex()
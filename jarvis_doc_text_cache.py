@@ -0,0 +1,396 @@
+"""
+# jarvis_doc_text_cache.py
+Extracted-text cache for local PDF and DOCX documents.
+
+Parsing a large PDF with pypdf takes seconds, so extracted text is stored per
+page, zlib-compressed, in SQLite (conversations/cache/doc_text.sqlite3). The
+key is a hash of (path, size, mtime): an edited file gets a new key and its
+old text is dropped. Questions only need the first MAX_DOCUMENT_CHARS, so a
+first extraction stops there and the background worker finishes the rest,
+along with recently used and newly discovered documents. PDF parsing runs in
+a worker process so it does not hold the event loop's GIL.
+"""
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Awaitable, Callable, Iterable, List, Optional, Set, Tuple
+from docx import Document
+from docx.opc.exceptions import OpcError
+from pypdf import PdfReader
+from pypdf.errors import PyPdfError
+from jarvis_logger import setup_logger
+from jarvis_metrics import perf_stats
+
+logger = setup_logger("JARVIS-DOC-TEXT")
+
+DOC_TEXT_CACHE_PATH = os.path.join("conversations", "cache", "doc_text.sqlite3")
+# Total size of compressed text before least recently used documents are evicted
+DOC_TEXT_CACHE_MAX_BYTES = int(float(os.getenv("JARVIS_DOC_TEXT_CACHE_MB", "100")) * 1024 * 1024)
+# Characters of a document handed to the LLM
+MAX_DOCUMENT_CHARS = 15000
+# DOCX files have no pages; paragraphs are grouped into sections of this size
+DOCX_SECTION_CHARS = 3000
+# Worker processes for PDF parsing (0 parses in a thread)
+DOC_EXTRACT_WORKERS = int(os.getenv("JARVIS_DOC_EXTRACT_WORKERS", "1"))
+PRE_EXTRACT_QUEUE_SIZE = 64
+# Larger files are only extracted when asked about
+PRE_EXTRACT_MAX_BYTES = 100 * 1024 * 1024
+# Recently used documents re-checked when the worker starts
+PRE_EXTRACT_RECENT = 20
+
+EXTRACT_ERRORS = (AttributeError, TypeError, ValueError, KeyError, RuntimeError, OSError,
+                  PyPdfError, OpcError, zipfile.BadZipFile)
+
+
+def document_key(path: str, size: int, mtime: float) -> str:
+    """Cache key of one version of a file."""
+    return hashlib.sha1(f"{path}\0{size}\0{mtime!r}".encode("utf-8")).hexdigest()
+
+
+def _docx_sections(paragraphs: Iterable[str]) -> List[str]:
+    sections: List[str] = []
+    current: List[str] = []
+    length = 0
+    for text in paragraphs:
+        if current and length + len(text) > DOCX_SECTION_CHARS:
+            sections.append("\n".join(current))
+            current, length = [], 0
+        current.append(text)
+        length += len(text) + 1
+    if current:
+        sections.append("\n".join(current))
+    return sections
+
+
+def extract_pages(path: str, max_chars: Optional[int] = None) -> Tuple[List[str], bool]:
+    """
+    Text of every page (PDF) or section (DOCX). With `max_chars`, PDF parsing
+    stops once that much text is extracted. Returns (pages, complete).
+    """
+    if path.lower().endswith(".docx"):
+        return _docx_sections(p.text for p in Document(path).paragraphs), True
+    reader = PdfReader(path)
+    pages: List[str] = []
+    chars = 0
+    total = len(reader.pages)
+    for number, page in enumerate(reader.pages):
+        text = page.extract_text() or ""
+        pages.append(text)
+        chars += len(text) + 1
+        if max_chars is not None and chars >= max_chars and number + 1 < total:
+            return pages, False
+    return pages, True
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    global _pool  # pylint: disable=global-statement
+    if DOC_EXTRACT_WORKERS <= 0:
+        return None
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=DOC_EXTRACT_WORKERS)
+    return _pool
+
+
+def shutdown_doc_extract_pool() -> None:
+    """Stops the extraction worker processes (a new pool starts on demand)."""
+    global _pool  # pylint: disable=global-statement
+    pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def extract_pages_async(path: str, max_chars: Optional[int] = None) -> Tuple[List[str], bool]:
+    """`extract_pages` in the worker process, or a thread if the pool is unavailable."""
+    started = time.perf_counter()
+    pool = _get_pool()
+    result = None
+    if pool is not None:
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(
+                pool, extract_pages, path, max_chars)
+        except (BrokenProcessPool, RuntimeError) as e:
+            logger.warning("Document extraction pool unavailable (%s), using a thread", e)
+            shutdown_doc_extract_pool()
+    if result is None:
+        result = await asyncio.to_thread(extract_pages, path, max_chars)
+    perf_stats.observe("doc_text.extract", time.perf_counter() - started)
+    return result
+
+
+class DocTextCache:
+    """
+    Per-page compressed text store with size-capped LRU eviction and a
+    background pre-extraction queue.
+    """
+
+    def __init__(self, path: str = DOC_TEXT_CACHE_PATH, max_bytes: int = DOC_TEXT_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._db_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._total_bytes = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._queued: Set[str] = set()
+        self._listeners: List[Callable[[str, str, List[str]], Awaitable[None]]] = []
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript(
+                "CREATE TABLE IF NOT EXISTS docs ("
+                "key TEXT PRIMARY KEY, path TEXT NOT NULL, pages INTEGER NOT NULL, "
+                "chars INTEGER NOT NULL, complete INTEGER NOT NULL, size INTEGER NOT NULL, "
+                "accessed_at REAL NOT NULL);"
+                "CREATE INDEX IF NOT EXISTS docs_path ON docs (path);"
+                "CREATE INDEX IF NOT EXISTS docs_accessed ON docs (accessed_at);"
+                "CREATE TABLE IF NOT EXISTS pages ("
+                "key TEXT NOT NULL, page INTEGER NOT NULL, text BLOB NOT NULL, "
+                "PRIMARY KEY (key, page));")
+            self._conn.commit()
+            self._total_bytes = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM docs").fetchone()[0]
+        return self._conn
+
+    def get(self, key: str, max_chars: Optional[int] = None) -> Optional[str]:
+        """
+        Cached text for `key`, decompressing only the pages needed for
+        `max_chars`. None when not cached, or cached only partly and
+        shorter than `max_chars`.
+        """
+        with self._db_lock:
+            conn = self._db()
+            row = conn.execute("SELECT chars, complete FROM docs WHERE key = ?", (key,)).fetchone()
+            if row is None or (not row[1] and (max_chars is None or row[0] < max_chars)):
+                return None
+            conn.execute("UPDATE docs SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+            pages: List[str] = []
+            chars = 0
+            for (blob,) in conn.execute("SELECT text FROM pages WHERE key = ? ORDER BY page", (key,)):
+                pages.append(zlib.decompress(blob).decode("utf-8"))
+                chars += len(pages[-1]) + 1
+                if max_chars is not None and chars >= max_chars:
+                    break
+        text = "\n".join(pages)
+        return text[:max_chars] if max_chars is not None else text
+
+    def get_pages(self, key: str, max_chars: Optional[int] = None) -> Optional[List[str]]:
+        """
+        Every cached page of a file version. None when not cached, or cached
+        only partly and shorter than `max_chars`.
+        """
+        with self._db_lock:
+            conn = self._db()
+            row = conn.execute("SELECT chars, complete FROM docs WHERE key = ?", (key,)).fetchone()
+            if row is None or (not row[1] and (max_chars is None or row[0] < max_chars)):
+                return None
+            conn.execute("UPDATE docs SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+            return [zlib.decompress(blob).decode("utf-8") for (blob,) in conn.execute(
+                "SELECT text FROM pages WHERE key = ? ORDER BY page", (key,))]
+
+    def is_complete(self, key: str) -> bool:
+        """True when every page of this file version is cached."""
+        with self._db_lock:
+            row = self._db().execute("SELECT complete FROM docs WHERE key = ?", (key,)).fetchone()
+        return bool(row and row[0])
+
+    def put(self, key: str, path: str, pages: List[str], complete: bool) -> None:
+        """Stores a file version's pages, replacing older versions of the same path."""
+        blobs = [zlib.compress(page.encode("utf-8")) for page in pages]
+        size = sum(len(b) for b in blobs)
+        with self._db_lock:
+            conn = self._db()
+            self._remove(conn, [row[0] for row in conn.execute(
+                "SELECT key FROM docs WHERE path = ? OR key = ?", (path, key))])
+            conn.execute(
+                "INSERT INTO docs (key, path, pages, chars, complete, size, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, path, len(pages), sum(len(p) + 1 for p in pages), int(complete), size,
+                 time.time()))
+            conn.executemany("INSERT INTO pages (key, page, text) VALUES (?, ?, ?)",
+                             ((key, number, blob) for number, blob in enumerate(blobs)))
+            self._total_bytes += size
+            self._evict(conn, keep=key)
+            conn.commit()
+
+    def _remove(self, conn: sqlite3.Connection, keys: List[str]) -> None:
+        for key in keys:
+            row = conn.execute("SELECT size FROM docs WHERE key = ?", (key,)).fetchone()
+            conn.execute("DELETE FROM docs WHERE key = ?", (key,))
+            conn.execute("DELETE FROM pages WHERE key = ?", (key,))
+            if row:
+                self._total_bytes -= row[0]
+
+    def _evict(self, conn: sqlite3.Connection, keep: str) -> None:
+        while self._total_bytes > self.max_bytes:
+            keys = [row[0] for row in conn.execute(
+                "SELECT key FROM docs WHERE key != ? ORDER BY accessed_at LIMIT 8", (keep,))]
+            if not keys:
+                return
+            self._remove(conn, keys)
+            perf_stats.incr("doc_text.evicted", len(keys))
+
+    def recent_paths(self, limit: int = PRE_EXTRACT_RECENT) -> List[str]:
+        """Paths of the most recently used documents."""
+        with self._db_lock:
+            return [row[0] for row in self._db().execute(
+                "SELECT path FROM docs ORDER BY accessed_at DESC LIMIT ?", (limit,))]
+
+    async def text(self, path: str, max_chars: Optional[int] = MAX_DOCUMENT_CHARS) -> str:
+        """
+        The document's text (up to `max_chars`), parsing the file only on a
+        cache miss. A partial extraction is completed in the background.
+        """
+        stat = await asyncio.to_thread(os.stat, path)
+        key = document_key(path, stat.st_size, stat.st_mtime)
+        try:
+            cached = await asyncio.to_thread(self.get, key, max_chars)
+        except sqlite3.Error as e:
+            logger.warning("Document text cache read failed: %s", e)
+            cached = None
+        if cached is not None:
+            perf_stats.incr("doc_text.hit")
+            return cached
+
+        perf_stats.incr("doc_text.miss")
+        pages, complete = await extract_pages_async(path, max_chars)
+        try:
+            await asyncio.to_thread(self.put, key, path, pages, complete)
+        except sqlite3.Error as e:
+            logger.warning("Document text cache write failed: %s", e)
+        if not complete:
+            self.schedule(path)
+        text = "\n".join(pages)
+        return text[:max_chars] if max_chars is not None else text
+
+    async def pages(self, path: str, max_chars: Optional[int] = None) -> Tuple[str, List[str]]:
+        """
+        The file version's key and its pages, parsing only on a cache miss.
+        With `max_chars`, the leading pages holding that much text are enough
+        and a partial extraction is completed in the background.
+        """
+        stat = await asyncio.to_thread(os.stat, path)
+        key = document_key(path, stat.st_size, stat.st_mtime)
+        try:
+            cached = await asyncio.to_thread(self.get_pages, key, max_chars)
+        except sqlite3.Error as e:
+            logger.warning("Document text cache read failed: %s", e)
+            cached = None
+        if cached is not None:
+            perf_stats.incr("doc_text.hit")
+            return key, cached
+        perf_stats.incr("doc_text.miss")
+        pages, complete = await extract_pages_async(path, max_chars)
+        try:
+            await asyncio.to_thread(self.put, key, path, pages, complete)
+        except sqlite3.Error as e:
+            logger.warning("Document text cache write failed: %s", e)
+        if not complete:
+            self.schedule(path)
+        return key, pages
+
+    def add_listener(self, callback: Callable[[str, str, List[str]], Awaitable[None]]) -> None:
+        """Awaits `callback(path, key, pages)` after the worker extracts a document."""
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    async def ensure(self, path: str) -> bool:
+        """Extracts and caches every page of `path` unless already cached. True if it parsed."""
+        stat = await asyncio.to_thread(os.stat, path)
+        if stat.st_size > PRE_EXTRACT_MAX_BYTES:
+            return False
+        key = document_key(path, stat.st_size, stat.st_mtime)
+        if await asyncio.to_thread(self.is_complete, key):
+            return False
+        pages, _ = await extract_pages_async(path)
+        await asyncio.to_thread(self.put, key, path, pages, True)
+        perf_stats.incr("doc_text.pre_extracted")
+        for callback in self._listeners:
+            await callback(path, key, pages)
+        return True
+
+    def _enqueue(self, path: str) -> None:
+        if self._queue is None or path in self._queued:
+            return
+        try:
+            self._queue.put_nowait(path)
+            self._queued.add(path)
+        except asyncio.QueueFull:
+            perf_stats.incr("doc_text.pre_extract_dropped")
+
+    def schedule(self, path: str) -> bool:
+        """
+        Queues `path` for background extraction. Safe to call from any
+        thread; returns False when the worker is not running.
+        """
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return False
+        loop.call_soon_threadsafe(self._enqueue, path)
+        return True
+
+    def schedule_many(self, paths: Iterable[str]) -> None:
+        """Queues several documents (e.g. newly discovered ones)."""
+        for path in paths:
+            if path.lower().endswith((".pdf", ".docx")):
+                self.schedule(path)
+
+    async def run_worker(self) -> None:
+        """
+        Pre-extracts queued documents one at a time, starting with recently
+        used ones whose cached text is missing, partial or outdated.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=PRE_EXTRACT_QUEUE_SIZE)
+        try:
+            try:
+                for path in await asyncio.to_thread(self.recent_paths):
+                    self._enqueue(path)
+            except sqlite3.Error as e:
+                logger.warning("Document text cache unavailable: %s", e)
+            while True:
+                path = await self._queue.get()
+                self._queued.discard(path)
+                try:
+                    if await self.ensure(path):
+                        logger.info("📄 Pre-extracted %s", os.path.basename(path))
+                except (*EXTRACT_ERRORS, sqlite3.Error) as e:
+                    logger.debug("Pre-extraction of %s failed: %s", path, e)
+        finally:
+            self._loop = None
+            self._queue = None
+            self._queued.clear()
+
+    def clear(self) -> None:
+        """Removes every cached document."""
+        with self._db_lock:
+            conn = self._db()
+            conn.execute("DELETE FROM docs")
+            conn.execute("DELETE FROM pages")
+            conn.commit()
+            self._total_bytes = 0
+
+    def close(self) -> None:
+        """Closes the SQLite connection."""
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# Global Instance
+doc_text_cache = DocTextCache()
@@ -0,0 +1,197 @@
+"""
+# jarvis_fs_watcher.py
+Live filesystem updates for the JARVIS file and document indexes.
+
+One watchdog observer watches every indexed root recursively. Create,
+delete, move and modify events are batched on a dispatcher thread and handed
+to the indexes registered for that root, which apply them in place, so
+lookups see new, removed and renamed files without walking the tree. While a
+root is watched, its full rescan only runs as a periodic reconciliation
+(INDEX_RECONCILE_INTERVAL) to catch anything the OS did not report.
+"""
+
+import os
+import queue
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Protocol, Tuple
+from watchdog.events import FileSystemEvent, FileSystemEventHandler
+from watchdog.observers import Observer
+from jarvis_logger import setup_logger
+from jarvis_metrics import perf_stats
+
+logger = setup_logger("JARVIS-FS-WATCHER")
+
+# Seconds between full reconciliation rescans of a watched root
+INDEX_RECONCILE_INTERVAL = float(os.getenv("JARVIS_INDEX_RECONCILE_HOURS", "6")) * 3600
+# Seconds events are collected before a batch is applied
+EVENT_BATCH_DELAY = 0.2
+WATCHED_EVENTS = ("created", "deleted", "moved", "modified")
+
+# (kind, path, dest_path for moves else None, is_directory)
+FsEvent = Tuple[str, str, Optional[str], bool]
+
+
+class IndexSink(Protocol):  # pylint: disable=too-few-public-methods
+    """An index that applies filesystem events in place."""
+
+    def apply_events(self, events: List[FsEvent]) -> None:
+        """Applies a batch of events, in order. Called from the dispatcher thread."""
+
+
+def normalize_path(path: str) -> str:
+    """Absolute, case-normalised form used for roots and event paths."""
+    return os.path.normcase(os.path.abspath(path))
+
+
+def _under(path: str, root: str) -> bool:
+    return path == root or path.startswith(root if root.endswith(os.sep) else root + os.sep)
+
+
+class _EventHandler(FileSystemEventHandler):
+    def __init__(self, events: "queue.SimpleQueue[Optional[FsEvent]]"):
+        super().__init__()
+        self._events = events
+
+    def on_any_event(self, event: FileSystemEvent) -> None:
+        if event.event_type not in WATCHED_EVENTS:
+            return
+        dest = os.fsdecode(event.dest_path) if event.dest_path else None
+        self._events.put((event.event_type, os.fsdecode(event.src_path), dest,
+                          event.is_directory))
+
+
+class IndexWatcher:
+    """
+    Watches index roots and feeds their filesystem events to the indexes.
+    """
+
+    def __init__(self, batch_delay: float = EVENT_BATCH_DELAY,
+                 reconcile_interval: float = INDEX_RECONCILE_INTERVAL):
+        self.batch_delay = batch_delay
+        self.reconcile_interval = reconcile_interval
+        self._lock = threading.Lock()
+        self._events: "queue.SimpleQueue[Optional[FsEvent]]" = queue.SimpleQueue()
+        self._observer: Optional[Observer] = None
+        self._dispatcher: Optional[threading.Thread] = None
+        self._sinks: Dict[str, List[IndexSink]] = {}
+        self._watched_since: Dict[str, float] = {}
+
+    def _start(self) -> None:
+        if self._observer is not None and self._observer.is_alive():
+            return
+        self._observer = Observer()
+        self._observer.daemon = True
+        self._observer.start()
+        self._watched_since.clear()
+        if self._dispatcher is None or not self._dispatcher.is_alive():
+            self._dispatcher = threading.Thread(target=self._dispatch, name="index-watcher",
+                                                daemon=True)
+            self._dispatcher.start()
+
+    def watch(self, root: str, sink: IndexSink) -> bool:
+        """
+        Starts delivering events below `root` to `sink`. Returns False when
+        the root cannot be watched; the index should then keep its TTL rescans.
+        """
+        root = normalize_path(root)
+        with self._lock:
+            try:
+                self._start()
+                if root not in self._watched_since:
+                    self._observer.schedule(_EventHandler(self._events), root, recursive=True)
+                    self._watched_since[root] = time.time()
+                    logger.info("👀 Watching %s for index updates", root)
+            except (OSError, RuntimeError) as e:
+                logger.warning("Cannot watch %s, falling back to periodic rescans: %s", root, e)
+                return False
+            sinks = self._sinks.setdefault(root, [])
+            if sink not in sinks:
+                sinks.append(sink)
+        return True
+
+    def is_watching(self, root: str) -> bool:
+        """True while events below `root` are being delivered."""
+        with self._lock:
+            return (self._observer is not None and self._observer.is_alive()
+                    and normalize_path(root) in self._watched_since)
+
+    def index_max_age(self, roots: Iterable[str], sink: IndexSink, ttl: float) -> float:
+        """
+        Watches every existing root for `sink` and returns how old (seconds)
+        the index's last scan may be. Unwatched roots keep `ttl`; watched
+        ones need one scan after watching began, then only reconciliation.
+        """
+        max_age = self.reconcile_interval
+        for root in roots:
+            if not os.path.isdir(root):
+                continue
+            if not self.watch(root, sink):
+                return ttl
+            with self._lock:
+                since = self._watched_since.get(normalize_path(root))
+            if since is None:
+                return ttl
+            max_age = min(max_age, time.time() - since)
+        return max_age
+
+    def _dispatch(self) -> None:
+        while True:
+            event = self._events.get()
+            if event is None:
+                return
+            time.sleep(self.batch_delay)
+            batch = [event]
+            stop = False
+            while True:
+                try:
+                    event = self._events.get_nowait()
+                except queue.Empty:
+                    break
+                if event is None:
+                    stop = True
+                    break
+                batch.append(event)
+            self._deliver(batch)
+            if stop:
+                return
+
+    def _deliver(self, batch: List[FsEvent]) -> None:
+        perf_stats.incr("fs_watcher.events", len(batch))
+        with self._lock:
+            routes: List[Tuple[IndexSink, List[str]]] = []
+            for root, sinks in self._sinks.items():
+                for sink in sinks:
+                    for routed_sink, roots in routes:
+                        if routed_sink is sink:
+                            roots.append(root)
+                            break
+                    else:
+                        routes.append((sink, [root]))
+        for sink, roots in routes:
+            events = [e for e in batch if any(
+                _under(e[1], root) or (e[2] and _under(e[2], root)) for root in roots)]
+            if not events:
+                continue
+            try:
+                sink.apply_events(events)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.error("Index update from %d events failed: %s", len(events), e)
+
+    def stop(self) -> None:
+        """Stops the observer and the dispatcher thread."""
+        with self._lock:
+            observer, self._observer = self._observer, None
+            dispatcher, self._dispatcher = self._dispatcher, None
+            self._sinks.clear()
+            self._watched_since.clear()
+        if observer is not None:
+            observer.stop()
+            observer.join(timeout=2.0)
+        if dispatcher is not None:
+            self._events.put(None)
+            dispatcher.join(timeout=2.0)
+
+
+# Global Instance
+fs_watcher = IndexWatcher()
@@ -3,14 +3,21 @@
 Jarvis Weather Module
 
 Retrieves current weather information for a specified city (or automatic detection).
+Current conditions and forecasts are cached per city; a background loop keeps
+the home city warm so the common "mausam kaisa hai" answers from memory.
 """
 
 import asyncio
 import os
-import requests
+import time
+from typing import Dict, Iterable, Optional, Tuple
 from dotenv import load_dotenv
 from livekit.agents import function_tool
 from jarvis_logger import setup_logger
+from jarvis_circuit import CircuitOpenError, circuit_breakers
+from jarvis_http import HTTP_ERRORS, http_client
+from jarvis_metrics import perf_stats
+from jarvis_ratelimit import rate_limits
 
 from jarvis_search import get_current_city, search_internet
 
@@ -19,9 +26,187 @@ load_dotenv()
 # Setup logging
 logger = setup_logger("JARVIS-WEATHER")
 
+OPENWEATHER_URL = "https://api.openweathermap.org/data/2.5"
+WEATHER_PREFETCH_INTERVAL = float(os.getenv("JARVIS_WEATHER_PREFETCH_MINUTES", "15")) * 60
+# Seconds cached conditions count as current. Outlives the prefetch interval
+# plus a slow fetch, so the home city never expires between prefetches.
+WEATHER_TTL = float(os.getenv("JARVIS_WEATHER_TTL", str(WEATHER_PREFETCH_INTERVAL + 120)))
+# Older data is still better than nothing when the API is down
+WEATHER_STALE_TTL = 3 * 3600.0
+
+
+class WeatherCache:
+    """
+    In-memory per-city cache for current conditions and forecasts.
+    """
+
+    def __init__(self, ttl: float = WEATHER_TTL):
+        self.ttl = ttl
+        self._entries: Dict[Tuple[str, str], Tuple[float, dict]] = {}
+
+    @staticmethod
+    def _key(kind: str, city: str) -> Tuple[str, str]:
+        return kind, city.strip().lower()
+
+    def get(self, kind: str, city: str, max_age: Optional[float] = None) -> Optional[dict]:
+        """Cached result younger than `max_age` (default: the TTL), or None."""
+        entry = self._entries.get(self._key(kind, city))
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if time.time() - stored_at > (self.ttl if max_age is None else max_age):
+            return None
+        return value
+
+    def put(self, kind: str, city: str, value: dict) -> None:
+        """Stores a result for a city."""
+        self._entries[self._key(kind, city)] = (time.time(), value)
+
+    def clear(self) -> None:
+        """Drops every cached entry."""
+        self._entries.clear()
+
+
+# Global Instance
+weather_cache = WeatherCache()
+
+
+def _weather_api_key() -> Optional[str]:
+    # Check both possible names
+    return os.getenv("OPENWEATHER_API_KEY") or os.getenv("WEATHER_API_KEY")
+
+
+def _weather_api_failure(response) -> str:
+    """Auth, quota and server errors count against OpenWeather; an unknown city does not."""
+    if response.status_code in (401, 429) or response.status_code >= 500:
+        return f"HTTP {response.status_code}"
+    return ""
+
+
+async def _openweather_get(endpoint: str, city: str, api_key: str, **params):
+    """GET an OpenWeather endpoint; concurrent calls for the same city share one request."""
+    url = f"{OPENWEATHER_URL}/{endpoint}"
+    query = {"q": city, "appid": api_key, "units": "metric", **params}
+    return await rate_limits.run(
+        "openweather", (endpoint, city.strip().lower()),
+        lambda: circuit_breakers.get("openweather").call(
+            http_client.get, url, params=query, timeout=10,
+            is_failure=_weather_api_failure))
+
+
+async def fetch_current_weather(city: str, api_key: str) -> Optional[dict]:
+    """Fetches and caches current conditions; None if OpenWeather cannot answer."""
+    try:
+        response = await _openweather_get("weather", city, api_key)
+        if response.status_code != 200:
+            logger.warning("Weather API error %s for %s.", response.status_code, city)
+            return None
+
+        data = response.json()
+        weather = data["weather"][0]["description"].title()
+        temperature = data["main"]["temp"]
+        humidity = data["main"]["humidity"]
+        wind_speed = data["wind"]["speed"]
+    except CircuitOpenError:
+        logger.info("OpenWeather circuit open, skipping API for %s.", city)
+        return None
+    except (*HTTP_ERRORS, ValueError, KeyError, RuntimeError) as e:
+        logger.warning("Weather API failure for %s: %s", city, e)
+        return None
+
+    # Hinglish response
+    message = (f"🌤️ {city} ka weather:\n"
+               f"• Mausam: {weather}\n"
+               f"• Temperature: {temperature}°C\n"
+               f"• Humidity: {humidity}%\n"
+               f"• Hawa ki speed: {wind_speed} m/s")
+    result = {
+        "status": "success",
+        "city": city,
+        "weather": weather,
+        "temperature": temperature,
+        "humidity": humidity,
+        "wind_speed": wind_speed,
+        "message": message
+    }
+    weather_cache.put("current", city, result)
+    return result
+
+
+async def fetch_forecast(city: str, api_key: str) -> Optional[dict]:
+    """Fetches and caches the next 24h forecast (3-hour steps); None on failure."""
+    try:
+        response = await _openweather_get("forecast", city, api_key, cnt=8)
+        if response.status_code != 200:
+            logger.warning("Forecast API error %s for %s.", response.status_code, city)
+            return None
+        slots = [{
+            "time": item["dt_txt"],
+            "temperature": item["main"]["temp"],
+            "weather": item["weather"][0]["description"].title(),
+            "rain_chance": round(item.get("pop", 0) * 100),
+        } for item in response.json()["list"]]
+    except CircuitOpenError:
+        return None
+    except (*HTTP_ERRORS, ValueError, KeyError, RuntimeError) as e:
+        logger.warning("Forecast API failure for %s: %s", city, e)
+        return None
+    if not slots:
+        return None
+
+    temps = [slot["temperature"] for slot in slots]
+    rain_chance = max(slot["rain_chance"] for slot in slots)
+    lines = "\n".join(f"• {slot['time'][11:16]}: {slot['weather']}, {slot['temperature']}°C"
+                      for slot in slots)
+    result = {
+        "status": "success",
+        "city": city,
+        "min_temperature": min(temps),
+        "max_temperature": max(temps),
+        "rain_chance": rain_chance,
+        "slots": slots,
+        "message": (f"📅 {city} ka agle 24 ghante ka forecast:\n"
+                    f"• Temperature: {min(temps)}°C - {max(temps)}°C\n"
+                    f"• Barish ka chance: {rain_chance}%\n{lines}")
+    }
+    weather_cache.put("forecast", city, result)
+    return result
+
+
+async def fetch_weather_many(cities: Iterable[str], include_forecast: bool = False) -> Dict[str, dict]:
+    """
+    Fetches several cities concurrently over the pooled client and caches
+    them; returns {city: current conditions} for the ones that succeeded.
+    """
+    api_key = _weather_api_key()
+    if not api_key:
+        return {}
+    unique: Dict[str, str] = {}
+    for city in cities:
+        if city and city.strip():
+            unique.setdefault(city.strip().lower(), city.strip())
+    cities = list(unique.values())
+    jobs = [fetch_current_weather(city, api_key) for city in cities]
+    if include_forecast:
+        jobs += [fetch_forecast(city, api_key) for city in cities]
+    results = await asyncio.gather(*jobs)
+    return {city: result for city, result in zip(cities, results) if result}
+
+
+async def _resolve_city(city: str) -> str:
+    # If no city provided or empty, detect city
+    if not city or not city.strip():
+        city = await get_current_city()
+        logger.info("No city provided, detected city: %s", city)
+
+    if not city:
+        city = "Lahore"
+        logger.info("City detection failed, using fallback: Lahore")
+    return city
+
 
 @function_tool
-async def get_weather(city: str = "Lahore") -> str:
+async def get_weather(city: str = "") -> str:
     """
     Gives current weather information for a given city.
 
@@ -34,8 +219,7 @@ async def get_weather(city: str = "Lahore") -> str:
     - "Kya barish hogi Mumbai mein?"
     """
 
-    # Get API key from environment - check both possible names
-    api_key = os.getenv("OPENWEATHER_API_KEY") or os.getenv("WEATHER_API_KEY")
+    api_key = _weather_api_key()
 
     if not api_key:
         logger.error("OpenWeather API key missing hai.")
@@ -43,57 +227,68 @@ async def get_weather(city: str = "Lahore") -> str:
                "WEATHER_API_KEY ya OPENWEATHER_API_KEY set karein.")
         return msg
 
-    # If no city provided or empty, detect city
-    if not city or not city.strip():
-        city = await get_current_city()
-        logger.info("No city provided, detected city: %s", city)
+    city = await _resolve_city(city)
 
-    if not city:
-        city = "Lahore"
-        logger.info("City detection failed, using fallback: Lahore")
+    cached = weather_cache.get("current", city)
+    if cached is not None:
+        perf_stats.incr("weather.cache_hit")
+        return cached
+    perf_stats.incr("weather.cache_miss")
 
     logger.info("City ke liye weather fetch kiya ja raha hai: %s", city)
-    url = "https://api.openweathermap.org/data/2.5/weather"
-    params = {
-        "q": city,
-        "appid": api_key,
-        "units": "metric"
-    }
+    result = await fetch_current_weather(city, api_key)
+    if result is not None:
+        return result
 
-    try:
-        # Move blocking requests.get to a thread
-        response = await asyncio.to_thread(requests.get, url, params=params, timeout=10)
-        if response.status_code != 200:
-            logger.warning("Weather API error %s. Falling back to search.", response.status_code)
-            return await get_weather_via_search(city)
+    stale = weather_cache.get("current", city, max_age=WEATHER_STALE_TTL)
+    if stale is not None:
+        logger.info("Serving recent cached weather for %s while the API is unavailable.", city)
+        return {**stale, "stale": True}
 
-        data = response.json()
-        weather = data["weather"][0]["description"].title()
-        temperature = data["main"]["temp"]
-        humidity = data["main"]["humidity"]
-        wind_speed = data["wind"]["speed"]
+    logger.warning("Weather API unavailable. Falling back to search.")
+    return await get_weather_via_search(city)
 
-        # Hinglish response
-        result = (f"🌤️ {city} ka weather:\n"
-                  f"• Mausam: {weather}\n"
-                  f"• Temperature: {temperature}°C\n"
-                  f"• Humidity: {humidity}%\n"
-                  f"• Hawa ki speed: {wind_speed} m/s")
 
+@function_tool
+async def get_weather_forecast(city: str = "") -> dict:
+    """
+    Gives the weather forecast for the next 24 hours (temperature range, rain chance).
+    Use for "kal barish hogi?", "aaj raat thand hogi?" or similar forecast questions.
+    If no city is given, detect city automatically.
+    """
+    api_key = _weather_api_key()
+    city = await _resolve_city(city)
+
+    cached = weather_cache.get("forecast", city)
+    if cached is not None:
+        perf_stats.incr("weather.cache_hit")
+        return cached
+    perf_stats.incr("weather.cache_miss")
+
+    result = await fetch_forecast(city, api_key) if api_key else None
+    if result is not None:
+        return result
+
+    search_result = await search_internet(f"weather forecast {city} next 24 hours")
+    if search_result.get("status") == "success":
         return {
             "status": "success",
             "city": city,
-            "weather": weather,
-            "temperature": temperature,
-            "humidity": humidity,
-            "wind_speed": wind_speed,
-            "message": result
+            "provider": "search_fallback",
+            "message": f"📅 {city} ka forecast (via Search):\n{search_result.get('message', '')}"
         }
+    return {"status": "error", "message": f"Error: {city} ka forecast nahi mil saka."}
+
 
-    except (requests.exceptions.RequestException, ValueError, KeyError, RuntimeError) as e:
-        logger.warning(
-            "Weather API failure: %s. Attempting search fallback.", e)
-        return await get_weather_via_search(city)
+async def prefetch_home_weather() -> Optional[str]:
+    """Refreshes current conditions and forecast for the detected home city."""
+    if not _weather_api_key():
+        return None
+    city = await get_current_city()
+    fetched = await fetch_weather_many([city], include_forecast=True)
+    if fetched:
+        logger.info("Prefetched weather for %s", city)
+    return city
 
 
 async def get_weather_via_search(city: str) -> dict:
@@ -0,0 +1,357 @@
+"""
+# jarvis_html_extract.py
+Pluggable HTML-to-text extraction for JARVIS.
+
+Backends, fastest first: selectolax, lxml, and BeautifulSoup's html.parser
+(always available, used as the fallback). "stream" is the incremental
+parser used when a page should be parsed while it downloads. The backend is
+chosen with JARVIS_HTML_BACKEND ("auto" picks the fastest installed one).
+
+All backends drop scripts/styles and boilerplate (navigation, footers,
+cookie/consent banners, share widgets, sidebars). DOM backends also prefer
+the page's <main>/<article> when it holds enough text. Extraction can run in
+a process pool so several pages parse in parallel instead of serialising on
+the GIL.
+"""
+
+import asyncio
+import importlib.util
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from html.parser import HTMLParser
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urldefrag, urljoin
+from jarvis_logger import setup_logger
+
+logger = setup_logger("JARVIS-HTML-EXTRACT")
+
+EXTRACT_BACKEND = os.getenv("JARVIS_HTML_BACKEND", "auto")
+# 0 extracts in a worker thread instead of a process pool
+EXTRACT_WORKERS = int(os.getenv("JARVIS_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+DEFAULT_MAX_CHARS = 4000
+
+# Preference order for "auto"
+BACKEND_PRIORITY = ("selectolax", "lxml", "html.parser")
+
+SKIP_TAGS = frozenset({"script", "style", "noscript", "template", "svg", "iframe"})
+BOILERPLATE_TAGS = frozenset({"nav", "footer", "aside", "form", "button", "dialog"})
+BOILERPLATE_ROLES = frozenset({
+    "navigation", "banner", "contentinfo", "complementary", "dialog", "alertdialog", "search"
+})
+# Matched against whole class/id tokens, so "sidebar" or "cookie-banner" is
+# boilerplate but a state class such as "has-sidebar" is not
+BOILERPLATE_TOKEN_RE = re.compile(
+    r"(?:cookies?|consent|gdpr|newsletter|subscribe|popup|modal|advert\w*|ads?|promo|"
+    r"social|share|sharing|breadcrumbs?|sidebar|menu|related|comments?|skip)(?:[-_].*)?",
+    re.IGNORECASE)
+# Page containers are never dropped, whatever their classes say
+CONTENT_TAGS = frozenset({"html", "body", "main", "article"})
+BLOCK_TAGS = frozenset({
+    "p", "div", "br", "li", "ul", "ol", "tr", "td", "th", "table", "section",
+    "article", "header", "footer", "nav", "aside", "main", "blockquote", "pre",
+    "title", "h1", "h2", "h3", "h4", "h5", "h6", "dt", "dd", "figcaption"
+})
+VOID_TAGS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+    "source", "track", "wbr"
+})
+# A <main>/<article> needs at least this much text to replace the whole body
+MIN_MAIN_CHARS = 200
+
+_WHITESPACE_RE = re.compile(r"\s+")
+# lxml rejects str input that carries an encoding declaration (XHTML pages)
+_XML_DECLARATION_RE = re.compile(r"^\s*<\?xml[^>]*\?>")
+
+
+def _is_boilerplate(tag: str, attrs: Dict[str, Optional[str]]) -> bool:
+    if tag in CONTENT_TAGS:
+        return False
+    if tag in BOILERPLATE_TAGS:
+        return True
+    if (attrs.get("role") or "").lower() in BOILERPLATE_ROLES:
+        return True
+    tokens = f"{attrs.get('id') or ''} {attrs.get('class') or ''}".split()
+    return any(BOILERPLATE_TOKEN_RE.fullmatch(token) for token in tokens)
+
+
+def clean_lines(text: str, max_chars: int = DEFAULT_MAX_CHARS) -> str:
+    """Collapses whitespace per line, drops empty lines and trims to `max_chars`."""
+    lines = (_WHITESPACE_RE.sub(" ", line).strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line)[:max_chars]
+
+
+class VisibleTextParser(HTMLParser):
+    """
+    Incremental HTML-to-text parser. Feed it chunks as they arrive; it drops
+    script/style content (and boilerplate sections when asked), breaks lines
+    at block elements and reports `full` once `max_chars` have been collected.
+    With `collect_links`, visible links are kept in `links` as (href, anchor text).
+    """
+
+    def __init__(self, max_chars: int = DEFAULT_MAX_CHARS, remove_boilerplate: bool = False,
+                 collect_links: bool = False):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.remove_boilerplate = remove_boilerplate
+        self.collect_links = collect_links
+        self.links: List[Tuple[str, str]] = []
+        self._anchor: Optional[Tuple[str, List[str]]] = None
+        self._skip_tag: Optional[str] = None
+        self._skip_nesting = 0
+        self._lines: List[str] = []
+        self._line: List[str] = []
+        self._length = 0
+
+    @property
+    def full(self) -> bool:
+        """True once enough text has been collected."""
+        return self._length >= self.max_chars
+
+    def _end_line(self) -> None:
+        if self._line:
+            self._lines.append(" ".join(self._line))
+            self._line = []
+
+    def handle_starttag(self, tag, attrs):
+        if self._skip_tag is not None:
+            if tag == self._skip_tag:
+                self._skip_nesting += 1
+            return
+        if tag in SKIP_TAGS or (
+                self.remove_boilerplate and tag not in VOID_TAGS and _is_boilerplate(tag, dict(attrs))):
+            self._skip_tag = tag
+            self._skip_nesting = 1
+        elif tag in BLOCK_TAGS:
+            self._end_line()
+        elif tag == "a" and self.collect_links:
+            href = dict(attrs).get("href")
+            self._anchor = (href, []) if href else None
+
+    def handle_startendtag(self, tag, attrs):
+        # Self-closing tags never open a skipped section
+        if self._skip_tag is None and tag in BLOCK_TAGS:
+            self._end_line()
+
+    def handle_endtag(self, tag):
+        if self._skip_tag is not None:
+            if tag == self._skip_tag:
+                self._skip_nesting -= 1
+                if self._skip_nesting == 0:
+                    self._skip_tag = None
+            return
+        if tag in BLOCK_TAGS:
+            self._end_line()
+        elif tag == "a" and self._anchor is not None:
+            href, words = self._anchor
+            self.links.append((href, " ".join(words)))
+            self._anchor = None
+
+    def handle_data(self, data):
+        if self._skip_tag is not None:
+            return
+        text = _WHITESPACE_RE.sub(" ", data).strip()
+        if text and self._anchor is not None:
+            self._anchor[1].append(text)
+        if self.full:
+            return
+        if text:
+            self._line.append(text)
+            self._length += len(text) + 1
+
+    def text(self) -> str:
+        """Collected text, one line per block, trimmed to `max_chars`."""
+        self._end_line()
+        return "\n".join(self._lines)[:self.max_chars]
+
+
+def _extract_stream(html: str, max_chars: int, remove_boilerplate: bool) -> str:
+    parser = VisibleTextParser(max_chars, remove_boilerplate)
+    parser.feed(html)
+    parser.close()
+    return parser.text()
+
+
+def resolve_links(links: List[Tuple[str, str]], base_url: str,
+                  limit: Optional[int] = None) -> List[Tuple[str, str]]:
+    """Absolute, de-duplicated http(s) links without fragments, in page order."""
+    resolved: List[Tuple[str, str]] = []
+    seen = {urldefrag(base_url)[0]}
+    for href, text in links:
+        url = urldefrag(urljoin(base_url, href.strip()))[0]
+        if not url.startswith(("http://", "https://")) or url in seen:
+            continue
+        seen.add(url)
+        resolved.append((url, text))
+        if limit is not None and len(resolved) >= limit:
+            break
+    return resolved
+
+
+def extract_links(html: str, base_url: str, limit: Optional[int] = None) -> List[Tuple[str, str]]:
+    """(url, anchor text) of the links outside scripts and boilerplate sections."""
+    parser = VisibleTextParser(0, remove_boilerplate=True, collect_links=True)
+    parser.feed(html)
+    parser.close()
+    return resolve_links(parser.links, base_url, limit)
+
+
+def _extract_selectolax(html: str, max_chars: int, remove_boilerplate: bool) -> str:
+    from selectolax.parser import HTMLParser as LexborParser  # pylint: disable=import-outside-toplevel
+    tree = LexborParser(html)
+    tree.strip_tags(list(SKIP_TAGS))
+    if remove_boilerplate:
+        tree.strip_tags(list(BOILERPLATE_TAGS))
+        for node in tree.css("[id], [class], [role]"):
+            if node.tag not in VOID_TAGS and _is_boilerplate(node.tag, node.attributes):
+                node.decompose()
+    root = None
+    if remove_boilerplate:
+        for candidate in tree.css("main, article, [role=main]"):
+            if len(candidate.text(strip=True)) >= MIN_MAIN_CHARS:
+                root = candidate
+                break
+    root = root or tree.body or tree.root
+    if root is None:
+        return ""
+    for node in root.css(",".join(sorted(BLOCK_TAGS))):
+        node.insert_before("\n")
+        node.insert_after("\n")
+    return clean_lines(root.text(), max_chars)
+
+
+def _extract_lxml(html: str, max_chars: int, remove_boilerplate: bool) -> str:
+    import lxml.html  # pylint: disable=import-outside-toplevel
+    from lxml.etree import ParserError  # pylint: disable=import-outside-toplevel
+    try:
+        tree = lxml.html.document_fromstring(_XML_DECLARATION_RE.sub("", html, count=1))
+    except (ParserError, ValueError) as e:
+        logger.debug("lxml could not parse the page (%s), using html.parser", e)
+        return _extract_bs4(html, max_chars, remove_boilerplate)
+    for element in list(tree.iter(*SKIP_TAGS)):
+        element.drop_tree()
+    if remove_boilerplate:
+        for element in list(tree.iter()):
+            if (isinstance(element.tag, str) and element.tag not in VOID_TAGS
+                    and element.getparent() is not None
+                    and _is_boilerplate(element.tag, element.attrib)):
+                element.drop_tree()
+    root = None
+    if remove_boilerplate:
+        for candidate in tree.iter("main", "article"):
+            if len(candidate.text_content().strip()) >= MIN_MAIN_CHARS:
+                root = candidate
+                break
+    root = root if root is not None else (tree.find("body") if tree.find("body") is not None else tree)
+    for element in root.iter(*BLOCK_TAGS):
+        element.tail = "\n" + (element.tail or "")
+        element.text = "\n" + (element.text or "")
+    return clean_lines(root.text_content(), max_chars)
+
+
+def _extract_bs4(html: str, max_chars: int, remove_boilerplate: bool) -> str:
+    from bs4 import BeautifulSoup  # pylint: disable=import-outside-toplevel
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(list(SKIP_TAGS)):
+        tag.decompose()
+    if remove_boilerplate:
+        for tag in soup.find_all(True):
+            if tag.decomposed or tag.name in VOID_TAGS:
+                continue
+            attrs = {key: " ".join(value) if isinstance(value, list) else value
+                     for key, value in (tag.attrs or {}).items()}
+            if _is_boilerplate(tag.name, attrs):
+                tag.decompose()
+    root = None
+    if remove_boilerplate:
+        for candidate in soup.find_all(["main", "article"]):
+            if len(candidate.get_text(strip=True)) >= MIN_MAIN_CHARS:
+                root = candidate
+                break
+    root = root or soup.body or soup
+    for tag in root.find_all(list(BLOCK_TAGS)):
+        tag.insert_before("\n")
+        tag.insert_after("\n")
+    return clean_lines(root.get_text(), max_chars)
+
+
+Extractor = Callable[[str, int, bool], str]
+
+EXTRACTORS: Dict[str, Extractor] = {
+    "selectolax": _extract_selectolax,
+    "lxml": _extract_lxml,
+    "html.parser": _extract_bs4,
+    "stream": _extract_stream,
+}
+
+_BACKEND_MODULES = {"selectolax": "selectolax", "lxml": "lxml", "html.parser": "bs4", "stream": None}
+
+
+def available_backends() -> List[str]:
+    """Installed backends, in preference order."""
+    return [name for name, module in _BACKEND_MODULES.items()
+            if module is None or importlib.util.find_spec(module) is not None]
+
+
+def resolve_backend(name: Optional[str] = None) -> str:
+    """Maps a configured backend name (or "auto") to an installed backend."""
+    name = (name or EXTRACT_BACKEND).lower()
+    installed = available_backends()
+    if name in installed:
+        return name
+    if name != "auto":
+        logger.warning("HTML backend '%s' is not available, picking automatically", name)
+    for candidate in BACKEND_PRIORITY:
+        if candidate in installed:
+            return candidate
+    return "stream"
+
+
+def extract_text(html: str, backend: Optional[str] = None, max_chars: int = DEFAULT_MAX_CHARS,
+                 remove_boilerplate: bool = True) -> str:
+    """Visible text of an HTML document using the chosen backend."""
+    if not html:
+        return ""
+    return EXTRACTORS[resolve_backend(backend)](html, max_chars, remove_boilerplate)
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    global _pool  # pylint: disable=global-statement
+    if EXTRACT_WORKERS <= 0:
+        return None
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=EXTRACT_WORKERS)
+    return _pool
+
+
+def shutdown_extract_pool() -> None:
+    """Stops the extraction worker processes (a new pool starts on demand)."""
+    global _pool  # pylint: disable=global-statement
+    pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def extract_text_async(html: str, backend: Optional[str] = None,
+                             max_chars: int = DEFAULT_MAX_CHARS,
+                             remove_boilerplate: bool = True) -> str:
+    """
+    Like `extract_text`, but parses in the process pool so concurrent pages
+    use several cores. Falls back to a worker thread if the pool is unusable.
+    """
+    if not html:
+        return ""
+    backend = resolve_backend(backend)
+    pool = _get_pool()
+    if pool is not None:
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                pool, extract_text, html, backend, max_chars, remove_boilerplate)
+        except (BrokenProcessPool, OSError, RuntimeError) as e:
+            logger.warning("Extraction pool unavailable (%s), using a thread", e)
+            shutdown_extract_pool()
+    return await asyncio.to_thread(extract_text, html, backend, max_chars, remove_boilerplate)
@@ -0,0 +1,129 @@
+"""
+# jarvis_http.py
+Shared async HTTP client for JARVIS.
+
+All outbound HTTP goes through one pooled `httpx.AsyncClient` so connections
+(and TLS sessions) are reused instead of rebuilt per call. HTTP/2 is used when
+the `h2` package is installed. The client is created lazily on the running
+event loop and closed when the agent session is torn down.
+"""
+
+import asyncio
+import importlib.util
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+from urllib.parse import urlsplit
+import httpx
+from jarvis_logger import setup_logger
+
+logger = setup_logger("JARVIS-HTTP")
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Pool and timeout defaults; individual calls may still pass `timeout=`
+HTTP_MAX_CONNECTIONS = int(os.getenv("JARVIS_HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("JARVIS_HTTP_MAX_KEEPALIVE", "20"))
+HTTP_PER_HOST_LIMIT = int(os.getenv("JARVIS_HTTP_PER_HOST_LIMIT", "8"))
+HTTP_TIMEOUT = httpx.Timeout(15.0, connect=5.0)
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36"
+    )
+}
+
+# Errors callers should treat as "request failed"
+HTTP_ERRORS = (httpx.HTTPError, httpx.InvalidURL)
+
+
+class SharedHTTPClient:
+    """
+    Process-wide pooled HTTP client with per-host concurrency limits.
+    """
+
+    def __init__(self, max_connections: int = HTTP_MAX_CONNECTIONS,
+                 max_keepalive: int = HTTP_MAX_KEEPALIVE,
+                 per_host_limit: int = HTTP_PER_HOST_LIMIT,
+                 timeout: httpx.Timeout = HTTP_TIMEOUT,
+                 http2: bool = HTTP2_AVAILABLE,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.limits = httpx.Limits(max_connections=max_connections,
+                                   max_keepalive_connections=max_keepalive,
+                                   keepalive_expiry=30.0)
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.http2 = http2
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Returns the pooled client for the running loop, creating it if needed."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            # A client cannot be shared across event loops; a new loop
+            # (e.g. a fresh asyncio.run) gets its own pool.
+            self._client = httpx.AsyncClient(
+                http2=self.http2, limits=self.limits, timeout=self.timeout,
+                headers=DEFAULT_HEADERS, follow_redirects=True, transport=self.transport)
+            self._loop = loop
+            self._host_slots = {}
+            logger.info("HTTP client pool created (http2=%s)", self.http2)
+        return self._client
+
+    def _host_slot(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        slot = self._host_slots.get(host)
+        if slot is None:
+            slot = asyncio.Semaphore(self.per_host_limit)
+            self._host_slots[host] = slot
+        return slot
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Sends a request through the shared pool, respecting the per-host limit."""
+        client = self.client
+        async with self._host_slot(url):
+            return await client.request(method, url, **kwargs)
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        """GET through the shared pool."""
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        """POST through the shared pool."""
+        return await self.request("POST", url, **kwargs)
+
+    async def head(self, url: str, **kwargs: Any) -> httpx.Response:
+        """HEAD through the shared pool."""
+        return await self.request("HEAD", url, **kwargs)
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs: Any) -> AsyncIterator[httpx.Response]:
+        """
+        Streaming request context manager on the shared pool. The host slot
+        is held until the stream is closed.
+        """
+        client = self.client
+        async with self._host_slot(url):
+            async with client.stream(method, url, **kwargs) as response:
+                yield response
+
+    async def aclose(self) -> None:
+        """Closes the pool; the next request opens a new one."""
+        client, self._client = self._client, None
+        self._loop = None
+        self._host_slots = {}
+        if client is not None and not client.is_closed:
+            try:
+                await client.aclose()
+            except RuntimeError as e:
+                # The owning loop may already be gone
+                logger.debug("HTTP client close skipped: %s", e)
+
+
+# Global Instance
+http_client = SharedHTTPClient()
@@ -2,16 +2,20 @@
 # jarvis_image_gen.py
 Jarvis Image Generation Module
 Primary: Hugging Face Inference API (FLUX.1-schnell)
-Fallback: Pollinations.ai (Synchronous)
+Fallback: Pollinations.ai
 """
 
+import asyncio
 import os
 import re
 from datetime import datetime
-import requests
+from urllib.parse import quote
 from dotenv import load_dotenv
 from huggingface_hub import InferenceClient
 from jarvis_logger import setup_logger
+from jarvis_circuit import CircuitOpenError, circuit_breakers
+from jarvis_http import HTTP_ERRORS, http_client
+from jarvis_ratelimit import RateLimitError, rate_limits
 
 # Setup logging
 logger = setup_logger("JARVIS-IMAGE-GEN")
@@ -45,12 +49,12 @@ def generate_via_hf(prompt: str) -> str:
         os.startfile(filepath)  # nosec B606
         logger.info("HF Image saved and opened: %s", filepath)
         return f"Success: Image generated via Hugging Face and saved to {filepath}"
-    except (ImportError, ValueError, OSError, requests.exceptions.RequestException) as e:
+    except (ImportError, ValueError, OSError, *HTTP_ERRORS) as e:
         logger.warning("Hugging Face attempt failed: %s", str(e))
         return None
 
 
-def generate_via_pollinations(prompt: str) -> str:
+async def generate_via_pollinations(prompt: str) -> str:
     """Fallback fast-path using Pollinations.ai."""
     logger.info("Attempting generation via Pollinations fallback...")
 
@@ -59,7 +63,7 @@ def generate_via_pollinations(prompt: str) -> str:
         r'[^a-zA-Z0-9\s]', '', prompt).split() if len(w) > 2]
     short_prompt = " ".join(words[:5])
 
-    safe_prompt = requests.utils.quote(short_prompt)
+    safe_prompt = quote(short_prompt)
     url = f"https://image.pollinations.ai/prompt/{safe_prompt}?nologo=true"
     headers = {
         "User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -70,7 +74,9 @@ def generate_via_pollinations(prompt: str) -> str:
     }
 
     try:
-        response = requests.get(url, headers=headers, timeout=30)
+        response = await rate_limits.run(
+            "pollinations", safe_prompt,
+            lambda: http_client.get(url, headers=headers, timeout=30))
         if response.status_code == 200 and response.content.startswith((b'\xff\xd8\xff', b'\x89PNG', b'RIFF')):
             image_dir = os.path.join(
                 os.getcwd(), "Jarvis_Outputs", "Generated_Images")
@@ -86,25 +92,39 @@ def generate_via_pollinations(prompt: str) -> str:
                 "Pollinations Image saved and opened: %s", filepath)
             return (f"Success: Image generated via Pollinations for "
                     f"'{short_prompt}'. Saved to {filepath}")
-    except (requests.RequestException, OSError) as e:
+    except (*HTTP_ERRORS, RateLimitError, OSError) as e:
         logger.warning("Pollinations fallback failed: %s", str(e))
     return None
 
 
-def generate_image(prompt: str) -> str:
+def _hf_failure(result: str) -> str:
+    """A missing HF result counts as a failure only when a token is configured."""
+    return "" if result or not os.getenv("HF_TOKEN") else "Hugging Face generation failed"
+
+
+async def generate_image(prompt: str) -> dict:
     """Main entry point with multi-provider failover."""
     logger.info("Generating image with prompt: %s", prompt)
 
-    # 1. Try Hugging Face (FLUX) - Best quality
-    result = generate_via_hf(prompt)
+    # 1. Try Hugging Face (FLUX) - Best quality; the SDK call is blocking.
+    # Skipped while its circuit is open (quota exhausted or repeated failures).
+    # The same prompt requested twice at once is generated only once.
+    result = None
+    try:
+        result = await rate_limits.run(
+            "huggingface", prompt.strip().lower(),
+            lambda: circuit_breakers.get("huggingface").call(
+                asyncio.to_thread, generate_via_hf, prompt, is_failure=_hf_failure))
+    except (CircuitOpenError, RateLimitError) as e:
+        logger.info("Hugging Face unavailable (%s), going straight to Pollinations.", e)
     if result:
         return {
             "status": "success",
             "message": result
         }
 
-    # 2. Try Pollinations (Synchronous Fallback)
-    result = generate_via_pollinations(prompt)
+    # 2. Try Pollinations (pooled async fallback)
+    result = await generate_via_pollinations(prompt)
     if result:
         return {
             "status": "success",
@@ -126,7 +146,6 @@ try:
         """
         Generates an image via description. Use for 'draw' or 'generate an image'.
         """
-        import asyncio
-        return await asyncio.to_thread(generate_image, prompt)
+        return await generate_image(prompt)
 except ImportError:
     pass
@@ -0,0 +1,274 @@
+"""
+# jarvis_intent_model.py
+Local linear intent classifier for JARVIS.
+
+Utterances are mapped to hashed character n-gram features and scored by a
+one-vs-rest logistic model whose weights are plain NumPy arrays. The model is
+trained offline from a labelled utterance file and used as an alternative
+backend to the regex rules in `jarvis_reasoning.IntentAnalyzer`.
+
+Usage:
+    python jarvis_intent_model.py seed     # regenerate intent_data/utterances.jsonl
+    python jarvis_intent_model.py train    # train and save the model
+"""
+
+import argparse
+import json
+import os
+import random
+import zlib
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from jarvis_logger import setup_logger
+
+logger = setup_logger("JARVIS-INTENT-MODEL")
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, "intent_data")
+SEED_DATA_PATH = os.path.join(DATA_DIR, "utterances.jsonl")
+EVAL_DATA_PATH = os.path.join(DATA_DIR, "eval.jsonl")
+MODEL_PATH = os.path.join(BASE_DIR, "conversations", "models", "intent_linear.npz")
+
+
+class HashedNgramVectorizer:
+    """
+    Maps text to sparse hashed character n-gram counts.
+    Features are returned as flat (row, column, value) arrays so batches never
+    materialise a dense matrix.
+    """
+
+    def __init__(self, n_features: int = 2 ** 15, ngram_range: Tuple[int, int] = (2, 4),
+                 cache_size: int = 50000):
+        self.n_features = n_features
+        self.ngram_range = ngram_range
+        self.cache_size = cache_size
+        self._cache: Dict[str, Tuple[int, ...]] = {}
+
+    def _word_columns(self, word: str) -> Tuple[int, ...]:
+        cached = self._cache.get(word)
+        if cached is None:
+            padded = f" {word} "
+            low, high = self.ngram_range
+            # crc32 keeps feature ids stable across processes
+            cached = tuple(
+                zlib.crc32(padded[i:i + n].encode("utf-8")) % self.n_features
+                for n in range(low, high + 1)
+                for i in range(len(padded) - n + 1))
+            if len(self._cache) < self.cache_size:
+                self._cache[word] = cached
+        return cached
+
+    def _columns(self, text: str) -> List[int]:
+        # N-grams are taken inside word boundaries, so features of repeated
+        # words are computed once and cached.
+        cols: List[int] = []
+        for word in text.lower().split():
+            cols.extend(self._word_columns(word))
+        return cols
+
+    def transform(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns length-normalised features as (rows, cols, values) arrays.
+        Repeated n-grams appear as repeated entries and are summed downstream.
+        """
+        cols: List[int] = []
+        lengths = np.empty(len(texts), dtype=np.int64)
+        for row, text in enumerate(texts):
+            text_cols = self._columns(text)
+            cols.extend(text_cols)
+            lengths[row] = len(text_cols)
+        rows = np.repeat(np.arange(len(texts), dtype=np.int64), lengths)
+        scale = 1.0 / np.sqrt(np.maximum(lengths, 1)).astype(np.float32)
+        return rows, np.asarray(cols, dtype=np.int64), scale[rows]
+
+
+class LinearIntentModel:
+    """
+    One-vs-rest logistic intent classifier over hashed n-gram features.
+    """
+
+    def __init__(self, labels: Sequence[str], vectorizer: Optional[HashedNgramVectorizer] = None,
+                 threshold: float = 0.5):
+        self.labels = list(labels)
+        self.vectorizer = vectorizer or HashedNgramVectorizer()
+        self.threshold = threshold
+        self.weights = np.zeros((self.vectorizer.n_features, len(self.labels)), dtype=np.float32)
+        self.bias = np.zeros(len(self.labels), dtype=np.float32)
+
+    def _logits(self, texts: Sequence[str]) -> np.ndarray:
+        rows, cols, vals = self.vectorizer.transform(texts)
+        logits = np.zeros((len(texts), len(self.labels)), dtype=np.float32)
+        if len(cols):
+            # Rows arrive sorted, so each text's n-grams form one contiguous run
+            contrib = self.weights[cols] * vals[:, None]
+            starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+            logits[rows[starts]] = np.add.reduceat(contrib, starts, axis=0)
+        return logits + self.bias
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        """Returns an (n_texts, n_labels) matrix of per-intent probabilities."""
+        if not texts:
+            return np.zeros((0, len(self.labels)), dtype=np.float32)
+        return 1.0 / (1.0 + np.exp(-self._logits(texts)))
+
+    def predict_many(self, texts: Sequence[str]) -> List[Dict[str, float]]:
+        """
+        Batched inference. Returns, per text, {intent: confidence} for every
+        intent above the decision threshold.
+        """
+        probs = self.predict_proba(texts)
+        return [
+            {self.labels[k]: round(float(p), 4) for k, p in enumerate(row) if p >= self.threshold}
+            for row in probs
+        ]
+
+    def fit(self, texts: Sequence[str], targets: Sequence[Iterable[str]], epochs: int = 400,
+            learning_rate: float = 20.0, l2: float = 1e-5) -> "LinearIntentModel":
+        """Full-batch gradient descent on the logistic loss."""
+        index = {label: k for k, label in enumerate(self.labels)}
+        y = np.zeros((len(texts), len(self.labels)), dtype=np.float32)
+        for row, labels in enumerate(targets):
+            for label in labels:
+                y[row, index[label]] = 1.0
+
+        rows, cols, vals = self.vectorizer.transform(texts)
+        n = max(len(texts), 1)
+        for _ in range(epochs):
+            logits = np.empty_like(y)
+            for k in range(len(self.labels)):
+                logits[:, k] = np.bincount(rows, weights=vals * self.weights[cols, k],
+                                           minlength=len(texts))
+            error = 1.0 / (1.0 + np.exp(-(logits + self.bias))) - y
+            grad = np.zeros_like(self.weights)
+            np.add.at(grad, cols, vals[:, None] * error[rows])
+            self.weights -= learning_rate * (grad / n + l2 * self.weights)
+            self.bias -= learning_rate * error.mean(axis=0)
+        return self
+
+    def save(self, path: str = MODEL_PATH) -> None:
+        """Stores the weights and vectorizer settings as a compressed .npz file."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez_compressed(
+            path, weights=self.weights, bias=self.bias, labels=np.asarray(self.labels),
+            n_features=self.vectorizer.n_features,
+            ngram_range=np.asarray(self.vectorizer.ngram_range),
+            threshold=self.threshold)
+
+    @classmethod
+    def load(cls, path: str = MODEL_PATH) -> "LinearIntentModel":
+        """Loads a model written by `save`."""
+        with np.load(path) as data:
+            vectorizer = HashedNgramVectorizer(
+                int(data["n_features"]), tuple(int(v) for v in data["ngram_range"]))
+            model = cls([str(label) for label in data["labels"]], vectorizer,
+                        float(data["threshold"]))
+            model.weights = data["weights"].astype(np.float32)
+            model.bias = data["bias"].astype(np.float32)
+        return model
+
+
+def load_utterances(path: str) -> Tuple[List[str], List[List[str]]]:
+    """Reads a JSONL file of {"text": ..., "intents": [...]} records."""
+    texts, targets = [], []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            texts.append(record["text"])
+            targets.append(list(record.get("intents", [])))
+    return texts, targets
+
+
+def train_from_file(data_path: str = SEED_DATA_PATH,
+                    labels: Optional[Sequence[str]] = None, **fit_kwargs) -> LinearIntentModel:
+    """Trains a model on a labelled utterance file."""
+    texts, targets = load_utterances(data_path)
+    if labels is None:
+        labels = sorted({label for target in targets for label in target})
+    return LinearIntentModel(labels).fit(texts, targets, **fit_kwargs)
+
+
+def load_intent_classifier(path: str = MODEL_PATH) -> Optional[LinearIntentModel]:
+    """
+    Loads the trained model. Returns None when no saved model exists; it is
+    never trained on the live path (run `python jarvis_intent_model.py train`).
+    """
+    if not os.path.exists(path):
+        logger.warning("No intent model at %s; run 'python jarvis_intent_model.py train'.", path)
+        return None
+    try:
+        return LinearIntentModel.load(path)
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logger.error("Could not load intent model: %s", e)
+    return None
+
+
+_SEED_FILLER = [
+    "sir", "please", "zara", "mera", "aap", "yeh", "abhi", "jaldi", "bhai",
+    "the", "a", "my", "for", "me", "ek", "wala", "new", "is", "ko", "aaj", "kal",
+    "ka", "pe", "mein", "zaroor", "jo", "wo"
+]
+_SEED_GENERAL = [
+    "theek hai", "shukriya sir", "acha samajh gaya", "nice", "ok cool",
+    "main thak gaya hoon", "aaj ka din lamba tha", "bas aise hi", "tum bohat ache ho",
+    "chalo baad mein baat karte hain", "mujhe neend aa rahi hai", "that was fun",
+    "i am bored", "koi baat nahi", "let it be", "sab sahi hai", "bilkul"
+]
+
+
+def seed_utterances(count_per_rule: int = 8, seed: int = 13) -> List[Dict[str, object]]:
+    """
+    Expands every regex rule of IntentAnalyzer into example utterances
+    labelled with the intent that owns the rule.
+    """
+    from jarvis_reasoning import IntentAnalyzer  # pylint: disable=import-outside-toplevel
+
+    rnd = random.Random(seed)
+    records: List[Dict[str, object]] = []
+    for intent, patterns in IntentAnalyzer().intent_patterns.items():
+        for pattern in patterns:
+            parts = [p for p in pattern.replace(r"\b", "").split(".*") if p]
+            for _ in range(count_per_rule):
+                words: List[str] = []
+                for part in parts:
+                    words.extend(rnd.choice(_SEED_FILLER) for _ in range(rnd.randint(0, 2)))
+                    words.append(part)
+                words.extend(rnd.choice(_SEED_FILLER) for _ in range(rnd.randint(0, 2)))
+                if rnd.random() < 0.5:
+                    words.insert(0, rnd.choice(["jarvis", "anna"]))
+                records.append({"text": " ".join(words), "intents": [intent]})
+    for text in _SEED_GENERAL:
+        for prefix in ("", "jarvis ", "anna "):
+            records.append({"text": prefix + text, "intents": []})
+    return records
+
+
+def main():
+    """Command line entry point for seeding and training."""
+    parser = argparse.ArgumentParser(description="JARVIS local intent classifier")
+    sub = parser.add_subparsers(dest="command", required=True)
+    seed_cmd = sub.add_parser("seed", help="Generate seed utterances from the regex rules")
+    seed_cmd.add_argument("--out", default=SEED_DATA_PATH)
+    train_cmd = sub.add_parser("train", help="Train the model on a labelled utterance file")
+    train_cmd.add_argument("--data", default=SEED_DATA_PATH)
+    train_cmd.add_argument("--out", default=MODEL_PATH)
+    train_cmd.add_argument("--epochs", type=int, default=400)
+    args = parser.parse_args()
+
+    if args.command == "seed":
+        records = seed_utterances()
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        with open(args.out, "w", encoding="utf-8", newline="\n") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        print(f"Wrote {len(records)} utterances to {args.out}")
+    else:
+        model = train_from_file(args.data, epochs=args.epochs)
+        model.save(args.out)
+        print(f"Saved intent model ({len(model.labels)} intents) to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+# jarvis_location.py
+Persisted location cache for JARVIS.
+
+The detected city is stored in conversations/cache/location.json with the
+time it was looked up. Startup reads it from disk instead of calling the
+geolocation API; stale or missing entries are refreshed in the background.
+"""
+
+import asyncio
+import json
+import os
+import time
+from typing import Awaitable, Callable, Optional
+from jarvis_logger import setup_logger
+
+logger = setup_logger("JARVIS-LOCATION")
+
+LOCATION_CACHE_PATH = os.path.join("conversations", "cache", "location.json")
+# Seconds a detected city is considered current
+LOCATION_TTL = float(os.getenv("JARVIS_LOCATION_TTL", str(12 * 3600)))
+
+CityFetcher = Callable[[], Awaitable[Optional[str]]]
+
+
+class LocationCache:
+    """
+    Disk-backed city cache with background refresh.
+    """
+
+    def __init__(self, path: str = LOCATION_CACHE_PATH, ttl: float = LOCATION_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._city: Optional[str] = None
+        self._fetched_at = 0.0
+        self._loaded = False
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._city = data.get("city") or None
+            self._fetched_at = float(data.get("fetched_at", 0))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            logger.warning("Ignoring unreadable location cache: %s", e)
+
+    def _save(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"city": self._city, "fetched_at": self._fetched_at}, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning("Could not persist location cache: %s", e)
+
+    @property
+    def city(self) -> Optional[str]:
+        """Last known city (possibly stale), or None."""
+        self._load()
+        return self._city
+
+    @property
+    def is_fresh(self) -> bool:
+        """True when the cached city is younger than the TTL."""
+        self._load()
+        return self._city is not None and time.time() - self._fetched_at < self.ttl
+
+    def set(self, city: str) -> None:
+        """Stores a city as freshly detected."""
+        self._loaded = True
+        self._city = city
+        self._fetched_at = time.time()
+        self._save()
+
+    async def _refresh(self, fetch: CityFetcher) -> Optional[str]:
+        city = await fetch()
+        if city:
+            if city != self._city:
+                logger.info("Location updated: %s", city)
+            self.set(city)
+        return city
+
+    def refresh(self, fetch: CityFetcher) -> asyncio.Task:
+        """Starts (or joins) a single background refresh."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh(fetch))
+        return self._refresh_task
+
+    async def get(self, fetch: CityFetcher, wait: bool = True) -> Optional[str]:
+        """
+        Returns the cached city, refreshing stale entries in the background.
+        With nothing cached, waits for a lookup only when `wait` is True.
+        """
+        if self.is_fresh:
+            return self._city
+        task = self.refresh(fetch)
+        if self._city is not None or not wait:
+            return self._city
+        return await asyncio.shield(task)
+
+
+# Global Instance
+location_cache = LocationCache()
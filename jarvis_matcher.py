@@ -0,0 +1,214 @@
+"""
+# jarvis_matcher.py
+Precompiled multi-pattern matcher for JARVIS.
+
+Evaluates many keyword-style regex rules (wake words, intents, context cues)
+with a single scan of the text instead of one `re.search` per rule.
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+from jarvis_logger import setup_logger
+
+logger = setup_logger("JARVIS-MATCHER")
+
+_META_CHARS = set(".^$*+?{}[]\\|()")
+
+
+def _is_word_char(ch: str) -> bool:
+    """Mirrors the `\\w` definition used by `re` for str patterns."""
+    return ch.isalnum() or ch == "_"
+
+
+def _is_boundary(text: str, pos: int) -> bool:
+    """True if `\\b` would match at `pos` in `text`."""
+    before = pos > 0 and _is_word_char(text[pos - 1])
+    after = pos < len(text) and _is_word_char(text[pos])
+    return before != after
+
+
+def _parse_rule(pattern: str) -> Optional[Tuple[List[str], bool, bool]]:
+    """
+    Splits a rule of the form `[\\b]lit(.*lit)*[.*][\\b]` into literal segments.
+    Returns None when the rule uses any other regex syntax.
+    """
+    body = pattern
+    lead_boundary = body.startswith(r"\b")
+    if lead_boundary:
+        body = body[2:]
+    trail_boundary = body.endswith(r"\b")
+    if trail_boundary:
+        body = body[:-2]
+
+    segments = body.split(".*")
+    if segments and segments[-1] == "" and not trail_boundary:
+        segments.pop()  # Trailing ".*" matches the empty string
+    if not segments or any(not seg for seg in segments):
+        return None
+    if any(ch in _META_CHARS for seg in segments for ch in seg):
+        return None
+    return segments, lead_boundary, trail_boundary
+
+
+def _build_trie_regex(words: List[str]) -> str:
+    """Builds a prefix-factored alternation that prefers the longest word."""
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def _render(node: dict) -> str:
+        is_end = "" in node
+        branches = [re.escape(ch) + _render(child)
+                    for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        if is_end:
+            # Greedy optional part: try the longer word first.
+            return f"(?:{body})?" if len(branches) == 1 else f"{body}?"
+        return body
+
+    return _render(trie)
+
+
+class MultiPatternMatcher:
+    """
+    Matches labelled groups of keyword rules in one pass over the text.
+
+    Every distinct literal in the rules is compiled into a single trie-shaped
+    alternation inside a lookahead, so one `finditer` reports where each
+    literal occurs. Rules are then resolved from those positions; rules that
+    use other regex syntax fall back to their own precompiled regex.
+    """
+
+    def __init__(self, pattern_groups: Dict[str, List[str]], ignore_case: bool = True):
+        self.ignore_case = ignore_case
+        self.labels = list(pattern_groups)
+        self._rules: List[Tuple[str, List[str], bool, bool]] = []
+        self._fallback: List[Tuple[str, re.Pattern]] = []
+        flags = re.IGNORECASE if ignore_case else 0
+
+        atoms: Dict[str, None] = {}
+        for label, patterns in pattern_groups.items():
+            for pattern in patterns:
+                parsed = _parse_rule(pattern.lower() if ignore_case else pattern)
+                if parsed is None:
+                    self._fallback.append((label, re.compile(pattern, flags)))
+                    continue
+                segments, lead, trail = parsed
+                self._rules.append((label, segments, lead, trail))
+                for seg in segments:
+                    atoms[seg] = None
+
+        # Literal single-segment rules resolve by presence alone.
+        self._simple: Dict[str, List[str]] = {}
+        # Other rules are only evaluated when their last segment was seen.
+        self._complex: Dict[str, List[int]] = {}
+        for idx, (label, segments, lead, trail) in enumerate(self._rules):
+            if len(segments) == 1 and not lead and not trail:
+                self._simple.setdefault(segments[0], []).append(label)
+            else:
+                self._complex.setdefault(segments[-1], []).append(idx)
+
+        # A longest match at a position implies every shorter atom that is
+        # its prefix also matches there.
+        self._implied: Dict[str, List[str]] = {
+            atom: [other for other in atoms if atom.startswith(other)]
+            for atom in atoms
+        }
+        self._scanner = (re.compile(f"(?=({_build_trie_regex(list(atoms))}))")
+                         if atoms else None)
+
+    def _scan_positions(self, text: str) -> Dict[str, List[int]]:
+        """Returns the start offsets of every literal atom in `text`."""
+        positions: Dict[str, List[int]] = {}
+        if self._scanner is None:
+            return positions
+        implied = self._implied
+        for match in self._scanner.finditer(text):
+            start = match.start()
+            for atom in implied[match.group(1)]:
+                positions.setdefault(atom, []).append(start)
+        return positions
+
+    @staticmethod
+    def _rule_matches(text: str, positions: Dict[str, List[int]],
+                      segments: List[str], lead: bool, trail: bool) -> bool:
+        """Resolves a `lit(.*lit)*` rule using precomputed atom positions."""
+        cursor = 0
+        last = len(segments) - 1
+        for i, seg in enumerate(segments):
+            found = False
+            for pos in positions.get(seg, ()):
+                if pos < cursor:
+                    continue
+                if i == 0 and lead and not _is_boundary(text, pos):
+                    continue
+                end = pos + len(seg)
+                if i == last and trail and not _is_boundary(text, end):
+                    continue
+                cursor = end
+                found = True
+                break
+            if not found:
+                return False
+        return True
+
+    def _match_line(self, text: str, counts: Dict[str, int]) -> None:
+        positions = self._scan_positions(text)
+        if not positions:
+            return
+        for atom in positions:
+            for label in self._simple.get(atom, ()):
+                counts[label] = counts.get(label, 0) + 1
+            for idx in self._complex.get(atom, ()):
+                label, segments, lead, trail = self._rules[idx]
+                if self._rule_matches(text, positions, segments, lead, trail):
+                    counts[label] = counts.get(label, 0) + 1
+
+    def match(self, text: str) -> Dict[str, int]:
+        """
+        Returns {label: number of rules matched} for every label with a hit.
+        Counts follow `re.search` semantics for each rule individually.
+        """
+        if not text:
+            return {}
+        if self.ignore_case:
+            text = text.lower()
+
+        counts: Dict[str, int] = {}
+        if "\n" in text:
+            # `.` does not cross newlines, so each line is resolved on its own
+            # and a rule counts once if any line satisfies it.
+            per_line = [self._line_hits(line) for line in text.split("\n")]
+            for idx in set().union(*per_line):
+                label = self._rule_label(idx)
+                counts[label] = counts.get(label, 0) + 1
+        else:
+            self._match_line(text, counts)
+
+        for label, regex in self._fallback:
+            if regex.search(text):
+                counts[label] = counts.get(label, 0) + 1
+        return counts
+
+    def _rule_label(self, idx: int) -> str:
+        return self._rules[idx][0]
+
+    def _line_hits(self, line: str) -> set:
+        """Returns the indices of rules satisfied within a single line."""
+        hits = set()
+        positions = self._scan_positions(line)
+        for idx, (_, segments, lead, trail) in enumerate(self._rules):
+            if segments[-1] in positions and self._rule_matches(
+                    line, positions, segments, lead, trail):
+                hits.add(idx)
+        return hits
+
+    def matched_labels(self, text: str) -> List[str]:
+        """Returns the labels with at least one matching rule, in declaration order."""
+        counts = self.match(text)
+        return [label for label in self.labels if label in counts]
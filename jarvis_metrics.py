@@ -5,8 +5,10 @@ Handles system metrics collection (CPU, RAM, Track info) for JARVIS.
 
 import platform
 import subprocess
-import psutil
 import threading
+from collections import deque
+from typing import Dict, Iterable
+import psutil
 from jarvis_logger import setup_logger
 
 logger = setup_logger("JARVIS-METRICS")
@@ -75,3 +77,82 @@ class MetricsCollector:
             'ram': self.ram,
             'track': self.track
         }
+
+
+def nearest_rank_percentiles(samples: Iterable[float],
+                             points: Iterable[int] = (50, 90, 99)) -> Dict[str, float]:
+    """Returns {"p50": ..., ...} nearest-rank percentiles of `samples`."""
+    ordered = sorted(samples)
+    if not ordered:
+        return {}
+    result = {}
+    for point in points:
+        rank = max(0, min(len(ordered) - 1,
+                          int(round(point / 100 * len(ordered))) - 1))
+        result[f"p{point}"] = ordered[rank]
+    return result
+
+
+class PerfStats:
+    """
+    Thread-safe counters and timing samples for agent performance reporting.
+    Timings keep a bounded window of recent samples per metric name.
+    """
+
+    def __init__(self, max_samples: int = 500):
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {}
+        self._timings: Dict[str, deque] = {}
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        """Increments a named counter."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def observe(self, name: str, value: float) -> None:
+        """Records a timing sample (seconds) for a metric."""
+        with self._lock:
+            samples = self._timings.get(name)
+            if samples is None:
+                samples = deque(maxlen=self.max_samples)
+                self._timings[name] = samples
+            samples.append(value)
+
+    def count(self, name: str) -> int:
+        """Returns the current value of a counter."""
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def hit_rate(self, hits: str, misses: str) -> float:
+        """Returns hits / (hits + misses) for two counters, 0.0 when empty."""
+        with self._lock:
+            hit_count = self._counters.get(hits, 0)
+            total = hit_count + self._counters.get(misses, 0)
+        return hit_count / total if total else 0.0
+
+    def percentiles(self, name: str, points: Iterable[int] = (50, 90, 99)) -> Dict[str, float]:
+        """Returns nearest-rank percentiles for a timing metric."""
+        with self._lock:
+            samples = list(self._timings.get(name, ()))
+        return nearest_rank_percentiles(samples, points)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Returns counters and timing percentiles as a plain dict."""
+        with self._lock:
+            counters = dict(self._counters)
+            names = list(self._timings)
+        return {
+            "counters": counters,
+            "timings": {name: self.percentiles(name) for name in names}
+        }
+
+    def reset(self) -> None:
+        """Clears all counters and samples."""
+        with self._lock:
+            self._counters.clear()
+            self._timings.clear()
+
+
+# Global Instance
+perf_stats = PerfStats()
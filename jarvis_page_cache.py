@@ -0,0 +1,211 @@
+"""
+# jarvis_page_cache.py
+On-disk cache of scraped pages for JARVIS.
+
+Extracted page text (and its links, when they were collected) is stored per
+URL in SQLite (conversations/cache/page_cache.sqlite3) together with the
+server's ETag and Last-Modified headers. Fresh entries are served without any
+request; older ones are revalidated with a conditional GET, and a 304 reuses
+the stored text. The cache is bounded by total size and evicts the least
+recently used pages first.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from jarvis_logger import setup_logger
+from jarvis_metrics import perf_stats
+
+logger = setup_logger("JARVIS-PAGE-CACHE")
+
+PAGE_CACHE_PATH = os.path.join("conversations", "cache", "page_cache.sqlite3")
+# Seconds a page is reused without asking the server
+PAGE_CACHE_FRESH_TTL = float(os.getenv("JARVIS_PAGE_CACHE_TTL", "3600"))
+# Total size of cached text before least recently used pages are evicted
+PAGE_CACHE_MAX_BYTES = int(float(os.getenv("JARVIS_PAGE_CACHE_MB", "50")) * 1024 * 1024)
+
+
+class PageCache:
+    """
+    SQLite page store with conditional-GET validators and size-capped LRU eviction.
+    """
+
+    def __init__(self, path: str = PAGE_CACHE_PATH, max_bytes: int = PAGE_CACHE_MAX_BYTES,
+                 fresh_ttl: float = PAGE_CACHE_FRESH_TTL):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.fresh_ttl = fresh_ttl
+        self._db_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._total_bytes = 0
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                "url TEXT PRIMARY KEY, text TEXT NOT NULL, etag TEXT, last_modified TEXT, "
+                "max_chars INTEGER NOT NULL, size INTEGER NOT NULL, "
+                "fetched_at REAL NOT NULL, accessed_at REAL NOT NULL, links TEXT)")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed_at)")
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(pages)")}
+            if "links" not in columns:  # Caches created before links were stored
+                self._conn.execute("ALTER TABLE pages ADD COLUMN links TEXT")
+            self._conn.commit()
+            self._total_bytes = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        return self._conn
+
+    def get(self, url: str, max_chars: int) -> Optional[Dict[str, Any]]:
+        """
+        Returns the cached entry for `url` if it holds at least `max_chars`
+        of text (or the whole page), marking it as recently used. "links" is
+        None when the page was cached without collecting its links.
+        """
+        with self._db_lock:
+            conn = self._db()
+            row = conn.execute(
+                "SELECT text, etag, last_modified, max_chars, fetched_at, links "
+                "FROM pages WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            text, etag, last_modified, stored_max, fetched_at, links = row
+            if stored_max < max_chars and len(text) >= stored_max:
+                # Stored with a smaller cap and the page was cut off there
+                return None
+            conn.execute("UPDATE pages SET accessed_at = ? WHERE url = ?", (time.time(), url))
+            conn.commit()
+        return {
+            "text": text[:max_chars],
+            "etag": etag,
+            "last_modified": last_modified,
+            "links": [tuple(link) for link in json.loads(links)] if links else None,
+            "age": time.time() - fetched_at,
+        }
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        """True when an entry can be used without revalidating it."""
+        return entry["age"] < self.fresh_ttl
+
+    @staticmethod
+    def conditional_headers(entry: Dict[str, Any]) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers for revalidating an entry."""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def put(self, url: str, text: str, max_chars: int, etag: Optional[str] = None,
+            last_modified: Optional[str] = None,
+            links: Optional[List[Tuple[str, str]]] = None) -> None:
+        """Stores a page's text, validators and links, then evicts down to the size cap."""
+        encoded_links = json.dumps(links, ensure_ascii=False) if links is not None else None
+        size = len(text.encode("utf-8")) + len(encoded_links or "")
+        now = time.time()
+        with self._db_lock:
+            conn = self._db()
+            old = conn.execute("SELECT size FROM pages WHERE url = ?", (url,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO pages (url, text, etag, last_modified, max_chars, size, "
+                "fetched_at, accessed_at, links) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, text, etag, last_modified, max_chars, size, now, now, encoded_links))
+            self._total_bytes += size - (old[0] if old else 0)
+            self._evict(conn)
+            conn.commit()
+
+    def touch(self, url: str) -> None:
+        """Marks a revalidated (304) entry as freshly fetched."""
+        now = time.time()
+        with self._db_lock:
+            conn = self._db()
+            conn.execute("UPDATE pages SET fetched_at = ?, accessed_at = ? WHERE url = ?",
+                         (now, now, url))
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        while self._total_bytes > self.max_bytes:
+            rows = conn.execute(
+                "SELECT url, size FROM pages ORDER BY accessed_at LIMIT 32").fetchall()
+            if not rows:
+                self._total_bytes = 0
+                return
+            for url, size in rows:
+                if self._total_bytes <= self.max_bytes:
+                    break
+                conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+                self._total_bytes -= size
+                perf_stats.incr("page_cache.evicted")
+
+    @property
+    def total_bytes(self) -> int:
+        """Size of all cached text."""
+        with self._db_lock:
+            self._db()
+            return self._total_bytes
+
+    async def lookup(self, url: str, max_chars: int) -> Optional[Dict[str, Any]]:
+        """Async `get` that treats database errors as a miss."""
+        try:
+            return await asyncio.to_thread(self.get, url, max_chars)
+        except sqlite3.Error as e:
+            logger.warning("Page cache read failed: %s", e)
+            return None
+
+    async def store(self, url: str, text: str, max_chars: int, etag: Optional[str] = None,
+                    last_modified: Optional[str] = None,
+                    links: Optional[List[Tuple[str, str]]] = None) -> None:
+        """Async `put` that logs database errors instead of raising."""
+        try:
+            await asyncio.to_thread(self.put, url, text, max_chars, etag, last_modified, links)
+        except sqlite3.Error as e:
+            logger.warning("Page cache write failed: %s", e)
+
+    async def revalidated(self, url: str) -> None:
+        """Async `touch` that logs database errors instead of raising."""
+        try:
+            await asyncio.to_thread(self.touch, url)
+        except sqlite3.Error as e:
+            logger.warning("Page cache update failed: %s", e)
+
+    def clear(self) -> None:
+        """Removes every cached page."""
+        with self._db_lock:
+            conn = self._db()
+            conn.execute("DELETE FROM pages")
+            conn.commit()
+            self._total_bytes = 0
+
+    def close(self) -> None:
+        """Closes the SQLite connection."""
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def page_cache_stats() -> Dict[str, Any]:
+    """Hit, revalidation and eviction counters."""
+    hits = perf_stats.count("page_cache.hit")
+    not_modified = perf_stats.count("page_cache.not_modified")
+    misses = perf_stats.count("page_cache.miss")
+    total = hits + not_modified + misses
+    return {
+        "hits": hits,
+        "not_modified": not_modified,
+        "misses": misses,
+        "stale_served": perf_stats.count("page_cache.stale_served"),
+        "evicted": perf_stats.count("page_cache.evicted"),
+        "hit_rate": (hits + not_modified) / total if total else 0.0,
+    }
+
+
+# Global Instance
+page_cache = PageCache()
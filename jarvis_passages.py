@@ -0,0 +1,219 @@
+"""
+# jarvis_passages.py
+Passage selection for web research context.
+
+Scraped pages are split into passages of a few sentences, scored against the
+query with BM25, and near-duplicate passages across sources (syndicated
+articles, mirrored boilerplate) are removed with MinHash over word shingles.
+The best passages are packed into a token budget and grouped back by source,
+so the LLM sees the relevant parts of every page instead of each page's first
+few thousand characters.
+"""
+
+import math
+import os
+import re
+import zlib
+from collections import Counter
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+from jarvis_context_budget import ContextBudget
+from jarvis_logger import setup_logger
+from jarvis_search_cache import normalize_query
+
+logger = setup_logger("JARVIS-PASSAGES")
+
+# Tokens of page text sent to the LLM for one research query
+RESEARCH_TOKEN_BUDGET = int(os.getenv("JARVIS_RESEARCH_TOKEN_BUDGET", "1500"))
+# Target passage length in characters
+PASSAGE_CHARS = 600
+# Estimated Jaccard similarity above which a passage counts as a duplicate
+DUPLICATE_THRESHOLD = 0.7
+SHINGLE_WORDS = 3
+NUM_PERMUTATIONS = 64
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+# One seed per hash function; fixed so signatures are reproducible
+_SEEDS = np.random.default_rng(1).integers(0, 2 ** 63, NUM_PERMUTATIONS, dtype=np.uint64)
+
+Passage = Dict[str, object]
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens."""
+    return _WORD_RE.findall(text.lower())
+
+
+def _split_long(line: str, max_chars: int) -> List[str]:
+    """Splits a line longer than `max_chars` at sentence, then word, boundaries."""
+    pieces: List[str] = []
+    current = ""
+    for part in _SENTENCE_RE.split(line):
+        while len(part) > max_chars:
+            cut = part.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(part[:cut].strip())
+            part = part[cut:].strip()
+        if current and len(current) + len(part) + 1 > max_chars:
+            pieces.append(current)
+            current = part
+        else:
+            current = f"{current} {part}".strip()
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def chunk_text(text: str, max_chars: int = PASSAGE_CHARS) -> List[str]:
+    """Groups consecutive lines of extracted text into passages of about `max_chars`."""
+    passages: List[str] = []
+    current: List[str] = []
+    length = 0
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        for piece in _split_long(line, max_chars) if len(line) > max_chars else [line]:
+            if current and length + len(piece) + 1 > max_chars:
+                passages.append("\n".join(current))
+                current, length = [], 0
+            current.append(piece)
+            length += len(piece) + 1
+    if current:
+        passages.append("\n".join(current))
+    return passages
+
+
+class BM25:
+    """
+    Okapi BM25 over a fixed set of tokenized passages.
+    """
+
+    def __init__(self, documents: Sequence[List[str]], k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        self._freqs = [Counter(doc) for doc in documents]
+        self._lengths = [len(doc) for doc in documents]
+        self._avg_length = (sum(self._lengths) / len(documents)) if documents else 0.0
+        doc_freq: Counter = Counter()
+        for freqs in self._freqs:
+            doc_freq.update(freqs.keys())
+        n = len(documents)
+        self._idf = {term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in doc_freq.items()}
+
+    def scores(self, query_terms: Sequence[str]) -> List[float]:
+        """BM25 score of every passage for the query terms."""
+        terms = [t for t in set(query_terms) if t in self._idf]
+        results = []
+        for freqs, length in zip(self._freqs, self._lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / (self._avg_length or 1.0))
+            score = 0.0
+            for term in terms:
+                tf = freqs.get(term, 0)
+                if tf:
+                    score += self._idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            results.append(score)
+        return results
+
+
+def minhash_signature(tokens: Sequence[str], shingle: int = SHINGLE_WORDS) -> np.ndarray:
+    """MinHash signature of the passage's word shingles."""
+    if len(tokens) < shingle:
+        shingles = [" ".join(tokens)]
+    else:
+        shingles = [" ".join(tokens[i:i + shingle]) for i in range(len(tokens) - shingle + 1)]
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles),
+                         dtype=np.uint64, count=len(shingles))
+    # splitmix64 finaliser of (hash xor seed): an independent permutation per seed
+    z = _SEEDS[:, None] ^ hashes[None, :]
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    z ^= z >> np.uint64(31)
+    return z.min(axis=1)
+
+
+def estimated_similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.count_nonzero(a == b)) / len(a)
+
+
+def rank_passages(query: str, sources: Sequence[Tuple[str, str]],
+                  max_chars: int = PASSAGE_CHARS) -> List[Passage]:
+    """
+    Chunks every source's text and returns its passages best first, without
+    near-duplicates. Each passage is a dict with source, url, position,
+    text and score.
+    """
+    passages: List[Passage] = []
+    for index, (url, text) in enumerate(sources):
+        for position, chunk in enumerate(chunk_text(text or "", max_chars)):
+            passages.append({"source": index, "url": url, "position": position, "text": chunk})
+    if not passages:
+        return []
+
+    tokens = [tokenize(p["text"]) for p in passages]
+    scores = BM25(tokens).scores(tokenize(normalize_query(query)))
+    for passage, score in zip(passages, scores):
+        passage["score"] = score
+    # Ties (e.g. a query with no matching words) keep page order
+    order = sorted(range(len(passages)),
+                   key=lambda i: (-scores[i], passages[i]["position"], passages[i]["source"]))
+
+    kept: List[Passage] = []
+    signatures = np.empty((len(passages), NUM_PERMUTATIONS), dtype=np.uint64)
+    for i in order:
+        signature = minhash_signature(tokens[i])
+        if kept:
+            # Estimated similarity to every kept passage at once
+            similarity = (signatures[:len(kept)] == signature).mean(axis=1)
+            if similarity.max() >= DUPLICATE_THRESHOLD:
+                continue
+        signatures[len(kept)] = signature
+        kept.append(passages[i])
+    if len(kept) < len(passages):
+        logger.info("Dropped %d near-duplicate passages", len(passages) - len(kept))
+    return kept
+
+
+def _source_header(index: int, url: str) -> str:
+    return f"--- SOURCE {index + 1}: {url} ---"
+
+
+def select_passages(query: str, sources: Sequence[Tuple[str, str]],
+                    max_tokens: int = RESEARCH_TOKEN_BUDGET) -> List[Passage]:
+    """Best non-duplicate passages that fit `max_tokens`, including source headers."""
+    budget = ContextBudget(max_tokens)
+    seen_sources = set()
+    selected: List[Passage] = []
+    for passage in rank_passages(query, sources):
+        header = "" if passage["source"] in seen_sources else _source_header(
+            passage["source"], passage["url"])
+        if not budget.reserve(f"{header}\n{passage['text']}" if header else passage["text"]):
+            continue
+        seen_sources.add(passage["source"])
+        selected.append(passage)
+    return selected
+
+
+def build_research_context(query: str, sources: Sequence[Tuple[str, str]],
+                           max_tokens: int = RESEARCH_TOKEN_BUDGET) -> str:
+    """
+    Research payload for the LLM: the selected passages grouped by source,
+    in page order within each source.
+    """
+    selected = select_passages(query, sources, max_tokens)
+    by_source: Dict[int, List[Passage]] = {}
+    for passage in selected:
+        by_source.setdefault(passage["source"], []).append(passage)
+    blocks = []
+    for index in sorted(by_source):
+        passages = sorted(by_source[index], key=lambda p: p["position"])
+        body = "\n\n".join(p["text"] for p in passages)
+        blocks.append(f"{_source_header(index, passages[0]['url'])}\n{body}\n")
+    return "\n".join(blocks)
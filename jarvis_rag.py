@@ -6,21 +6,24 @@ Handles searching, reading, and analyzing local PDF and Word documents.
 
 import os
 import asyncio
-from typing import Optional
+from typing import List, Optional
 from fuzzywuzzy import process
-from pypdf import PdfReader
-from docx import Document
 from livekit.agents import function_tool
 from jarvis_logger import setup_logger
+from jarvis_doc_chunks import DocumentChunkIndex, chroma_errors, doc_chunk_index
+from jarvis_doc_index import DocumentIndex, doc_index
+from jarvis_doc_text_cache import EXTRACT_ERRORS, MAX_DOCUMENT_CHARS, DocTextCache, doc_text_cache
+from jarvis_fs_watcher import IndexWatcher, fs_watcher
 
 # Setup logging
 logger = setup_logger("JARVIS-RAG")
 
 
-# --- Global Index Cache ---
-global_doc_index: list[str] = []
-LAST_INDEX_TIME: float = 0.0
+# Seconds before an unwatched document index is rescanned (rescans only list changed directories)
 INDEX_CACHE_TIMEOUT = 300  # 5 minutes
+# Questions answered from the start of the document rather than retrieved chunks
+SUMMARY_QUESTIONS = ("", "summarize this document", "summarise this document", "summarize",
+                     "summary", "summarize these documents")
 
 
 class DocumentRAG:
@@ -28,41 +31,38 @@ class DocumentRAG:
     Handles RAG operations over local files.
     """
 
-    def __init__(self, search_dirs=None):
+    def __init__(self, search_dirs=None, index: Optional[DocumentIndex] = None,
+                 watcher: Optional[IndexWatcher] = None,
+                 text_cache: Optional[DocTextCache] = None,
+                 chunk_index: Optional[DocumentChunkIndex] = None):
         if search_dirs is None:
             search_dirs = ["D:/"]
         self.search_dirs = search_dirs
+        self.index = index or doc_index
+        self.watcher = watcher or fs_watcher
+        self.text_cache = text_cache or doc_text_cache
+        self.chunks = chunk_index or doc_chunk_index
+        # Newly saved documents are extracted and embedded before anyone asks about them
+        self.index.add_listener(self.text_cache.schedule_many)
+        self.text_cache.add_listener(self.chunks.on_extracted)
+
+    async def refresh_index(self) -> list:
+        """
+        Returns the indexed documents. Watched directories are kept live by
+        filesystem events and only reconciled occasionally; others are
+        rescanned when the index is older than INDEX_CACHE_TIMEOUT.
+        """
+        max_age = await asyncio.to_thread(
+            self.watcher.index_max_age, self.search_dirs, self.index, INDEX_CACHE_TIMEOUT)
+        return await self.index.refresh(self.search_dirs, max_age=max_age)
 
     async def find_document(self, query: str) -> Optional[str]:
         """
         Fuzzy searches for a document in the search directories.
-        Uses a global cache to avoid repetitive slow indexing.
+        Uses the persistent document index, kept live by the filesystem watcher.
         """
-        global global_doc_index, LAST_INDEX_TIME  # pylint: disable=global-statement
-
-        current_time = asyncio.get_event_loop().time()
-
-        # Check cache
-        if global_doc_index and (current_time - LAST_INDEX_TIME < INDEX_CACHE_TIMEOUT):
-            logger.info("⚡ Using cached document index.")
-            file_list = global_doc_index
-        else:
-            def walk_docs():
-                results = []
-                for base_dir in self.search_dirs:
-                    if not os.path.exists(base_dir):
-                        continue
-                    for root, _, files in os.walk(base_dir):
-                        for f in files:
-                            if f.lower().endswith(('.pdf', '.docx')):
-                                results.append(os.path.join(root, f))
-                return results
-
-            logger.info("📂 Indexing documents in %s...", self.search_dirs)
-            file_list = await asyncio.to_thread(walk_docs)
-            global_doc_index = file_list
-            # Using loop time for consistency in async
-            LAST_INDEX_TIME = current_time
+        logger.info("📂 Loading document index for %s...", self.search_dirs)
+        file_list = await self.refresh_index()
 
         if not file_list:
             return None
@@ -83,37 +83,47 @@ class DocumentRAG:
             return match_path
         return None
 
-    def read_pdf(self, file_path: str) -> str:
-        """Reads text from a PDF file."""
-        text = ""
-        try:
-            reader = PdfReader(file_path)
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-            return text
-        except (AttributeError, TypeError, ValueError, KeyError, RuntimeError) as e:
-            logger.error("Error reading PDF %s: %s", file_path, e)
-            return f"Error reading PDF: {e}"
-
-    def read_docx(self, file_path: str) -> str:
-        """Reads text from a Word document."""
+    async def get_document_content(self, file_path: str,
+                                   max_chars: Optional[int] = None) -> str:
+        """
+        Returns the document's text (up to `max_chars`), from the extracted-text
+        cache when this version of the file was read before.
+        """
+        ext = os.path.splitext(file_path)[1].lower()
+        if ext not in (".pdf", ".docx"):
+            return "Unsupported file format."
         try:
-            doc = Document(file_path)
-            return "\n".join([para.text for para in doc.paragraphs])
-        except (AttributeError, TypeError, ValueError, KeyError, RuntimeError) as e:
-            logger.error("Error reading DOCX %s: %s", file_path, e)
-            return f"Error reading DOCX: {e}"
+            return await self.text_cache.text(file_path, max_chars)
+        except EXTRACT_ERRORS as e:
+            logger.error("Error reading %s %s: %s", ext[1:].upper(), file_path, e)
+            return f"Error reading {ext[1:].upper()}: {e}"
 
-    async def get_document_content(self, file_path: str) -> str:
+    async def get_relevant_content(self, file_paths: List[str], question: str) -> str:
         """
-        Dispatches the read task based on file extension.
+        Text for answering `question` from one or more documents: the
+        best-matching chunks within the token budget, or the start of each
+        document for a summary request.
         """
-        ext = os.path.splitext(file_path)[1].lower()
-        if ext == ".pdf":
-            return await asyncio.to_thread(self.read_pdf, file_path)
-        if ext == ".docx":
-            return await asyncio.to_thread(self.read_docx, file_path)
-        return "Unsupported file format."
+        if question.strip().rstrip(".").lower() not in SUMMARY_QUESTIONS:
+            supported = [p for p in file_paths if p.lower().endswith((".pdf", ".docx"))]
+            try:
+                context = await self.chunks.build_context(question, supported)
+                if context:
+                    return context
+            except (*EXTRACT_ERRORS, *chroma_errors()) as e:
+                logger.error("Chunk retrieval failed, sending leading text: %s", e)
+
+        share = MAX_DOCUMENT_CHARS // max(1, len(file_paths))
+        blocks = []
+        for file_path in file_paths:
+            # One character over the limit shows whether the document was truncated
+            content = await self.get_document_content(file_path, share + 1)
+            if len(content) > share:
+                # Simple truncation for context window limits if document is massive
+                content = content[:share] + "... [Content truncated]"
+            blocks.append(content if len(file_paths) == 1
+                          else f"--- DOCUMENT: {os.path.basename(file_path)} ---\n{content}\n")
+        return "\n".join(blocks)
 
 
 # Global Instance
@@ -135,12 +145,8 @@ async def ask_about_document(doc_name: str, question: str = "Summarize this docu
             "message": f"❌ Maaf kijiye, mujhe '{doc_name}' naam ka koi PDF ya Word document nahi mila."
         }
 
-    logger.info("Found document at: %s. Extracting text...", file_path)
-    content = await rag_system.get_document_content(file_path)
-
-    if len(content) > 15000:
-        # Simple truncation for context window limits if document is massive
-        content = content[:15000] + "... [Content truncated]"
+    logger.info("Found document at: %s. Retrieving relevant text...", file_path)
+    content = await rag_system.get_relevant_content([file_path], question)
 
     return {
         "status": "success",
@@ -150,3 +156,32 @@ async def ask_about_document(doc_name: str, question: str = "Summarize this docu
         "question": question,
         "message": f"📄 Document mil gaya hai: {os.path.basename(file_path)}. Main abhi aapka sawal analyze kar raha hoon."
     }
+
+
+@function_tool
+async def ask_about_documents(doc_names: list[str], question: str) -> dict:
+    """
+    Answers a question that spans several local documents (PDF or Word), e.g. comparing them.
+    """
+    logger.info("RAG Tool: Searching for %s to answer: '%s'", doc_names, question)
+
+    found = await asyncio.gather(*(rag_system.find_document(name) for name in doc_names))
+    file_paths = list(dict.fromkeys(path for path in found if path))
+    missing = [name for name, path in zip(doc_names, found) if not path]
+    if not file_paths:
+        return {
+            "status": "not_found",
+            "message": f"❌ Maaf kijiye, mujhe {', '.join(doc_names)} mein se koi document nahi mila."
+        }
+
+    content = await rag_system.get_relevant_content(file_paths, question)
+    names = [os.path.basename(path) for path in file_paths]
+    return {
+        "status": "success",
+        "document_names": names,
+        "document_paths": file_paths,
+        "missing": missing,
+        "content": content,
+        "question": question,
+        "message": f"📄 Documents mil gaye hain: {', '.join(names)}. Main abhi aapka sawal analyze kar raha hoon."
+    }
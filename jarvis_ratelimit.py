@@ -0,0 +1,189 @@
+"""
+# jarvis_ratelimit.py
+Client-side rate limiting and request coalescing for external APIs.
+
+Every provider gets a token bucket sized to its free-tier quota, so bursts
+from concurrent tools and background loops are smoothed out instead of
+burning the quota (or earning a 429). Identical requests that are already in
+flight are coalesced: the second caller awaits the first caller's result
+instead of sending the same request again.
+
+Per-provider limits can be overridden with JARVIS_RATE_<PROVIDER>="rate,burst"
+(requests per second, bucket size), e.g. JARVIS_RATE_GEMINI="0.5,3".
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+from jarvis_logger import setup_logger
+from jarvis_metrics import perf_stats
+
+logger = setup_logger("JARVIS-RATELIMIT")
+
+# (requests per second, burst) per provider, roughly their free-tier limits
+PROVIDER_RATES: Dict[str, Tuple[float, int]] = {
+    "tavily": (2.0, 5),
+    "google": (1.0, 5),
+    "duckduckgo": (0.5, 3),
+    "openweather": (1.0, 10),
+    "gemini": (0.25, 2),
+    "openrouter": (0.3, 3),
+    "huggingface": (0.2, 2),
+    "pollinations": (0.5, 2),
+}
+DEFAULT_RATE = (1.0, 5)
+# Longest a caller waits for a token before giving up
+MAX_RATE_WAIT = float(os.getenv("JARVIS_RATE_MAX_WAIT", "10"))
+
+
+class RateLimitError(RuntimeError):
+    """Raised when a provider's local request budget cannot serve a call in time."""
+
+
+def _configured_rate(name: str) -> Tuple[float, int]:
+    override = os.getenv(f"JARVIS_RATE_{name.upper()}")
+    if override:
+        try:
+            rate, burst = override.split(",")
+            return float(rate), int(burst)
+        except ValueError:
+            logger.warning("Ignoring malformed JARVIS_RATE_%s=%r", name.upper(), override)
+    return PROVIDER_RATES.get(name, DEFAULT_RATE)
+
+
+class TokenBucket:
+    """
+    Token bucket: `capacity` requests may burst, refilled at `rate` per second.
+    """
+
+    def __init__(self, rate: float, capacity: int, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> float:
+        """Takes a token if one is available; otherwise returns the seconds until one is."""
+        self._refill()
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return 0.0
+        return (1.0 - self._tokens) / self.rate
+
+    async def acquire(self, max_wait: float = MAX_RATE_WAIT) -> float:
+        """Waits for a token; returns the time waited. Raises RateLimitError past `max_wait`."""
+        waited = 0.0
+        while True:
+            delay = self.try_acquire()
+            if delay == 0.0:
+                return waited
+            if waited + delay > max_wait:
+                raise RateLimitError(f"local request budget exhausted (next slot in {delay:.1f}s)")
+            await asyncio.sleep(delay)
+            waited += delay
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one underlying call.
+    The shared call is only cancelled once every caller waiting on it is.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, Tuple[asyncio.Task, list]] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        """Whether a call for `key` is currently running."""
+        return key in self._flights
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Returns (result, shared); `shared` is True when another caller's call was reused."""
+        flight = self._flights.get(key)
+        shared = flight is not None
+        if flight is None:
+            task = asyncio.ensure_future(fn())
+            flight = (task, [0])
+            self._flights[key] = flight
+            task.add_done_callback(lambda _: self._flights.pop(key, None))
+        task, waiters = flight
+        waiters[0] += 1
+        try:
+            return await asyncio.shield(task), shared
+        except asyncio.CancelledError:
+            if not task.done() and waiters[0] == 1:
+                task.cancel()
+            raise
+        finally:
+            waiters[0] -= 1
+
+
+class RateLimiterRegistry:
+    """
+    Per-provider token buckets plus single-flight coalescing.
+    """
+
+    def __init__(self, max_wait: float = MAX_RATE_WAIT):
+        self.max_wait = max_wait
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._flights = SingleFlight()
+
+    def bucket(self, name: str) -> TokenBucket:
+        """Returns the provider's bucket, creating it on first use."""
+        bucket = self._buckets.get(name)
+        if bucket is None:
+            rate, burst = _configured_rate(name)
+            bucket = TokenBucket(rate, burst)
+            self._buckets[name] = bucket
+        return bucket
+
+    async def _limited(self, name: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            waited = await self.bucket(name).acquire(self.max_wait)
+        except RateLimitError:
+            perf_stats.incr(f"ratelimit.{name}.rejected")
+            raise
+        if waited:
+            perf_stats.incr(f"ratelimit.{name}.throttled")
+            perf_stats.observe(f"ratelimit.{name}.wait", waited)
+        return await fn()
+
+    async def run(self, name: str, key: Optional[Hashable],
+                  fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Calls `fn` within the provider's rate limit. Concurrent calls with the
+        same non-None `key` share a single request.
+        """
+        if key is None:
+            return await self._limited(name, fn)
+        result, shared = await self._flights.do((name, key), lambda: self._limited(name, fn))
+        if shared:
+            perf_stats.incr(f"ratelimit.{name}.coalesced")
+        return result
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Throttling and coalescing counters per provider."""
+        return {
+            name: {
+                "throttled": perf_stats.count(f"ratelimit.{name}.throttled"),
+                "coalesced": perf_stats.count(f"ratelimit.{name}.coalesced"),
+                "rejected": perf_stats.count(f"ratelimit.{name}.rejected"),
+                "wait_s": perf_stats.percentiles(f"ratelimit.{name}.wait"),
+            }
+            for name in sorted(self._buckets)
+        }
+
+    def reset(self) -> None:
+        """Refills every bucket by forgetting it."""
+        self._buckets.clear()
+
+
+# Global Instance
+rate_limits = RateLimiterRegistry()
+
@@ -4,20 +4,30 @@ Jarvis Reasoning Module
 
 Provides advanced intent analysis and smart response generation capabilities using AI.
 """
-import re
+import os
 import random
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from jarvis_logger import setup_logger
+from jarvis_matcher import MultiPatternMatcher
+from jarvis_intent_model import LinearIntentModel, load_intent_classifier
 
 # Setup logging
 logger = setup_logger("JARVIS-REASONING")
 
+# Wake words share the intent matcher so one scan answers both questions.
+WAKE_WORD_PATTERNS = {
+    "wake_jarvis": [r"\bjarvis\b"],
+    "wake_anna": [r"\banna\b", r"\bbabu\b", r"\bjaan\b",
+                  r"\bmyra\b", r"\bkiara\b", r"\bzoya\b"]
+}
+
 
 class IntentAnalyzer:  # pylint: disable=too-few-public-methods
     """Advanced intent analysis for user queries"""
 
-    def __init__(self):
+    def __init__(self, backend: Optional[str] = None):
         self.intent_patterns = {
             "code_creation": [
                 r"code.*likh", r"program.*bana", r"html.*create", r"python",
@@ -56,37 +66,72 @@ class IntentAnalyzer:  # pylint: disable=too-few-public-methods
                 r"search.*summarize", r"analyze.*write"
             ]
         }
+        self.matcher = MultiPatternMatcher(
+            {**self.intent_patterns, **WAKE_WORD_PATTERNS})
+        self._last_scan: Tuple[Optional[str], Dict[str, int]] = (None, {})
+        # "regex" scores rule hits, "linear" uses the local n-gram classifier
+        self.backend = (backend or os.getenv("JARVIS_INTENT_BACKEND", "regex")).lower()
+        self._classifier: Optional[LinearIntentModel] = None
+
+    def scan(self, text: str) -> Dict[str, int]:
+        """
+        Returns rule hit counts for every intent and wake word in one pass.
+        The last scan is kept so wake word and intent checks on the same
+        utterance share it.
+        """
+        if self._last_scan[0] == text:
+            return self._last_scan[1]
+        counts = self.matcher.match(text)
+        self._last_scan = (text, counts)
+        return counts
+
+    def _get_classifier(self) -> Optional[LinearIntentModel]:
+        """Loads the linear model on first use, falling back to regex rules."""
+        if self.backend == "linear" and self._classifier is None:
+            self._classifier = load_intent_classifier()
+            if self._classifier is None:
+                logger.warning("Intent model unavailable, using regex rules.")
+                self.backend = "regex"
+        return self._classifier
+
+    def _rule_scores(self, text: str) -> Dict[str, float]:
+        counts = self.scan(text)
+        return {
+            intent: min(counts[intent] / len(patterns), 1.0)
+            for intent, patterns in self.intent_patterns.items()
+            if counts.get(intent, 0) > 0
+        }
 
-    def analyze_intent(self, text: str) -> Dict[str, Any]:
-        """Analyze user intent from text"""
-        text_lower = text.lower()
-        detected_intents = []
-        confidence_scores = {}
-
-        for intent, patterns in self.intent_patterns.items():
-            matches = 0
-            for pattern in patterns:
-                if re.search(pattern, text_lower):
-                    matches += 1
-
-            if matches > 0:
-                confidence = min(matches / len(patterns), 1.0)
-                detected_intents.append(intent)
-                confidence_scores[intent] = confidence
-
+    @staticmethod
+    def _build_result(text: str, confidence_scores: Dict[str, float]) -> Dict[str, Any]:
         # Determine primary intent
-        primary_intent = "general" if not detected_intents else max(
+        primary_intent = "general" if not confidence_scores else max(
             confidence_scores, key=lambda k: confidence_scores[k])
 
         return {
             "primary_intent": primary_intent,
-            "all_intents": detected_intents,
+            "all_intents": list(confidence_scores),
             "confidence_scores": confidence_scores,
             "text_length": len(text),
             "word_count": len(text.split()),
             "timestamp": datetime.now().isoformat()
         }
 
+    def analyze_intent(self, text: str) -> Dict[str, Any]:
+        """Analyze user intent from text"""
+        classifier = self._get_classifier()
+        if classifier is not None:
+            return self._build_result(text, classifier.predict_many([text])[0])
+        return self._build_result(text, self._rule_scores(text))
+
+    def analyze_many(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Analyze a batch of utterances; the linear backend scores them in one pass."""
+        classifier = self._get_classifier()
+        if classifier is not None:
+            return [self._build_result(text, scores)
+                    for text, scores in zip(texts, classifier.predict_many(texts))]
+        return [self._build_result(text, self._rule_scores(text)) for text in texts]
+
 
 class ContextAnalyzer:  # pylint: disable=too-few-public-methods
     """Analyze conversation context and history"""
@@ -98,6 +143,24 @@ class ContextAnalyzer:  # pylint: disable=too-few-public-methods
             "confirmation": [r"haan", r"yes", r"ok", r"theek.*hai", r"right"],
             "negation": [r"nahi", r"no", r"mat.*kar", r"don't"]
         }
+        self.reference_words = ["usse", "iske", "that", "it"]
+        self.urgency_words = ["jaldi", "urgent",
+                              "abhi", "immediately", "turant"]
+        self.positive_words = ["accha", "good", "great", "perfect", "excellent"]
+        self.negative_words = ["problem", "issue", "error", "galat", "wrong"]
+        self.upset_words = [
+            "naraz", "gussa", "baat nahi", "chup", "mood kharab",
+            "angry", "upset", "don't talk", "leave me", "shutup", "hate"
+        ]
+        # Plain words are literal rules, so every cue is resolved in one scan.
+        self.matcher = MultiPatternMatcher({
+            **self.conversation_patterns,
+            "references": self.reference_words,
+            "urgency": self.urgency_words,
+            "mood_upset": self.upset_words,
+            "mood_positive": self.positive_words,
+            "mood_negative": self.negative_words
+        })
 
     def analyze_context(self, current_message: str, history: List[Dict]) -> Dict[str, Any]:
         """Analyze current message in context of conversation history"""
@@ -110,38 +173,27 @@ class ContextAnalyzer:  # pylint: disable=too-few-public-methods
             "urgency_level": "normal"
         }
 
-        current_lower = current_message.lower()
+        hits = self.matcher.match(current_message)
 
         # Check for follow-up patterns
-        for pattern in self.conversation_patterns["follow_up"]:
-            if re.search(pattern, current_lower):
-                context_info["is_follow_up"] = True
-                context_info["conversation_flow"] = "continuation"
-                break
+        if "follow_up" in hits:
+            context_info["is_follow_up"] = True
+            context_info["conversation_flow"] = "continuation"
 
         # Check for references to previous messages
-        if history and len(history) > 0:
-            if any(word in current_lower for word in ["usse", "iske", "that", "it"]):
-                context_info["references_previous"] = True
+        if history and len(history) > 0 and "references" in hits:
+            context_info["references_previous"] = True
 
         # Detect urgency
-        urgency_words = ["jaldi", "urgent", "abhi", "immediately", "turant"]
-        if any(word in current_lower for word in urgency_words):
+        if "urgency" in hits:
             context_info["urgency_level"] = "high"
 
         # Detect mood
-        positive_words = ["accha", "good", "great", "perfect", "excellent"]
-        negative_words = ["problem", "issue", "error", "galat", "wrong"]
-        upset_words = [
-            "naraz", "gussa", "baat nahi", "chup", "mood kharab",
-            "angry", "upset", "don't talk", "leave me", "shutup", "hate"
-        ]
-
-        if any(word in current_lower for word in upset_words):
+        if "mood_upset" in hits:
             context_info["user_mood"] = "upset"
-        elif any(word in current_lower for word in positive_words):
+        elif "mood_positive" in hits:
             context_info["user_mood"] = "positive"
-        elif any(word in current_lower for word in negative_words):
+        elif "mood_negative" in hits:
             context_info["user_mood"] = "frustrated"
 
         return context_info
@@ -157,7 +209,7 @@ class WorkflowPlanner:  # pylint: disable=too-few-public-methods
             "code_and_run": ["write_custom_code", "run_cmd_command"]
         }
 
-    def create_plan(self, intent: str, user_input: str) -> List[Dict[str, str]]:
+    def create_plan(self, intent: str, user_input: str) -> List[Dict[str, Any]]:
         """Creates a step-by-step execution plan."""
         plan = []
         user_input_lower = user_input.lower()
@@ -180,6 +232,10 @@ class WorkflowPlanner:  # pylint: disable=too-few-public-methods
             plan.append({"step": 2, "action": "run",
                         "description": "Executing the code for verification"})
 
+        # Declared dependencies make the plan executable as a DAG
+        for i, item in enumerate(plan):
+            item["id"] = f"s{item['step']}"
+            item["depends_on"] = [plan[i - 1]["id"]] if i else []
         return plan
 
 
@@ -279,17 +335,94 @@ response_generator = ResponseGenerator()
 workflow_planner = WorkflowPlanner()
 
 
+class TurnReasoning:
+    """
+    Reasoning for a single utterance. Intent, context and plan are computed
+    lazily, at most once each, and shared by every consumer in the turn.
+    Returned dicts are shared too and must be treated as read-only.
+    """
+
+    def __init__(self, user_input: str):
+        self.user_input = user_input
+        self._intent: Optional[Dict[str, Any]] = None
+        self._context: Dict[bool, Dict[str, Any]] = {}
+        self._plan: Optional[List[Dict[str, Any]]] = None
+
+    @property
+    def intent(self) -> Dict[str, Any]:
+        """Intent analysis for the utterance."""
+        if self._intent is None:
+            logger.info("Analyzing intent for: %s...", self.user_input[:50])
+            self._intent = intent_analyzer.analyze_intent(self.user_input)
+            logger.info("Primary intent detected: %s",
+                        self._intent["primary_intent"])
+        return self._intent
+
+    def context_for(self, history: Optional[List] = None) -> Dict[str, Any]:
+        """
+        Context analysis for the utterance. History only affects whether
+        references to earlier messages count, so results are keyed on that.
+        """
+        has_history = bool(history)
+        if has_history not in self._context:
+            logger.info("Analyzing context (history: %s)...", has_history)
+            self._context[has_history] = context_analyzer.analyze_context(
+                self.user_input, history or [])
+        return self._context[has_history]
+
+    @property
+    def plan(self) -> List[Dict[str, Any]]:
+        """Workflow plan derived from the primary intent."""
+        if self._plan is None:
+            self._plan = workflow_planner.create_plan(
+                self.intent.get("primary_intent", "general"), self.user_input)
+        return self._plan
+
+
+class ReasoningCache:
+    """Small LRU of TurnReasoning objects keyed by the exact utterance."""
+
+    def __init__(self, max_size: int = 128):
+        self.max_size = max_size
+        self._items: "OrderedDict[str, TurnReasoning]" = OrderedDict()
+
+    def get(self, user_input: str) -> TurnReasoning:
+        """Returns the cached reasoning for an utterance, creating it on a miss."""
+        turn = self._items.get(user_input)
+        if turn is not None:
+            self._items.move_to_end(user_input)
+            logger.debug("Reasoning cache hit for: %s...", user_input[:50])
+            return turn
+        turn = TurnReasoning(user_input)
+        self._items[user_input] = turn
+        if len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+        return turn
+
+    def clear(self) -> None:
+        """Drops every cached turn."""
+        self._items.clear()
+
+
+reasoning_cache = ReasoningCache()
+
+
+def get_turn_reasoning(user_input: str) -> TurnReasoning:
+    """Returns the shared reasoning object for an utterance."""
+    return reasoning_cache.get(user_input)
+
+
+def detect_wake_words(text: str) -> Tuple[bool, bool]:
+    """Returns (is_jarvis, is_anna) for an utterance using the shared scan."""
+    counts = intent_analyzer.scan(text)
+    return "wake_jarvis" in counts, "wake_anna" in counts
+
+
 async def analyze_user_intent(user_input: str) -> Dict[str, Any]:
     """Main function to analyze user intent"""
     try:
-        logger.info("Analyzing intent for: %s...", user_input[:50])
-
-        # Perform intent analysis
-        intent_result = intent_analyzer.analyze_intent(user_input)
-
-        logger.info(
-            "Primary intent detected: %s", intent_result['primary_intent'])
-        return intent_result
+        # Intent analysis runs once per utterance; repeats reuse the result
+        return get_turn_reasoning(user_input).intent
 
     except (AttributeError, TypeError, ValueError) as e:  # pylint: disable=broad-exception-caught
         logger.exception("Error in intent analysis: %s", e)
@@ -303,14 +436,16 @@ async def analyze_user_intent(user_input: str) -> Dict[str, Any]:
 
 async def generate_smart_response(user_input: str, intent_analysis: Dict,
                                   memory_context: List, semantic_memory: Optional[List[str]] = None,
-                                  is_anna: bool = False) -> str:
+                                  is_anna: bool = False,
+                                  context_info: Optional[Dict[str, Any]] = None) -> str:
     """Generate intelligent response using reasoning and optional semantic memory"""
     try:
         logger.info("Generating smart response (Anna logic: %s)...", is_anna)
 
-        # Analyze context
-        context_info = context_analyzer.analyze_context(
-            user_input, memory_context)
+        # Reuse the turn's context analysis unless one was passed in
+        if context_info is None:
+            context_info = get_turn_reasoning(
+                user_input).context_for(memory_context)
 
         # Generate response
         primary_intent = intent_analysis.get("primary_intent", "general")
@@ -346,25 +481,24 @@ async def process_with_advanced_reasoning(user_input_str: str,
                                           **reasoning_kwargs) -> Dict[str, Any]:
     """Complete reasoning pipeline with agentic planning"""
     try:
+        turn = get_turn_reasoning(user_input_str)
+
         # Step 1: Intent Analysis
-        intent_result = await analyze_user_intent(user_input_str)
-        primary_intent = intent_result.get("primary_intent", "general")
+        intent_result = turn.intent
 
         # Step 2: Context Analysis
-        context_info = context_analyzer.analyze_context(
-            user_input_str,
-            history or []
-        )
+        context_info = turn.context_for(history)
 
         # Step 3: Workflow Planning
-        plan = workflow_planner.create_plan(primary_intent, user_input_str)
+        plan = turn.plan
 
-        # Step 4: Response Generation
+        # Step 4: Response Generation (shares the context computed above)
         smart_response = await generate_smart_response(
             user_input_str,
             intent_result,
             history or [],
-            is_anna=reasoning_kwargs.get("is_anna", False)
+            is_anna=reasoning_kwargs.get("is_anna", False),
+            context_info=context_info
         )
 
         # Step 5: Compile complete reasoning result
@@ -0,0 +1,259 @@
+"""
+# jarvis_reasoning_eval.py
+Offline reasoning evaluation over stored conversations.
+
+Streams user messages from the conversations store, replays them through
+intent analysis, context analysis and workflow planning in batches across a
+process pool, and writes a JSON report with intent distributions, mood
+counts and per-utterance timing percentiles.
+
+Usage:
+    python jarvis_reasoning_eval.py [--store conversations] [--workers 4]
+                                    [--batch-size 256] [--out reasoning_report.json]
+"""
+
+import argparse
+import glob
+import json
+import logging
+import os
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, wait
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from jarvis_logger import setup_logger
+from jarvis_metrics import nearest_rank_percentiles
+
+logger = setup_logger("JARVIS-REASONING-EVAL")
+
+# (utterance, whether earlier user turns exist in the same store)
+Utterance = Tuple[str, bool]
+
+
+def iter_json_array(path: str, chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """
+    Yields the elements of a top-level JSON array one at a time, reading the
+    file in chunks so large stores are never loaded whole.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buffer = ""
+        pos = 0
+        started = False
+        eof = False
+        while True:
+            # Skip whitespace and separators between elements
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if not started and pos < len(buffer):
+                if buffer[pos] != "[":
+                    raise ValueError(f"{path} is not a JSON array")
+                started = True
+                pos += 1
+                continue
+            if pos < len(buffer) and buffer[pos] == "]":
+                return
+            if pos < len(buffer):
+                try:
+                    item, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                else:
+                    # A value ending at the buffer edge (e.g. a number) may continue
+                    if end < len(buffer) or eof:
+                        yield item
+                        pos = end
+                        continue
+            if eof:
+                return
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+
+
+def iter_user_messages(paths: List[str], role: str = "user") -> Iterator[Utterance]:
+    """Streams message texts with the given role from conversation store files."""
+    for path in paths:
+        seen_any = False
+        try:
+            for conversation in iter_json_array(path):
+                if not isinstance(conversation, dict):
+                    continue
+                for message in conversation.get("messages", []):
+                    if message.get("role") != role:
+                        continue
+                    text = str(message.get("content", "")).strip()
+                    if text:
+                        yield text, seen_any
+                        seen_any = True
+        except (OSError, ValueError) as e:
+            logger.warning("Skipping unreadable store %s: %s", path, e)
+
+
+def iter_batches(items: Iterator[Utterance], size: int) -> Iterator[List[Utterance]]:
+    """Groups a stream into lists of at most `size` items."""
+    batch: List[Utterance] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _init_worker(backend: Optional[str]) -> None:
+    """Silences per-utterance logging and selects the intent backend."""
+    # Import first: setup_logger resets the level when the module loads
+    from jarvis_reasoning import intent_analyzer  # pylint: disable=import-outside-toplevel
+    logging.getLogger("JARVIS-REASONING").setLevel(logging.WARNING)
+    if backend:
+        intent_analyzer.backend = backend
+
+
+def evaluate_batch(batch: List[Utterance]) -> Dict[str, Any]:
+    """Runs the reasoning pipeline over one batch and returns partial aggregates."""
+    from jarvis_reasoning import TurnReasoning  # pylint: disable=import-outside-toplevel
+
+    primary: Counter = Counter()
+    all_intents: Counter = Counter()
+    moods: Counter = Counter()
+    urgency: Counter = Counter()
+    agentic = 0
+    timings: List[float] = []
+    for text, has_history in batch:
+        start = time.perf_counter()
+        # A fresh TurnReasoning bypasses the process cache, so every
+        # utterance is timed end to end.
+        turn = TurnReasoning(text)
+        intent = turn.intent
+        context = turn.context_for([{}] if has_history else [])
+        plan = turn.plan
+        timings.append((time.perf_counter() - start) * 1_000_000)
+
+        primary[intent["primary_intent"]] += 1
+        all_intents.update(intent["all_intents"])
+        moods[context["user_mood"]] += 1
+        urgency[context["urgency_level"]] += 1
+        agentic += 1 if plan else 0
+    return {
+        "primary": dict(primary), "all": dict(all_intents), "moods": dict(moods),
+        "urgency": dict(urgency), "agentic": agentic, "timings_us": timings
+    }
+
+
+def _distribution(counts: Counter, total: int) -> Dict[str, Dict[str, float]]:
+    return {
+        key: {"count": count, "share": round(count / total, 4) if total else 0.0}
+        for key, count in counts.most_common()
+    }
+
+
+def _drain(pool: Executor, batches: Iterator[List[Utterance]], max_pending: int,
+           merge) -> None:
+    """Keeps up to `max_pending` batches submitted and merges results as they finish."""
+    pending: set[Future] = set()
+    for batch in batches:
+        pending.add(pool.submit(evaluate_batch, batch))
+        if len(pending) >= max_pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                merge(future.result())
+    for future in wait(pending).done:
+        merge(future.result())
+
+
+def run_evaluation(paths: List[str], workers: int = 0, batch_size: int = 256,
+                   backend: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Evaluates every user message in `paths`. With `workers` > 0 batches are
+    spread across a process pool; at most two batches per worker are in
+    flight so memory stays flat on large stores.
+    """
+    primary: Counter = Counter()
+    all_intents: Counter = Counter()
+    moods: Counter = Counter()
+    urgency: Counter = Counter()
+    timings: List[float] = []
+    totals = {"batches": 0, "agentic": 0}
+
+    def _merge(part: Dict[str, Any]) -> None:
+        primary.update(part["primary"])
+        all_intents.update(part["all"])
+        moods.update(part["moods"])
+        urgency.update(part["urgency"])
+        timings.extend(part["timings_us"])
+        totals["batches"] += 1
+        totals["agentic"] += part["agentic"]
+
+    started = time.perf_counter()
+    batches = iter_batches(iter_user_messages(paths), batch_size)
+    if workers <= 0:
+        _init_worker(backend)
+        for batch in batches:
+            _merge(evaluate_batch(batch))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(backend,)) as pool:
+            _drain(pool, batches, workers * 2, _merge)
+    wall_time = time.perf_counter() - started
+
+    total = len(timings)
+    timing_summary: Dict[str, float] = dict(nearest_rank_percentiles(timings, (50, 90, 99)))
+    if timings:
+        timing_summary["mean"] = sum(timings) / total
+        timing_summary["max"] = max(timings)
+    return {
+        "generated_at": datetime.now().isoformat(),
+        "sources": paths,
+        "utterances": total,
+        "batches": totals["batches"],
+        "workers": workers,
+        "intent_backend": backend or os.getenv("JARVIS_INTENT_BACKEND", "regex"),
+        "primary_intents": _distribution(primary, total),
+        "all_intents": dict(all_intents.most_common()),
+        "moods": dict(moods.most_common()),
+        "urgency": dict(urgency.most_common()),
+        "agentic_plans": totals["agentic"],
+        "timing_us": {k: round(v, 2) for k, v in timing_summary.items()},
+        "wall_time_s": round(wall_time, 3),
+        "throughput_utt_s": round(total / wall_time, 1) if wall_time > 0 else 0.0
+    }
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Replay stored conversations through JARVIS reasoning")
+    parser.add_argument("--store", default="conversations",
+                        help="Directory holding *_memory.json conversation stores")
+    parser.add_argument("--files", nargs="*", help="Explicit store files (overrides --store)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes; 0 runs in-process")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--backend", choices=["regex", "linear"], default=None,
+                        help="Intent backend (defaults to JARVIS_INTENT_BACKEND)")
+    parser.add_argument("--out", default="reasoning_report.json")
+    args = parser.parse_args()
+
+    paths = args.files or sorted(glob.glob(os.path.join(args.store, "*_memory.json")))
+    if not paths:
+        parser.error(f"No conversation stores found in {args.store}")
+
+    report = run_evaluation(paths, workers=args.workers, batch_size=args.batch_size,
+                            backend=args.backend)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    timing = report["timing_us"]
+    print(f"Evaluated {report['utterances']} utterances from {len(paths)} store(s) "
+          f"in {report['wall_time_s']}s ({report['throughput_utt_s']} utt/s)")
+    if timing:
+        print(f"Per-utterance: p50 {timing['p50']}us  p90 {timing['p90']}us  p99 {timing['p99']}us")
+    print(f"Report written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,64 +5,218 @@ Extracts and synthesizes information from multiple websites.
 """
 
 import asyncio
-from typing import List
-import requests
+import codecs
+import os
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
 from urllib.parse import quote
-from bs4 import BeautifulSoup
 from livekit.agents import function_tool
 from jarvis_search import GOOGLE_SEARCH_API_KEY, SEARCH_ENGINE_ID
 from jarvis_advanced_tools import send_email
 from jarvis_logger import setup_logger
+from jarvis_crawler import CrawlDisallowedError, crawl_scheduler, select_links
+from jarvis_html_extract import (
+    VisibleTextParser, extract_links, extract_text_async, resolve_backend, resolve_links)
+from jarvis_http import HTTP_ERRORS, http_client
+from jarvis_metrics import perf_stats
+from jarvis_page_cache import page_cache
+from jarvis_passages import build_research_context
+from jarvis_search_cache import search_cache
 
 # Configure logging
 logger = setup_logger("JARVIS-RESEARCHER")
 
+# Stop downloading a page after this many bytes
+SCRAPE_MAX_BYTES = int(os.getenv("JARVIS_SCRAPE_MAX_BYTES", str(1024 * 1024)))
+# Visible text kept per page
+SCRAPE_MAX_CHARS = int(os.getenv("JARVIS_SCRAPE_MAX_CHARS", "4000"))
+# Text read per page for research; passages are then ranked into a token budget
+RESEARCH_PAGE_CHARS = int(os.getenv("JARVIS_RESEARCH_PAGE_CHARS", "20000"))
+# Seconds a research call waits for sources before answering with what has arrived
+RESEARCH_DEADLINE = float(os.getenv("JARVIS_RESEARCH_DEADLINE", "12"))
+# Multi-hop research: links followed per page and total pages per query
+RESEARCH_LINKS_PER_PAGE = 2
+RESEARCH_MAX_PAGES = int(os.getenv("JARVIS_RESEARCH_MAX_PAGES", "12"))
+MAX_RESEARCH_DEPTH = 2
+# Links kept per scraped page
+MAX_PAGE_LINKS = 100
+# Tokens of context handed to progress callbacks for a preliminary summary
+RESEARCH_PREVIEW_TOKENS = 300
 
-async def scrape_url(url: str, timeout: int = 10) -> str:
-    """Extract clean text content from a URL."""
+ResearchProgress = Callable[[Dict[str, Any]], Awaitable[None]]
+_research_progress_handler: Optional[ResearchProgress] = None
+
+
+def _text_decoder(response):
+    """Incremental decoder for the response charset (UTF-8 if unknown)."""
     try:
-        headers = {
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-            )
-        }
-        response = None
-        for attempt in range(2):  # Simple retry
-            try:
-                # Use to_thread for the blocking requests call
-                response = await asyncio.to_thread(
-                    requests.get, url, headers=headers, timeout=timeout
-                )
-                response.raise_for_status()
+        return codecs.getincrementaldecoder(response.charset_encoding or "utf-8")(errors="replace")
+    except LookupError:
+        return codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+
+def _is_textual(url: str, response) -> bool:
+    content_type = response.headers.get("content-type", "text/html").lower()
+    if any(kind in content_type for kind in ("html", "xml", "text/plain")):
+        return True
+    logger.info("Skipping non-HTML content at %s (%s)", url, content_type)
+    return False
+
+
+def _validators(response) -> Dict[str, Optional[str]]:
+    """ETag / Last-Modified of a response, for later conditional requests."""
+    return {"etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified")}
+
+
+async def _stream_visible_text(url: str, headers: dict, timeout: int, max_bytes: int,
+                               max_chars: int, collect_links: bool) -> Optional[Dict[str, Any]]:
+    """
+    Streams a page into the incremental parser, stopping at either cap.
+    Returns the page (text, links, validators), or None on 304 Not Modified.
+    """
+    async with http_client.stream("GET", url, headers=headers, timeout=timeout) as response:
+        if response.status_code == 304:
+            return None
+        response.raise_for_status()
+        if not _is_textual(url, response):
+            return {"text": "", "links": []}
+
+        decoder = _text_decoder(response)
+        parser = VisibleTextParser(max_chars, remove_boilerplate=True, collect_links=collect_links)
+        received = 0
+        async for chunk in response.aiter_bytes():
+            received += len(chunk)
+            parser.feed(decoder.decode(chunk[:max(0, max_bytes - (received - len(chunk)))]))
+            if parser.full or received >= max_bytes:
+                # Leaving the context closes the connection without reading the rest
+                perf_stats.incr("scrape.early_stop")
                 break
-            except (requests.RequestException, asyncio.TimeoutError):
-                if attempt == 1:
-                    raise
-                await asyncio.sleep(1)
-
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        # Remove script and style elements
-        for script_or_style in soup(["script", "style"]):
-            script_or_style.decompose()
-
-        # Get text and clean up whitespace
-        text = soup.get_text()
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip()
-                  for line in lines for phrase in line.split("  "))
-        text = '\n'.join(chunk for chunk in chunks if chunk)
-
-        # Limit to first 4000 characters to keep context manageable
-        return text[:4000]
-    except (requests.RequestException, ValueError, AttributeError, KeyError, OSError, RuntimeError) as e:
+        else:
+            parser.feed(decoder.decode(b"", final=True))
+        perf_stats.observe("scrape.bytes", received)
+        links = resolve_links(parser.links, str(response.url), MAX_PAGE_LINKS)
+        return {"text": parser.text(), "links": links, **_validators(response)}
+
+
+async def _fetch_html(url: str, headers: dict, timeout: int,
+                      max_bytes: int) -> Tuple[Optional[str], Dict[str, Optional[str]]]:
+    """
+    Downloads at most `max_bytes` of a page and decodes it.
+    Returns (html, validators plus the final "url"); html is None on 304 Not Modified.
+    """
+    async with http_client.stream("GET", url, headers=headers, timeout=timeout) as response:
+        if response.status_code == 304:
+            return None, {}
+        response.raise_for_status()
+        if not _is_textual(url, response):
+            return "", {}
+
+        decoder = _text_decoder(response)
+        parts = []
+        received = 0
+        async for chunk in response.aiter_bytes():
+            parts.append(decoder.decode(chunk[:max(0, max_bytes - received)]))
+            received += len(chunk)
+            if received >= max_bytes:
+                perf_stats.incr("scrape.early_stop")
+                break
+        else:
+            parts.append(decoder.decode(b"", final=True))
+        perf_stats.observe("scrape.bytes", min(received, max_bytes))
+        return "".join(parts), {**_validators(response), "url": str(response.url)}
+
+
+async def _scrape_once(url: str, headers: dict, timeout: int, max_bytes: int, max_chars: int,
+                       backend: str, collect_links: bool) -> Optional[Dict[str, Any]]:
+    if backend == "stream":
+        return await _stream_visible_text(url, headers, timeout, max_bytes, max_chars,
+                                          collect_links)
+    html, meta = await _fetch_html(url, headers, timeout, max_bytes)
+    if html is None:
+        return None
+    final_url = meta.pop("url", url)
+    links = []
+    if collect_links and html:
+        links = await asyncio.to_thread(extract_links, html, final_url, MAX_PAGE_LINKS)
+    return {"text": await extract_text_async(html, backend, max_chars), "links": links, **meta}
+
+
+async def scrape_page(url: str, timeout: int = 10, max_bytes: int = SCRAPE_MAX_BYTES,
+                      max_chars: int = SCRAPE_MAX_CHARS, backend: Optional[str] = None,
+                      use_cache: bool = True, collect_links: bool = False) -> Dict[str, Any]:
+    """
+    Fetches a page as {"text", "links"}; links are (url, anchor text) pairs
+    and only collected when asked. At most `max_bytes` are read. The
+    "stream" backend parses while downloading and stops once `max_chars` of
+    text are collected; DOM backends (see jarvis_html_extract) parse in the
+    extraction process pool. Requests go through the crawl scheduler
+    (concurrency, politeness, robots.txt, backoff). Pages are cached (see
+    jarvis_page_cache): fresh copies are reused directly and older ones are
+    revalidated with a conditional GET.
+    """
+    headers = {
+        "User-Agent": (
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+            "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+        )
+    }
+    cached = await page_cache.lookup(url, max_chars) if use_cache else None
+    if cached is not None and collect_links and cached["links"] is None:
+        cached = None
+    if cached is not None:
+        if page_cache.is_fresh(cached):
+            perf_stats.incr("page_cache.hit")
+            return {"text": cached["text"], "links": cached["links"] or []}
+        headers.update(page_cache.conditional_headers(cached))
+
+    try:
+        backend = resolve_backend(backend)
+        page = await crawl_scheduler.run(url, lambda: _scrape_once(
+            url, headers, timeout, max_bytes, max_chars, backend, collect_links))
+    except CrawlDisallowedError as e:
+        logger.info("Skipping %s: %s", url, e)
+        return {"text": "", "links": []}
+    except (*HTTP_ERRORS, asyncio.TimeoutError, ValueError, AttributeError, KeyError, OSError,
+            RuntimeError) as e:
         logger.error("Error scraping %s: %s", url, e)
-        return ""
+        if cached is not None:
+            perf_stats.incr("page_cache.stale_served")
+            return {"text": cached["text"], "links": cached["links"] or []}
+        return {"text": "", "links": []}
+
+    if page is None:
+        if cached is None:
+            return {"text": "", "links": []}
+        perf_stats.incr("page_cache.not_modified")
+        await page_cache.revalidated(url)
+        return {"text": cached["text"], "links": cached["links"] or []}
+    if use_cache:
+        perf_stats.incr("page_cache.miss")
+        if page["text"]:
+            await page_cache.store(url, page["text"], max_chars, page.get("etag"),
+                                   page.get("last_modified"),
+                                   page["links"] if collect_links else None)
+    return {"text": page["text"], "links": page["links"]}
+
+
+async def scrape_url(url: str, timeout: int = 10, max_bytes: int = SCRAPE_MAX_BYTES,
+                     max_chars: int = SCRAPE_MAX_CHARS, backend: Optional[str] = None,
+                     use_cache: bool = True) -> str:
+    """
+    Extract clean text content from a URL (see `scrape_page`).
+    """
+    page = await scrape_page(url, timeout, max_bytes, max_chars, backend, use_cache)
+    return page["text"]
 
 
 async def get_search_urls(query: str, count: int = 5) -> List[str]:
-    """Get top URLs from Google Search."""
+    """Get top URLs from Google Search. Non-empty results are cached."""
+    return await search_cache.cached(
+        "search_urls", f"{query} #{count}", lambda: _fetch_search_urls(query, count))
+
+
+async def _fetch_search_urls(query: str, count: int) -> List[str]:
+    """Queries the Google Custom Search API for result links."""
     if not GOOGLE_SEARCH_API_KEY or not SEARCH_ENGINE_ID:
         logger.error("Search API credentials missing")
         return []
@@ -74,14 +228,14 @@ async def get_search_urls(query: str, count: int = 5) -> List[str]:
 
     for attempt in range(2):
         try:
-            response = await asyncio.to_thread(requests.get, url, timeout=10)
+            response = await http_client.get(url, timeout=10)
             response.raise_for_status()
             data = response.json()
             return [
                 item.get("link") for item in data.get("items", [])[:count]
                 if item.get("link")
             ]
-        except (requests.RequestException, ValueError, KeyError, RuntimeError) as e:
+        except (*HTTP_ERRORS, ValueError, KeyError, RuntimeError) as e:
             if attempt == 1:
                 logger.error("Error getting search URLs: %s", e)
                 return []
@@ -89,11 +243,76 @@ async def get_search_urls(query: str, count: int = 5) -> List[str]:
     return []
 
 
-@function_tool
-async def perform_web_research(query: str) -> str:
+def set_research_progress_handler(handler: Optional[ResearchProgress]) -> None:
+    """Registers the callback `perform_web_research` reports progress to."""
+    global _research_progress_handler  # pylint: disable=global-statement
+    _research_progress_handler = handler
+
+
+async def _scrape_source(url: str, depth: int, collect_links: bool) -> Tuple[str, int, Dict[str, Any]]:
+    page = await scrape_page(url, max_chars=RESEARCH_PAGE_CHARS, collect_links=collect_links)
+    return url, depth, page
+
+
+async def stream_web_research(urls: List[str], deadline: float = RESEARCH_DEADLINE,
+                              query: str = "", depth: int = 0,
+                              max_pages: int = RESEARCH_MAX_PAGES) -> AsyncIterator[Dict[str, Any]]:
     """
-    Perform deep web research on a query by analyzing multiple websites.
-    Returns a synthesized report based on the scraped content.
+    Scrapes all URLs concurrently and yields each source as soon as it
+    finishes: {"url", "content", "depth", "completed", "total"}. With
+    `depth` > 0, the links on each page most relevant to `query` are
+    followed too, up to `max_pages` pages in total. Stops at `deadline`
+    seconds and cancels the scrapes still running.
+    """
+    loop = asyncio.get_running_loop()
+    ends_at = loop.time() + deadline
+    urls = list(dict.fromkeys(urls))
+    seen = set(urls)
+    pending = {asyncio.ensure_future(_scrape_source(url, 0, depth > 0)) for url in urls}
+    completed = 0
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, timeout=max(0.0, ends_at - loop.time()),
+                                               return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                logger.warning("Research deadline (%.0fs) reached with %d/%d sources",
+                               deadline, completed, len(seen))
+                perf_stats.incr("research.deadline_hit")
+                return
+            for task in done:
+                url, hop, page = task.result()
+                completed += 1
+                if hop < depth and len(seen) < max_pages:
+                    for link in select_links(query, page["links"], RESEARCH_LINKS_PER_PAGE,
+                                             exclude=seen)[:max_pages - len(seen)]:
+                        seen.add(link)
+                        pending.add(asyncio.ensure_future(
+                            _scrape_source(link, hop + 1, hop + 1 < depth)))
+                yield {"url": url, "content": page["text"], "depth": hop,
+                       "completed": completed, "total": len(seen)}
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def _report_progress(on_progress: ResearchProgress, query: str, update: Dict[str, Any],
+                           sources: List[Tuple[str, str]]) -> None:
+    try:
+        preview = await asyncio.to_thread(
+            build_research_context, query, sources, RESEARCH_PREVIEW_TOKENS)
+        await on_progress({**update, "query": query, "found": len(sources), "preview": preview})
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logger.warning("Research progress callback failed: %s", e)
+
+
+async def run_web_research(query: str, deadline: float = RESEARCH_DEADLINE,
+                           on_progress: Optional[ResearchProgress] = None, depth: int = 0) -> str:
+    """
+    Researches `query` from its top search results, following relevant links
+    `depth` hops deep. Sources are processed as they arrive; after `deadline`
+    seconds the report is built from whatever has been scraped. `on_progress` is awaited after each non-empty source
+    with the update from `stream_web_research` plus "found" (non-empty
+    sources so far) and a short "preview" context.
     """
     logger.info("Starting deep research for query: %s", query)
 
@@ -101,18 +320,19 @@ async def perform_web_research(query: str) -> str:
     if not urls:
         return "Maaf Sir, main research ke liye links nahi dhoond paya. Search API check karein."
 
-    reports = []
-    tasks = [scrape_url(url) for url in urls]
-    results = await asyncio.gather(*tasks)
-
-    for i, content in enumerate(results):
-        if content:
-            reports.append(f"--- SOURCE {i+1}: {urls[i]} ---\n{content}\n")
-
-    if not reports:
+    sources: List[Tuple[str, str]] = []
+    depth = max(0, min(depth, MAX_RESEARCH_DEPTH))
+    async for update in stream_web_research(urls, deadline, query, depth):
+        if not update["content"]:
+            continue
+        sources.append((update["url"], update["content"]))
+        if on_progress is not None:
+            await _report_progress(on_progress, query, update, sources)
+    if not sources:
         return "Maaf Sir, links to mile magar contents extract nahi ho sakay."
 
-    combined_context = "\n".join(reports)
+    # Keep the passages most relevant to the query, without cross-source duplicates
+    combined_context = await asyncio.to_thread(build_research_context, query, sources)
 
     # Return the raw research data to the LLM.
     msg = (
@@ -123,6 +343,16 @@ async def perform_web_research(query: str) -> str:
     return msg
 
 
+@function_tool
+async def perform_web_research(query: str, depth: int = 0) -> str:
+    """
+    Perform deep web research on a query by analyzing multiple websites.
+    Set depth=1 (or 2) to also follow the most relevant links on those pages.
+    Returns a synthesized report based on the scraped content.
+    """
+    return await run_web_research(query, on_progress=_research_progress_handler, depth=depth)
+
+
 @function_tool
 async def autonomous_research_and_email(query: str, recipient: str, subject: str = "Research Report") -> dict:
     """
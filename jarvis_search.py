@@ -7,14 +7,22 @@ and utility functions for location and time detection.
 """
 
 import asyncio
+import functools
 import os
+import time
 from datetime import datetime
-import requests  # type: ignore
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 from dotenv import load_dotenv
 from urllib.parse import quote
 from duckduckgo_search import DDGS
 from livekit.agents import function_tool
 from jarvis_logger import setup_logger
+from jarvis_circuit import CircuitOpenError, circuit_breakers
+from jarvis_http import HTTP_ERRORS, http_client
+from jarvis_location import location_cache
+from jarvis_metrics import perf_stats
+from jarvis_ratelimit import RateLimitError, rate_limits
+from jarvis_search_cache import is_successful_search, normalize_query, search_cache
 
 # Setup logging
 logger = setup_logger("JARVIS-SEARCH")
@@ -26,20 +34,18 @@ GOOGLE_SEARCH_API_KEY = os.getenv("GOOGLE_SEARCH_API_KEY")
 SEARCH_ENGINE_ID = os.getenv("SEARCH_ENGINE_ID")
 TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
 
+# "hedged" races providers with a delay between starts, "cascade" tries them in turn
+SEARCH_MODE = os.getenv("JARVIS_SEARCH_MODE", "hedged")
+# Seconds to wait for a provider before starting the next one
+SEARCH_HEDGE_DELAY = float(os.getenv("JARVIS_SEARCH_HEDGE_DELAY", "1.5"))
+
+SearchProvider = Tuple[str, Callable[[str], Awaitable[Dict[str, Any]]]]
 
-async def get_current_city() -> str:
-    """
-    Detects the current city of the user based on IP address.
-    Checks .env for USER_CITY first.
-    """
-    try:
-        # Check if city is manually set in .env
-        env_city = os.getenv("USER_CITY")
-        if env_city:
-            return env_city
 
-        # Using asyncio.to_thread for blocking requests call
-        response = await asyncio.to_thread(requests.get, "https://ipinfo.io", timeout=5)
+async def detect_city_via_ip() -> Optional[str]:
+    """Looks up the city for the current public IP; None if detection fails."""
+    try:
+        response = await http_client.get("https://ipinfo.io", timeout=5)
         data = response.json()
         detected_city = data.get("city", "Lahore")
 
@@ -48,29 +54,147 @@ async def get_current_city() -> str:
         return detected_city
     except Exception as e:
         logger.warning("Error getting current city: %s", e)
-        return os.getenv("USER_CITY", "Lahore")
+        return None
+
+
+async def get_current_city(wait: bool = True) -> str:
+    """
+    Detects the current city of the user based on IP address.
+    Checks .env for USER_CITY first, then the persisted location cache.
+    With wait=False it never blocks on the network: an empty cache falls
+    back to the default while a lookup runs in the background.
+    """
+    # Check if city is manually set in .env
+    env_city = os.getenv("USER_CITY")
+    if env_city:
+        return env_city
+
+    city = await location_cache.get(detect_city_via_ip, wait=wait)
+    return city or os.getenv("USER_CITY", "Lahore")
+
+
+def _search_failure(result: dict) -> str:
+    """Error description when a provider response counts against its health."""
+    if result.get("status") == "error":
+        return result.get("message") or "search error"
+    return ""
+
+
+async def _guarded_search(name: str, provider: Callable[[str], Awaitable[Dict[str, Any]]],
+                          query: str) -> dict:
+    """Runs a provider through its circuit breaker."""
+    try:
+        return await circuit_breakers.get(name).call(provider, query, is_failure=_search_failure)
+    except CircuitOpenError as e:
+        return {"status": "error", "message": str(e)}
+
+
+def _search_providers() -> List[SearchProvider]:
+    """
+    Configured providers in priority order, minus those with open circuits;
+    degraded providers are moved to the back.
+    """
+    configured: Dict[str, Callable[[str], Awaitable[Dict[str, Any]]]] = {}
+    if TAVILY_API_KEY:
+        configured["tavily"] = search_tavily
+    if GOOGLE_SEARCH_API_KEY and SEARCH_ENGINE_ID:
+        configured["google"] = search_google
+    configured["duckduckgo"] = search_duckduckgo
+    return [(name, functools.partial(_guarded_search, name, configured[name]))
+            for name in circuit_breakers.route(configured)]
+
+
+async def hedged_search(query: str, providers: List[SearchProvider],
+                        hedge_delay: float = SEARCH_HEDGE_DELAY) -> dict:
+    """
+    Starts the first provider and, whenever no answer has arrived within
+    `hedge_delay` (or a provider fails), the next one. The first successful
+    result wins and the remaining requests are cancelled.
+    """
+    started = time.perf_counter()
+    queue = list(providers)
+    pending: Dict[asyncio.Task, str] = {}
+    last_result: dict = {"status": "error", "message": "No search providers available."}
+
+    def _launch_next() -> None:
+        name, provider = queue.pop(0)
+        pending[asyncio.create_task(provider(query))] = name
+
+    try:
+        if queue:
+            _launch_next()
+        while pending:
+            done, _ = await asyncio.wait(pending, timeout=hedge_delay if queue else None,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                perf_stats.incr("search.hedge_fired")
+                logger.info("No search answer in %.1fs, hedging with %s",
+                            hedge_delay, queue[0][0])
+                _launch_next()
+                continue
+            for task in done:
+                name = pending.pop(task)
+                try:
+                    result = task.result()
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    result = {"status": "error", "message": str(e)}
+                if result.get("status") == "success":
+                    elapsed = time.perf_counter() - started
+                    perf_stats.observe("search.latency", elapsed)
+                    perf_stats.incr(f"search.win.{name}")
+                    logger.info("Search answered by %s in %.2fs", name, elapsed)
+                    return result
+                last_result = result
+                if queue:
+                    _launch_next()
+    finally:
+        for task in pending:
+            task.cancel()
+            perf_stats.incr("search.cancelled")
+
+    perf_stats.observe("search.latency", time.perf_counter() - started)
+    perf_stats.incr("search.failed")
+    return last_result
+
+
+def search_stats() -> Dict[str, Any]:
+    """Latency percentiles and per-provider win rates for hedged search."""
+    names = ("tavily", "google", "duckduckgo")
+    wins = {name: perf_stats.count(f"search.win.{name}") for name in names}
+    total = sum(wins.values()) + perf_stats.count("search.failed")
+    return {
+        "latency_s": perf_stats.percentiles("search.latency"),
+        "wins": wins,
+        "win_rate": {name: (count / total if total else 0.0) for name, count in wins.items()},
+        "hedges_fired": perf_stats.count("search.hedge_fired"),
+        "cancelled": perf_stats.count("search.cancelled"),
+        "failed": perf_stats.count("search.failed"),
+    }
 
 
 @function_tool
 async def search_internet(query: str) -> dict:
     """
     Perform a high-quality internet search.
-    Cascades through: Tavily -> Google Custom Search -> DuckDuckGo.
+    Uses Tavily, Google Custom Search and DuckDuckGo in that priority order.
     """
-    # 1. Try Tavily (Best for AI Agents)
-    if TAVILY_API_KEY:
-        tavily_result = await search_tavily(query)
-        if tavily_result["status"] == "success":
-            return tavily_result
+    return await search_cache.cached(
+        "search", query, lambda: _search_live(query), should_cache=is_successful_search)
 
-    # 2. Fallback to Google Custom Search
-    if GOOGLE_SEARCH_API_KEY and SEARCH_ENGINE_ID:
-        google_result = await search_google(query)
-        if google_result["status"] == "success":
-            return google_result
 
-    # 3. Last Resort: DuckDuckGo
-    return await search_duckduckgo(query)
+async def _search_live(query: str) -> dict:
+    """Queries the providers, bypassing the cache."""
+    providers = _search_providers()
+    if SEARCH_MODE == "hedged":
+        return await hedged_search(query, providers)
+
+    # Cascade: try each provider in turn (Tavily, Google, then DuckDuckGo)
+    result: dict = {"status": "error", "message": "No search providers available."}
+    for _, provider in providers:
+        result = await provider(query)
+        if result.get("status") == "success":
+            return result
+    return result
 
 
 async def search_tavily(query: str) -> dict:
@@ -85,7 +209,9 @@ async def search_tavily(query: str) -> dict:
     }
 
     try:
-        response = await asyncio.to_thread(requests.post, url, json=payload, timeout=15)
+        response = await rate_limits.run(
+            "tavily", normalize_query(query),
+            lambda: http_client.post(url, json=payload, timeout=15))
         response.raise_for_status()
         data = response.json()
 
@@ -101,7 +227,9 @@ async def search_tavily(query: str) -> dict:
             "results": results,
             "message": f"[TAVILY SEARCH]\n{summary}"
         }
-    except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+    except RateLimitError as e:
+        return {"status": "throttled", "message": f"Tavily: {e}"}
+    except (*HTTP_ERRORS, ValueError, KeyError) as e:
         logger.warning("Tavily Search failed: %s", e)
         return {"status": "error", "message": str(e)}
 
@@ -115,7 +243,8 @@ async def search_google(query: str) -> dict:
     )
 
     try:
-        response = await asyncio.to_thread(requests.get, url, timeout=10)
+        response = await rate_limits.run(
+            "google", normalize_query(query), lambda: http_client.get(url, timeout=10))
         response.raise_for_status()
         data = response.json()
 
@@ -138,22 +267,31 @@ async def search_google(query: str) -> dict:
             "results": results,
             "message": f"[GOOGLE SEARCH]\n{summary}"
         }
-    except (requests.RequestException, ValueError, KeyError, RuntimeError) as e:
+    except RateLimitError as e:
+        return {"status": "throttled", "message": f"Google: {e}"}
+    except (*HTTP_ERRORS, ValueError, KeyError, RuntimeError) as e:
         logger.warning("Google Search failed: %s", e)
         return {"status": "error", "message": str(e)}
 
 
 async def search_duckduckgo(query: str) -> dict:
     """
-    Fallback search using DuckDuckGo.
+    Fallback search using DuckDuckGo. Results are cached.
     """
+    return await search_cache.cached(
+        "duckduckgo", query, lambda: _duckduckgo_live(query), should_cache=is_successful_search)
+
+
+async def _duckduckgo_live(query: str) -> dict:
+    """Runs a DuckDuckGo text search."""
     logger.info("Attempting DuckDuckGo fallback for: '%s'", query)
     try:
         def _ddgs_sync():
             with DDGS() as ddgs:
                 return list(ddgs.text(query, max_results=3))
 
-        results = await asyncio.to_thread(_ddgs_sync)
+        results = await rate_limits.run(
+            "duckduckgo", normalize_query(query), lambda: asyncio.to_thread(_ddgs_sync))
         if not results:
             return {"status": "not_found", "message": f"DuckDuckGo search returned no results for: {query}"}
 
@@ -171,8 +309,11 @@ async def search_duckduckgo(query: str) -> dict:
             "status": "success",
             "provider": "duckduckgo",
             "query": query,
+            "results": formatted_results,
             "message": f"[BACKUP SEARCH]\n{summary}"
         }
+    except RateLimitError as e:
+        return {"status": "throttled", "message": f"DuckDuckGo: {e}"}
     except (RuntimeError, AttributeError, KeyError, ValueError) as e:
         logger.error("DuckDuckGo fallback also failed: %s", e)
         return {"status": "error", "message": "Search failed on both Google and DuckDuckGo."}
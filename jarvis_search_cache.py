@@ -0,0 +1,218 @@
+"""
+# jarvis_search_cache.py
+Persistent search result cache for JARVIS.
+
+Results are kept in SQLite (conversations/cache/search_cache.sqlite3) behind
+an in-memory LRU. Query keys are normalised (case, punctuation, whitespace,
+filler words) so "Weather Lahore?" and "lahore ka weather" style repeats
+share an entry. Each namespace has its own freshness TTL; entries past it
+are still served for a stale window while a background refresh runs.
+"""
+
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+from jarvis_logger import setup_logger
+from jarvis_metrics import perf_stats
+from jarvis_ratelimit import SingleFlight
+
+logger = setup_logger("JARVIS-SEARCH-CACHE")
+
+CACHE_DIR = os.path.join("conversations", "cache")
+SEARCH_CACHE_PATH = os.path.join(CACHE_DIR, "search_cache.sqlite3")
+
+# (fresh seconds, extra stale-while-revalidate seconds) per namespace
+SEARCH_CACHE_TTLS: Dict[str, Tuple[float, float]] = {
+    "search": (float(os.getenv("JARVIS_SEARCH_CACHE_TTL", "900")), 6 * 3600.0),
+    "duckduckgo": (float(os.getenv("JARVIS_SEARCH_CACHE_TTL", "900")), 6 * 3600.0),
+    "search_urls": (24 * 3600.0, 3 * 24 * 3600.0),
+}
+DEFAULT_TTL = (900.0, 3600.0)
+
+# Filler words that do not change what is being searched for
+STOPWORDS = frozenset({
+    "a", "an", "the", "please", "pls", "me", "tell", "about", "search", "for",
+    "jarvis", "anna", "sir", "zara", "ka", "ki", "ke", "ko", "do", "karo",
+    "kar", "bata", "batao", "hai", "hain", "mujhe", "ye", "yeh", "wo", "se"
+})
+
+_PUNCT_RE = re.compile(r"[^\w\s]+", re.UNICODE)
+
+
+def normalize_query(query: str) -> str:
+    """Lowercases, strips punctuation and filler words, and collapses spaces."""
+    words = _PUNCT_RE.sub(" ", query.lower()).split()
+    kept = [w for w in words if w not in STOPWORDS]
+    # A query made only of filler words still needs a usable key
+    return " ".join(kept or words)
+
+
+class SearchCache:
+    """
+    Two-level (LRU + SQLite) cache with stale-while-revalidate.
+    """
+
+    def __init__(self, path: str = SEARCH_CACHE_PATH, memory_size: int = 256):
+        self.path = path
+        self.memory_size = memory_size
+        self._memory: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self._refreshing: Set[Tuple[str, str]] = set()
+        self._inflight = SingleFlight()
+        self._db_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+                "stored_at REAL NOT NULL, PRIMARY KEY (namespace, key))")
+            self._conn.commit()
+        return self._conn
+
+    def _remember(self, ident: Tuple[str, str], stored_at: float, value: Any) -> None:
+        self._memory[ident] = (stored_at, value)
+        self._memory.move_to_end(ident)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, namespace: str, key: str) -> Optional[Tuple[float, Any]]:
+        with self._db_lock:
+            row = self._db().execute(
+                "SELECT stored_at, value FROM search_cache WHERE namespace = ? AND key = ?",
+                (namespace, key)).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def _write_disk(self, namespace: str, key: str, stored_at: float, value: Any) -> None:
+        with self._db_lock:
+            conn = self._db()
+            conn.execute(
+                "INSERT OR REPLACE INTO search_cache (namespace, key, value, stored_at) "
+                "VALUES (?, ?, ?, ?)",
+                (namespace, key, json.dumps(value, ensure_ascii=False), stored_at))
+            conn.commit()
+
+    async def lookup(self, namespace: str, query: str) -> Optional[Tuple[float, Any]]:
+        """Returns (age_seconds, value) for a cached query, or None."""
+        ident = (namespace, normalize_query(query))
+        entry = self._memory.get(ident)
+        if entry is None:
+            try:
+                entry = await asyncio.to_thread(self._read_disk, *ident)
+            except (sqlite3.Error, ValueError) as e:
+                logger.warning("Search cache read failed: %s", e)
+                entry = None
+            if entry is None:
+                return None
+        self._remember(ident, *entry)
+        return time.time() - entry[0], entry[1]
+
+    async def store(self, namespace: str, query: str, value: Any) -> None:
+        """Caches a value for a query in memory and on disk."""
+        ident = (namespace, normalize_query(query))
+        stored_at = time.time()
+        self._remember(ident, stored_at, value)
+        try:
+            await asyncio.to_thread(self._write_disk, *ident, stored_at, value)
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.warning("Search cache write failed: %s", e)
+
+    async def _refresh(self, namespace: str, query: str, fetch: Callable[[], Awaitable[Any]],
+                       should_cache: Callable[[Any], bool]) -> None:
+        ident = (namespace, normalize_query(query))
+        try:
+            value = await fetch()
+            if should_cache(value):
+                await self.store(namespace, query, value)
+                perf_stats.incr("search_cache.refreshed")
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.warning("Background search refresh failed for '%s': %s", query, e)
+        finally:
+            self._refreshing.discard(ident)
+
+    async def cached(self, namespace: str, query: str, fetch: Callable[[], Awaitable[Any]],
+                     should_cache: Callable[[Any], bool] = bool) -> Any:
+        """
+        Returns a fresh cached value, a stale one (while refreshing it in the
+        background), or the result of `fetch()` on a miss.
+        """
+        ttl, stale_window = SEARCH_CACHE_TTLS.get(namespace, DEFAULT_TTL)
+        hit = await self.lookup(namespace, query)
+        if hit is not None:
+            age, value = hit
+            if age < ttl:
+                perf_stats.incr("search_cache.hit")
+                return value
+            if age < ttl + stale_window:
+                perf_stats.incr("search_cache.stale_hit")
+                ident = (namespace, normalize_query(query))
+                if ident not in self._refreshing:
+                    self._refreshing.add(ident)
+                    asyncio.create_task(self._refresh(namespace, query, fetch, should_cache))
+                return value
+
+        perf_stats.incr("search_cache.miss")
+
+        async def _fetch_and_store() -> Any:
+            value = await fetch()
+            if should_cache(value):
+                await self.store(namespace, query, value)
+            return value
+
+        # Concurrent misses for the same query share one fetch
+        value, shared = await self._inflight.do((namespace, normalize_query(query)),
+                                                _fetch_and_store)
+        if shared:
+            perf_stats.incr("search_cache.coalesced")
+        return value
+
+    def purge(self, max_age: float) -> int:
+        """Deletes disk entries older than `max_age` seconds; returns the count."""
+        with self._db_lock:
+            conn = self._db()
+            cursor = conn.execute("DELETE FROM search_cache WHERE stored_at < ?",
+                                  (time.time() - max_age,))
+            conn.commit()
+        return cursor.rowcount
+
+    def close(self) -> None:
+        """Closes the SQLite connection."""
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def search_cache_stats() -> Dict[str, Any]:
+    """Hit counters and overall hit rate (stale hits count as hits)."""
+    hits = perf_stats.count("search_cache.hit")
+    stale = perf_stats.count("search_cache.stale_hit")
+    misses = perf_stats.count("search_cache.miss")
+    total = hits + stale + misses
+    return {
+        "hits": hits,
+        "stale_hits": stale,
+        "misses": misses,
+        "coalesced": perf_stats.count("search_cache.coalesced"),
+        "refreshed": perf_stats.count("search_cache.refreshed"),
+        "hit_rate": (hits + stale) / total if total else 0.0,
+    }
+
+
+def is_successful_search(result: Any) -> bool:
+    """Only successful provider responses are worth caching."""
+    return isinstance(result, dict) and result.get("status") == "success"
+
+
+# Global Instance
+search_cache = SearchCache()
@@ -124,9 +124,11 @@ class VectorMemory:
                 span.record_exception(e)
             return False
 
-    def query_memory(self, query_text, n_results=5):
+    def query_memory(self, query_text, n_results=5, with_scores=False):
         """
         Search for relevant memories based on semantic similarity.
+        With `with_scores`, returns (document, relevance) pairs where relevance
+        is 1 / (1 + distance), so higher is more relevant.
         """
         if not query_text:
             return []
@@ -135,11 +137,11 @@ class VectorMemory:
         if _px and hasattr(_px, "active_span"):
             with _px.active_span("VectorMemory.query_memory") as span:
                 span.set_attribute("query.text", query_text)
-                return self._query_memory_internal(query_text, n_results, span)
+                return self._query_memory_internal(query_text, n_results, span, with_scores)
         else:
-            return self._query_memory_internal(query_text, n_results)
+            return self._query_memory_internal(query_text, n_results, with_scores=with_scores)
 
-    def _query_memory_internal(self, query_text, n_results=5, span=None):
+    def _query_memory_internal(self, query_text, n_results=5, span=None, with_scores=False):
         self._ensure_initialized()
         if self.collection is None:
             logger.warning(
@@ -156,6 +158,10 @@ class VectorMemory:
                 if _px:
                     span.set_attribute("results.count", len(docs))
                     span.set_status(_px.SpanStatus.OK)
+            if with_scores:
+                distances = (results.get("distances") or [[]])[0] or [0.0] * len(docs)
+                return [(doc, 1.0 / (1.0 + float(dist)))
+                        for doc, dist in zip(docs, distances)]
             return docs
         except (ValueError, KeyError, RuntimeError, OSError) as e:
             logger.error("Error querying Vector Memory: %s", e)
@@ -12,11 +12,13 @@ import base64
 from io import BytesIO
 import pyautogui
 from PIL import Image
-import requests
 from google import genai
 from livekit.agents import function_tool
 from dotenv import load_dotenv
 from jarvis_logger import setup_logger
+from jarvis_circuit import CircuitOpenError, circuit_breakers, is_quota_error
+from jarvis_http import HTTP_ERRORS, http_client
+from jarvis_ratelimit import RateLimitError, rate_limits
 
 # Setup logging
 logger = setup_logger("JARVIS-VISION")
@@ -96,13 +98,14 @@ class ScreenPerceiver:
                 }]
             }
 
-            response = await asyncio.to_thread(
-                requests.post, url, headers=headers, json=payload, timeout=60)
+            response = await rate_limits.run(
+                "openrouter", None,
+                lambda: http_client.post(url, headers=headers, json=payload, timeout=60))
             if response.status_code == 200:
                 result = response.json()
                 return result['choices'][0]['message']['content']
             return f"OpenRouter Error: {response.text}"
-        except (requests.RequestException, ValueError, KeyError) as e:
+        except (*HTTP_ERRORS, RateLimitError, ValueError, KeyError) as e:
             return f"Fallback failed: {str(e)}"
 
     async def analyze_content(self, prompt: str = "What is on my screen?") -> str:
@@ -114,12 +117,18 @@ class ScreenPerceiver:
             image_bytes = await self.capture_screen()
             image = Image.open(BytesIO(image_bytes))
 
-            # Try Primary: Gemini
+            # Try Primary: Gemini (skipped while its circuit is open)
             try:
-                return await self.analyze_via_google(prompt, image)
+                return await rate_limits.run(
+                    "gemini", None,
+                    lambda: circuit_breakers.get("gemini").call(
+                        self.analyze_via_google, prompt, image))
+            except (CircuitOpenError, RateLimitError) as e:
+                logger.info("Gemini unavailable (%s). Using OpenRouter directly...", e)
+                return await self.analyze_via_openrouter(prompt, image)
             except (ValueError, RuntimeError, AttributeError) as e:
                 # Catch Quota or Rate Limit errors specifically if possible
-                if "429" in str(e) or "RESOURCE_EXHAUSTED" in str(e):
+                if is_quota_error(e):
                     logger.warning(
                         "Gemini quota exhausted. Falling back to OpenRouter...")
                     return await self.analyze_via_openrouter(prompt, image)
@@ -0,0 +1,264 @@
+"""
+# jarvis_workflow.py
+Concurrent DAG executor for multi-step JARVIS workflows.
+
+A workflow is a list of steps with declared dependencies. Independent steps
+(several searches or scrapes) run concurrently, outputs flow into dependent
+steps, and every step has its own timeout. The whole workflow is exposed as a
+single tool so it costs one LLM round trip instead of one per step.
+
+Step format:
+    {"id": "s1", "action": "search", "args": {"query": "..."},
+     "depends_on": [], "timeout": 20}
+
+Argument values may reference earlier outputs: "$s1" is replaced by the
+output of step s1, and "${s1}" inside a longer string by its text.
+"""
+
+import asyncio
+import json
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from livekit.agents import function_tool
+from jarvis_logger import setup_logger
+from jarvis_metrics import perf_stats
+
+logger = setup_logger("JARVIS-WORKFLOW")
+
+ActionFn = Callable[..., Awaitable[Any]]
+
+DEFAULT_STEP_TIMEOUT = 30.0
+MAX_WORKFLOW_STEPS = 12
+
+_INLINE_REF_RE = re.compile(r"\$\{([A-Za-z0-9_\-]+)\}")
+
+
+class WorkflowError(ValueError):
+    """Raised when a workflow definition is invalid."""
+
+
+async def _action_search(query: str) -> Any:
+    from jarvis_search import search_internet  # pylint: disable=import-outside-toplevel
+    return await search_internet(query)
+
+
+async def _action_research(query: str) -> Any:
+    from jarvis_researcher import perform_web_research  # pylint: disable=import-outside-toplevel
+    return await perform_web_research(query)
+
+
+async def _action_scrape(url: str) -> Any:
+    from jarvis_researcher import scrape_url  # pylint: disable=import-outside-toplevel
+    return await scrape_url(url)
+
+
+async def _action_weather(city: str = "") -> Any:
+    from jarvis_get_weather import get_weather  # pylint: disable=import-outside-toplevel
+    return await get_weather(city)
+
+
+async def _action_email(recipient: str, subject: str, body: Any, attachment_path: str = "") -> Any:
+    from jarvis_advanced_tools import send_email  # pylint: disable=import-outside-toplevel
+    return await send_email(recipient, subject, _as_text(body), attachment_path)
+
+
+async def _action_save(filename: str, content: Any) -> Any:
+    from jarvis_notepad_automation import notepad_automation  # pylint: disable=import-outside-toplevel
+    success, path = await notepad_automation.save_file_safely(_as_text(content), filename)
+    if not success:
+        raise OSError(path)
+    return {"status": "success", "path": path}
+
+
+async def _action_combine(parts: List[Any], separator: str = "\n\n") -> str:
+    return separator.join(_as_text(part) for part in parts if part)
+
+
+# Actions available to workflow steps
+WORKFLOW_ACTIONS: Dict[str, ActionFn] = {
+    "search": _action_search,
+    "research": _action_research,
+    "scrape": _action_scrape,
+    "weather": _action_weather,
+    "email": _action_email,
+    "save": _action_save,
+    "combine": _action_combine,
+}
+
+
+def _as_text(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    try:
+        return json.dumps(value, ensure_ascii=False, default=str)
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def _resolve(value: Any, outputs: Dict[str, Any]) -> Any:
+    """Substitutes step output references inside argument values."""
+    if isinstance(value, str):
+        if value.startswith("$") and value[1:] in outputs:
+            return outputs[value[1:]]
+        return _INLINE_REF_RE.sub(
+            lambda m: _as_text(outputs[m.group(1)]) if m.group(1) in outputs else m.group(0),
+            value)
+    if isinstance(value, list):
+        return [_resolve(item, outputs) for item in value]
+    if isinstance(value, dict):
+        return {key: _resolve(item, outputs) for key, item in value.items()}
+    return value
+
+
+class WorkflowExecutor:
+    """
+    Runs a workflow DAG, starting each step as soon as its dependencies
+    have finished.
+    """
+
+    def __init__(self, actions: Optional[Dict[str, ActionFn]] = None,
+                 default_timeout: float = DEFAULT_STEP_TIMEOUT,
+                 max_steps: int = MAX_WORKFLOW_STEPS):
+        self.actions = actions if actions is not None else WORKFLOW_ACTIONS
+        self.default_timeout = default_timeout
+        self.max_steps = max_steps
+
+    def validate(self, steps: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Checks ids, actions and dependencies; returns the steps keyed by id."""
+        if not steps:
+            raise WorkflowError("Workflow has no steps")
+        if len(steps) > self.max_steps:
+            raise WorkflowError(f"Workflow has {len(steps)} steps, limit is {self.max_steps}")
+
+        by_id: Dict[str, Dict[str, Any]] = {}
+        for index, step in enumerate(steps):
+            if not isinstance(step, dict):
+                raise WorkflowError(f"Step {index + 1} is not an object")
+            step_id = str(step.get("id") or f"s{index + 1}")
+            if step_id in by_id:
+                raise WorkflowError(f"Duplicate step id '{step_id}'")
+            if step.get("action") not in self.actions:
+                raise WorkflowError(f"Unknown action '{step.get('action')}' in step '{step_id}'")
+            by_id[step_id] = {**step, "id": step_id,
+                              "depends_on": [str(d) for d in step.get("depends_on", [])]}
+
+        for step_id, step in by_id.items():
+            for dep in step["depends_on"]:
+                if dep not in by_id:
+                    raise WorkflowError(f"Step '{step_id}' depends on unknown step '{dep}'")
+
+        # Kahn's algorithm: anything left over sits on a cycle
+        indegree = {step_id: len(step["depends_on"]) for step_id, step in by_id.items()}
+        ready = [step_id for step_id, degree in indegree.items() if degree == 0]
+        visited = 0
+        while ready:
+            current = ready.pop()
+            visited += 1
+            for step_id, step in by_id.items():
+                if current in step["depends_on"]:
+                    indegree[step_id] -= 1
+                    if indegree[step_id] == 0:
+                        ready.append(step_id)
+        if visited != len(by_id):
+            raise WorkflowError("Workflow dependencies contain a cycle")
+        return by_id
+
+    async def _run_step(self, step: Dict[str, Any], outputs: Dict[str, Any]) -> Any:
+        args = _resolve(step.get("args") or {}, outputs)
+        timeout = float(step.get("timeout") or self.default_timeout)
+        return await asyncio.wait_for(self.actions[step["action"]](**args), timeout=timeout)
+
+    async def run(self, steps: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Executes the workflow. Failed or timed-out steps do not stop
+        independent branches; their dependents are skipped.
+        """
+        by_id = self.validate(steps)
+        outputs: Dict[str, Any] = {}
+        results: Dict[str, Dict[str, Any]] = {}
+        running: Dict[asyncio.Task, tuple] = {}
+        started = time.perf_counter()
+
+        def _launch_ready() -> None:
+            # Skips cascade through steps declared in any order, so repeat until settled
+            changed = True
+            while changed:
+                changed = False
+                for step_id, step in by_id.items():
+                    if step_id in results or any(t[0] == step_id for t in running.values()):
+                        continue
+                    deps = step["depends_on"]
+                    if any(results.get(dep, {}).get("status") in ("error", "skipped")
+                           for dep in deps):
+                        results[step_id] = {"status": "skipped", "action": step["action"],
+                                            "error": "dependency failed"}
+                        changed = True
+                        continue
+                    if all(dep in outputs for dep in deps):
+                        task = asyncio.create_task(self._run_step(step, outputs))
+                        running[task] = (step_id, time.perf_counter())
+
+        try:
+            _launch_ready()
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    step_id, step_started = running.pop(task)
+                    action = by_id[step_id]["action"]
+                    elapsed = time.perf_counter() - step_started
+                    perf_stats.observe(f"workflow.step.{action}", elapsed)
+                    try:
+                        outputs[step_id] = task.result()
+                        results[step_id] = {"status": "success", "action": action,
+                                            "output": outputs[step_id],
+                                            "duration_s": round(elapsed, 3)}
+                    except asyncio.TimeoutError:
+                        logger.warning("Workflow step '%s' timed out", step_id)
+                        results[step_id] = {"status": "error", "action": action,
+                                            "error": "timeout", "duration_s": round(elapsed, 3)}
+                    except Exception as e:  # pylint: disable=broad-exception-caught
+                        logger.error("Workflow step '%s' failed: %s", step_id, e)
+                        results[step_id] = {"status": "error", "action": action,
+                                            "error": str(e), "duration_s": round(elapsed, 3)}
+                _launch_ready()
+        finally:
+            for task in running:
+                task.cancel()
+
+        total = time.perf_counter() - started
+        perf_stats.observe("workflow.run", total)
+        failed = sum(1 for r in results.values() if r["status"] != "success")
+        status = "success" if not failed else (
+            "partial_success" if failed < len(results) else "error")
+        logger.info("Workflow finished in %.2fs: %d/%d steps succeeded",
+                    total, len(results) - failed, len(results))
+        return {
+            "status": status,
+            "duration_s": round(total, 3),
+            "steps": {step_id: results[step_id] for step_id in by_id}
+        }
+
+
+# Global Instance
+workflow_executor = WorkflowExecutor()
+
+
+@function_tool
+async def execute_workflow(steps_json: str) -> dict:
+    """
+    Runs a multi-step workflow in one call. Independent steps run in parallel.
+    steps_json is a JSON list of steps, each:
+    {"id": "s1", "action": "<action>", "args": {...}, "depends_on": ["..."], "timeout": 30}.
+    Actions: search(query), research(query), scrape(url), weather(city),
+    email(recipient, subject, body, attachment_path), save(filename, content),
+    combine(parts). Use "$s1" as an argument value to pass the output of step s1,
+    or "${s1}" inside a longer string.
+    """
+    try:
+        steps = json.loads(steps_json)
+        if isinstance(steps, dict):
+            steps = steps.get("steps", [])
+        return await workflow_executor.run(steps)
+    except (json.JSONDecodeError, WorkflowError) as e:
+        return {"status": "error", "message": f"❌ Invalid workflow: {e}"}
@@ -206,8 +206,13 @@ class ConversationMemory:
 
         return removed_count
 
-    async def get_semantic_context(self, query: str, n_results: int = 3) -> List[str]:
-        """Search Long-Term Memory for semantically relevant information"""
+    async def get_semantic_context(self, query: str, n_results: int = 3,
+                                   with_scores: bool = False) -> List:
+        """
+        Search Long-Term Memory for semantically relevant information.
+        With `with_scores`, returns (text, relevance) pairs for budgeting.
+        """
         logger.info("Semantic search initiated for query: %s", query)
         # ChromaDB query is blocking, run in thread
-        return await asyncio.to_thread(jarvis_vector_db.query_memory, query, n_results)
+        return await asyncio.to_thread(
+            jarvis_vector_db.query_memory, query, n_results, with_scores)
@@ -1,7 +1,7 @@
 
 import os
 import shutil
-from unittest.mock import patch, MagicMock
+from unittest.mock import AsyncMock, patch, MagicMock
 
 import pytest
 from jarvis_advanced_tools import zip_files, download_images, send_email
@@ -19,13 +19,13 @@ async def test_zip_files_success(mock_exists, mock_make_archive):
 
 
 @pytest.mark.asyncio
-@patch("requests.get")
+@patch("jarvis_advanced_tools.http_client.get", new_callable=AsyncMock)
 @patch("duckduckgo_search.DDGS.images")
 async def test_download_images_mock(mock_ddgs, mock_get):
     # Mock DDGS results
     mock_ddgs.return_value = [{"image": "http://example.com/test.jpg"}]
 
-    # Mock requests response
+    # Mock pooled HTTP response
     mock_resp = MagicMock()
     mock_resp.status_code = 200
     mock_resp.content = b"fake image content"
@@ -2,6 +2,7 @@ import pytest
 import asyncio
 from unittest.mock import MagicMock, patch, AsyncMock
 from agent_core import BrainAssistant
+from jarvis_context_budget import estimate_tokens
 
 
 @pytest.fixture
@@ -85,10 +86,9 @@ async def test_inject_emotional_context(mock_agent_deps):
     assistant._gf_mode_active = True
     turn_ctx = MagicMock()
     turn_ctx.chat_ctx.items = []
-    with patch("agent_core.context_analyzer.analyze_context", return_value={"user_mood": "upset"}):
-        with patch.object(assistant.memory_extractor.memory, "get_recent_context", new_callable=AsyncMock):
-            await assistant._inject_emotional_context("I am sad", turn_ctx)
-            assert len(turn_ctx.chat_ctx.items) == 1
+    with patch("jarvis_reasoning.context_analyzer.analyze_context", return_value={"user_mood": "upset"}):
+        await assistant._inject_emotional_context("I am sad", turn_ctx)
+        assert len(turn_ctx.chat_ctx.items) == 1
 
 
 @pytest.mark.asyncio
@@ -119,6 +119,21 @@ async def test_inject_reasoning_and_memory(mock_agent_deps):
             assert "[LONG-TERM MEMORY CONTEXT]" in all_content
 
 
+@pytest.mark.asyncio
+async def test_inject_reasoning_trims_plan_to_budget(mock_agent_deps):
+    assistant = BrainAssistant(chat_ctx=MagicMock())
+    turn_ctx = MagicMock()
+    turn_ctx.chat_ctx.items = []
+    long_plan = [{"step": n, "action": "search the web for detailed results"} for n in range(50)]
+    with patch("agent_core.CONTEXT_TOKEN_BUDGET", 40), \
+            patch.object(assistant.memory_extractor.memory, "get_semantic_context", new_callable=AsyncMock, return_value=["memory1"]), \
+            patch("agent_core.process_with_advanced_reasoning", new_callable=AsyncMock, return_value={"is_agentic": True, "plan": long_plan}):
+        await assistant._inject_reasoning_and_memory("test", turn_ctx, is_anna=False)
+    contents = [i.content[0] for i in turn_ctx.chat_ctx.items]
+    assert len(contents) == 1 and contents[0].startswith("[EXECUTION PLAN]")
+    assert estimate_tokens(contents[0]) <= 40
+
+
 @pytest.mark.asyncio
 async def test_tool_change_voice(mock_agent_deps):
     assistant = BrainAssistant(chat_ctx=MagicMock())
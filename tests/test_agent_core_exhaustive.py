@@ -1,5 +1,6 @@
 import pytest
 import asyncio
+from collections import deque
 import json
 from unittest.mock import MagicMock, patch, AsyncMock, PropertyMock
 from agent_core import BrainAssistant
@@ -116,7 +117,7 @@ async def test_handle_wake_word_none_detected(mock_agent_deps):
 async def test_inject_emotional_context_exception(mock_agent_deps):
     assistant = BrainAssistant(chat_ctx=MagicMock())
     # Test lines 249-250
-    with patch.object(assistant.memory_extractor.memory, "get_recent_context", side_effect=Exception("DB Error")):
+    with patch("agent_core.get_turn_reasoning", side_effect=Exception("Reasoning Error")):
         await assistant._inject_emotional_context("test", MagicMock())
 
 
@@ -187,8 +188,8 @@ async def test_on_user_turn_completed_exhaustive(mock_agent_deps):
                     await assistant.on_user_turn_completed(turn_ctx, new_message)
 
     # Branch: History pop (Line 295)
-    assistant.conversation_history = [
-        {"role": "user", "content": f"msg{i}"} for i in range(20)]
+    assistant.conversation_history = deque(
+        [{"role": "user", "content": f"msg{i}"} for i in range(20)], maxlen=20)
     with patch.object(assistant, "_extract_text_from_message", return_value="jarvis"):
         with patch.object(assistant, "_handle_wake_word", new_callable=AsyncMock, return_value=(True, False)):
             with patch.object(assistant, "_handle_anna_upset_state", new_callable=AsyncMock):
@@ -7,7 +7,8 @@ from agent_loops import (
     start_memory_storage_loop,
     start_reminder_loop,
     start_bug_hunter_loop,
-    start_ui_command_listener
+    start_ui_command_listener,
+    start_index_reconcile_loop
 )
 
 @pytest.mark.asyncio
@@ -79,3 +80,15 @@ async def test_start_ui_command_listener_unmute():
             await start_ui_command_listener(mock_assistant)
             
     assert mock_assistant._muted is False
+
+
+@pytest.mark.asyncio
+async def test_start_index_reconcile_loop_refreshes_each_index():
+    file_refresh = AsyncMock(side_effect=[OSError("drive gone"), None])
+    doc_refresh = AsyncMock()
+    with patch("asyncio.sleep", side_effect=[None, asyncio.CancelledError()]) as mock_sleep:
+        await start_index_reconcile_loop([file_refresh, doc_refresh], interval=60)
+    assert file_refresh.await_count == 2
+    # The failed pass skips the remaining refreshers until the next interval
+    doc_refresh.assert_awaited_once()
+    mock_sleep.assert_called_with(60)
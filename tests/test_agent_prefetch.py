@@ -0,0 +1,77 @@
+import pytest
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+from agent_prefetch import SpeculativePrefetcher, normalize_transcript
+from jarvis_metrics import perf_stats
+
+
+@pytest.fixture
+def memory():
+    mem = MagicMock()
+    mem.get_semantic_context = AsyncMock(return_value=[("likes tea", 0.9)])
+    return mem
+
+
+@pytest.fixture(autouse=True)
+def reset_stats():
+    perf_stats.reset()
+    yield
+    perf_stats.reset()
+
+
+def test_normalize_transcript():
+    assert normalize_transcript("  Jarvis, WHAT's up?! ") == "jarvis what s up"
+
+
+@pytest.mark.asyncio
+async def test_partial_without_wake_word_is_ignored(memory):
+    prefetcher = SpeculativePrefetcher(memory)
+    assert prefetcher.on_partial("what is the weather today") is None
+    memory.get_semantic_context.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_claim_reuses_similar_prefetch(memory):
+    prefetcher = SpeculativePrefetcher(memory)
+    task = prefetcher.on_partial("Jarvis aaj ka mausam")
+    assert task is not None
+    # The same prefix is not queried twice
+    assert prefetcher.on_partial("jarvis, aaj ka mausam") is None
+
+    result = await prefetcher.claim("jarvis aaj ka mausam kaisa")
+    assert result == [("likes tea", 0.9)]
+    memory.get_semantic_context.assert_awaited_once()
+    assert perf_stats.count("prefetch.hit") == 1
+    assert prefetcher.hit_rate == 1.0
+
+
+@pytest.mark.asyncio
+async def test_claim_cancels_dissimilar_prefetch(memory):
+    gate = asyncio.Event()
+
+    async def slow_query(**kwargs):
+        await gate.wait()
+        return []
+    memory.get_semantic_context = AsyncMock(side_effect=slow_query)
+
+    prefetcher = SpeculativePrefetcher(memory)
+    task = prefetcher.on_partial("jarvis open the notepad")
+    await asyncio.sleep(0)
+
+    result = await prefetcher.claim("anna play some music on youtube please")
+    assert result is None
+    await asyncio.sleep(0)
+    assert task.cancelled()
+    assert perf_stats.count("prefetch.miss") == 1
+    assert perf_stats.count("prefetch.cancelled") == 1
+
+
+@pytest.mark.asyncio
+async def test_inflight_prefetches_are_bounded(memory):
+    prefetcher = SpeculativePrefetcher(memory, max_inflight=2)
+    first = prefetcher.on_partial("jarvis open")
+    prefetcher.on_partial("jarvis open the")
+    prefetcher.on_partial("jarvis open the file")
+    await asyncio.sleep(0)
+    assert first.cancelled()
+    prefetcher.cancel_all()
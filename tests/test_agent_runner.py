@@ -44,9 +44,23 @@ async def test_start_background_tasks(mock_runner_deps):
     with patch("asyncio.create_task") as mock_create:
         with patch("jarvis_clipboard.ClipboardMonitor"):
             tasks = await _start_background_tasks(session, assistant)
-            # 4 tasks initially + 1 for clipboard monitor
-            assert len(tasks) == 5
-            assert mock_create.call_count == 5
+            # 4 room-bound tasks + 5 warm tasks: diagnostics, weather prefetch,
+            # clipboard, index reconcile and document pre-extraction
+            assert len(tasks) == 4
+            assert mock_create.call_count == 9
+
+
+@pytest.mark.asyncio
+async def test_research_progress_speaks_once_while_sources_load():
+    from agent_runner import _on_research_progress
+    session = MagicMock()
+    update = {"found": 1, "completed": 1, "total": 5, "preview": "First findings"}
+    with patch("agent_runner.agent_state.session", session):
+        await _on_research_progress(update)
+        await _on_research_progress({**update, "found": 2, "completed": 2})
+        await _on_research_progress({**update, "completed": 5})
+    session.say.assert_called_once()
+    assert "First findings" in session.say.call_args[0][0]
 
 
 @pytest.mark.asyncio
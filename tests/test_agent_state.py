@@ -0,0 +1,78 @@
+import pytest
+import asyncio
+from unittest.mock import MagicMock, patch
+from agent_state import AgentState
+from jarvis_metrics import perf_stats
+
+
+@pytest.fixture
+def state():
+    with patch("agent_state.MemoryExtractor") as mock_extractor_cls:
+        mock_extractor_cls.side_effect = lambda: MagicMock()
+        yield AgentState()
+
+
+def test_memory_extractor_is_reused(state):
+    first = state.get_memory_extractor()
+    assert state.get_memory_extractor() is first
+
+
+def test_bind_session_resets_cursor(state):
+    extractor = state.get_memory_extractor()
+    session = MagicMock()
+    state.bind_session(session, MagicMock())
+    assert state.session is session
+    extractor.clear_context.assert_called_once()
+
+    state.release_session()
+    assert state.session is None
+    assert state.get_memory_extractor() is extractor
+
+
+@pytest.mark.asyncio
+async def test_ensure_task_starts_once(state):
+    calls = []
+
+    async def worker():
+        calls.append(1)
+        await asyncio.sleep(10)
+
+    task = state.ensure_task("worker", worker)
+    assert state.ensure_task("worker", worker) is task
+    await asyncio.sleep(0)
+    assert len(calls) == 1
+
+    await state.shutdown()
+    assert task.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_ensure_task_restarts_only_failed(state):
+    async def worker():
+        return None
+
+    async def broken():
+        raise RuntimeError("boom")
+
+    task = state.ensure_task("worker", worker)
+    await task
+    # A one-shot task that completed is not run again on session retries
+    assert state.ensure_task("worker", worker) is task
+
+    failed = state.ensure_task("broken", broken)
+    await asyncio.gather(failed, return_exceptions=True)
+    assert state.ensure_task("broken", broken) is not failed
+    await state.shutdown()
+
+
+def test_session_ready_records_cold_then_warm(state):
+    perf_stats.reset()
+    state.mark_attempt_start()
+    state.mark_session_ready()
+    assert state.is_warm is True
+
+    state.mark_attempt_start()
+    state.mark_session_ready()
+    snapshot = perf_stats.snapshot()
+    assert "session.cold_start" in snapshot["timings"]
+    assert "session.warm_restart" in snapshot["timings"]
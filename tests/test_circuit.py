@@ -0,0 +1,127 @@
+import pytest
+import asyncio
+from jarvis_circuit import (CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError,
+                            CircuitRegistry, is_quota_error)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker("svc", window=10, min_calls=4, error_rate=0.5,
+                          cooldown=30, quota_cooldown=300, clock=clock)
+
+
+def test_quota_error_detection():
+    assert is_quota_error("429 RESOURCE_EXHAUSTED")
+    assert is_quota_error(ValueError("Client error '429 Too Many Requests'"))
+    assert not is_quota_error("timed out")
+
+
+def test_opens_on_error_rate_then_half_opens(breaker, clock):
+    breaker.record_success(0.1)
+    breaker.record_failure("boom")
+    breaker.record_failure("boom")
+    assert breaker.state == CLOSED  # only 3 calls so far
+    breaker.record_failure("boom")
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.health_score() == 0.0
+
+    clock.now += 31
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()  # one probe at a time
+    breaker.record_success(0.1)
+    assert breaker.state == CLOSED
+    assert breaker.snapshot()["error_rate"] == 0.0
+
+
+def test_failed_probe_doubles_cooldown(breaker, clock):
+    for _ in range(4):
+        breaker.record_failure("boom")
+    clock.now += 31
+    assert breaker.allow()
+    breaker.record_failure("still down")
+    assert breaker.state == OPEN
+    clock.now += 31
+    assert breaker.state == OPEN
+    clock.now += 30
+    assert breaker.state == HALF_OPEN
+
+
+def test_quota_error_trips_immediately(breaker):
+    breaker.record_failure("429 RESOURCE_EXHAUSTED")
+    snap = breaker.snapshot()
+    assert snap["state"] == OPEN
+    assert snap["retry_in_s"] == 300
+    assert snap["trips"] == 1
+
+
+def test_health_score_penalises_latency(clock):
+    fast = CircuitBreaker("fast", latency_budget=1.0, clock=clock)
+    slow = CircuitBreaker("slow", latency_budget=1.0, clock=clock)
+    fast.record_success(0.1)
+    slow.record_success(3.0)
+    assert fast.health_score() > slow.health_score()
+
+
+@pytest.mark.asyncio
+async def test_call_records_outcomes_and_refuses_when_open(breaker):
+    async def ok():
+        return {"status": "success"}
+
+    async def bad():
+        raise ValueError("boom")
+
+    assert await breaker.call(ok) == {"status": "success"}
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            await breaker.call(bad)
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        await breaker.call(ok)
+
+
+@pytest.mark.asyncio
+async def test_call_is_failure_and_cancellation(breaker, clock):
+    async def soft_error():
+        return {"status": "error", "message": "quota exceeded"}
+
+    await breaker.call(soft_error, is_failure=lambda r: r["message"])
+    assert breaker.state == OPEN
+
+    clock.now += 301
+    task = asyncio.create_task(breaker.call(asyncio.sleep, 5))
+    await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    # The probe slot is released so the next call can probe
+    assert breaker.allow()
+
+
+def test_registry_route_skips_open_and_demotes_degraded():
+    registry = CircuitRegistry()
+    registry.get("tavily").record_failure("429")
+    registry.get("tavily").record_failure("429")
+    registry.get("google").record_success(0.2)
+    slow = registry.get("duckduckgo")
+    slow.record_success(0.1)
+    slow.record_success(40.0)
+    registry.get("bing").record_success(0.1)
+
+    assert registry.get("tavily").snapshot()["trips"] == 1
+    assert registry.route(["tavily", "duckduckgo", "google", "bing"]) == ["google", "bing", "duckduckgo"]
+    assert list(registry.snapshot()) == ["bing", "duckduckgo", "google", "tavily"]
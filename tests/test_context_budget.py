@@ -0,0 +1,46 @@
+from jarvis_context_budget import ContextBudget, estimate_tokens, truncate_to_tokens
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("hi sir") == 2
+    # Long words cost more than one token, punctuation costs one each
+    assert estimate_tokens("internationalization!") == 6
+
+
+def test_pack_prefers_relevance_within_budget():
+    budget = ContextBudget(max_tokens=7)
+    packed = budget.pack([
+        ("low relevance memory text", 0.1),
+        ("best match", 0.9),
+        ("second best one", 0.5),
+    ])
+    assert packed == ["best match", "second best one"]
+    assert budget.used == 7
+
+
+def test_pack_skips_oversized_but_keeps_smaller():
+    budget = ContextBudget(max_tokens=4)
+    packed = budget.pack([("one two three four five", 0.9), ("small", 0.2)])
+    assert packed == ["small"]
+
+
+def test_pack_truncates_when_nothing_fits():
+    budget = ContextBudget(max_tokens=5)
+    packed = budget.pack([("alpha beta gamma delta epsilon zeta", 1.0)])
+    assert len(packed) == 1
+    assert packed[0].endswith("...")
+    assert budget.used <= 5
+
+
+def test_reserve_and_plain_strings():
+    budget = ContextBudget(max_tokens=6)
+    assert budget.reserve("plan step") is True
+    assert budget.reserve("too many words here") is False
+    assert budget.pack(["memory", "other"]) == ["memory", "other"]
+    assert budget.remaining == 0
+
+
+def test_truncate_to_tokens_noop_when_fits():
+    assert truncate_to_tokens("short text", 10) == "short text"
+    assert truncate_to_tokens("short text", 0) == ""
@@ -0,0 +1,147 @@
+import asyncio
+import time
+import pytest
+import httpx
+from unittest.mock import patch
+from jarvis_crawler import (
+    CrawlDisallowedError, CrawlScheduler, RobotsCache, backoff_delay, is_retryable, select_links)
+from jarvis_http import SharedHTTPClient
+
+
+def status_error(status, headers=None):
+    request = httpx.Request("GET", "http://h.test/")
+    response = httpx.Response(status, headers=headers, request=request)
+    return httpx.HTTPStatusError("error", request=request, response=response)
+
+
+def test_backoff_is_exponential_capped_and_jittered():
+    upper = lambda low, high: high  # noqa: E731
+    assert [backoff_delay(a, base=0.5, cap=3, rng=upper) for a in range(4)] == [0.5, 1.0, 2.0, 3]
+    assert 0 <= backoff_delay(5) <= 8
+
+
+def test_only_transient_errors_are_retryable():
+    assert is_retryable(status_error(503))
+    assert is_retryable(status_error(429))
+    assert not is_retryable(status_error(404))
+    assert is_retryable(httpx.ConnectError("down"))
+    assert is_retryable(asyncio.TimeoutError())
+    assert not is_retryable(ValueError("bad"))
+
+
+def test_select_links_prefers_query_words_and_skips_files():
+    links = [("https://a.test/about", "About us"),
+             ("https://a.test/report.pdf", "Solar report PDF"),
+             ("https://a.test/solar-prices", "Prices"),
+             ("https://b.test/news/solar-panels-pakistan", "Solar panels in Pakistan"),
+             ("https://a.test/seen", "Solar")]
+    picked = select_links("solar panels pakistan", links, 2, exclude={"https://a.test/seen"})
+    assert picked == ["https://b.test/news/solar-panels-pakistan", "https://a.test/solar-prices"]
+
+
+@pytest.mark.asyncio
+async def test_global_concurrency_limit():
+    scheduler = CrawlScheduler(concurrency=3, per_host=5, host_delay=0)
+    active, peak = 0, 0
+
+    async def fetch():
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return "ok"
+
+    results = await asyncio.gather(*(scheduler.run(f"http://h{i}.test/", fetch) for i in range(10)))
+    assert results == ["ok"] * 10
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+async def test_per_host_limit_and_politeness_delay():
+    scheduler = CrawlScheduler(concurrency=10, per_host=1, host_delay=0.05)
+    starts = []
+
+    async def fetch():
+        starts.append(time.monotonic())
+        return "ok"
+
+    await asyncio.gather(*(scheduler.run(f"http://same.test/{i}", fetch) for i in range(3)))
+    gaps = [b - a for a, b in zip(starts, starts[1:])]
+    assert all(gap >= 0.045 for gap in gaps)
+
+
+@pytest.mark.asyncio
+async def test_retries_transient_errors_with_backoff_and_retry_after():
+    scheduler = CrawlScheduler(host_delay=0, retries=2)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        if len(calls) == 1:
+            raise status_error(429, {"retry-after": "3"})
+        if len(calls) == 2:
+            raise httpx.ConnectError("reset")
+        return "page"
+
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+
+    with patch("jarvis_crawler.asyncio.sleep", fake_sleep):
+        assert await scheduler.run("http://h.test/", fetch) == "page"
+    assert len(calls) == 3
+    assert sleeps[0] == 3.0
+    assert 0 <= sleeps[1] <= 1.0
+
+
+@pytest.mark.asyncio
+async def test_non_retryable_error_is_raised_immediately():
+    scheduler = CrawlScheduler(host_delay=0)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        raise status_error(404)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await scheduler.run("http://h.test/", fetch)
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_robots_rules_are_cached_and_enforced():
+    robots_requests = []
+
+    def handler(request):
+        robots_requests.append(request.url.host)
+        return httpx.Response(200, text="User-agent: *\nDisallow: /private\nCrawl-delay: 2\n")
+
+    shared = SharedHTTPClient(transport=httpx.MockTransport(handler), http2=False)
+    robots = RobotsCache()
+    scheduler = CrawlScheduler(host_delay=0, robots=robots)
+
+    async def fetch():
+        return "ok"
+
+    with patch("jarvis_crawler.http_client", shared):
+        with pytest.raises(CrawlDisallowedError):
+            await scheduler.run("http://h.test/private/page", fetch)
+        assert await scheduler.run("http://h.test/public", fetch) == "ok"
+        assert await robots.crawl_delay("http://h.test/other") == 2.0
+    await shared.aclose()
+    assert robots_requests == ["h.test"]
+
+
+@pytest.mark.asyncio
+async def test_missing_robots_allows_and_forbidden_robots_blocks():
+    def handler(request):
+        return httpx.Response(404 if request.url.host == "open.test" else 403)
+
+    shared = SharedHTTPClient(transport=httpx.MockTransport(handler), http2=False)
+    robots = RobotsCache()
+    with patch("jarvis_crawler.http_client", shared):
+        assert await robots.allowed("http://open.test/page")
+        assert not await robots.allowed("http://closed.test/page")
+    await shared.aclose()
@@ -0,0 +1,45 @@
+import json
+import pytest
+import httpx
+from unittest.mock import AsyncMock, patch
+from jarvis_circuit import circuit_breakers
+from jarvis_diagnostics import SystemCheck, format_health_report
+from jarvis_search import _guarded_search
+
+KEYED_URL = "https://www.googleapis.com/customsearch/v1?key=SECRETKEY&cx=engine&q=test"
+
+
+@pytest.fixture(autouse=True)
+def fresh_circuits():
+    circuit_breakers.reset()
+    yield
+    circuit_breakers.reset()
+
+
+async def failing_google(query):
+    async with httpx.AsyncClient(transport=httpx.MockTransport(lambda r: httpx.Response(403))) as client:
+        try:
+            (await client.get(KEYED_URL)).raise_for_status()
+        except httpx.HTTPStatusError as e:
+            return {"status": "error", "message": str(e)}
+    return {"status": "success"}
+
+
+@pytest.mark.asyncio
+async def test_diagnostics_never_expose_provider_api_keys():
+    assert "SECRETKEY" in (await failing_google("q"))["message"]
+    await _guarded_search("google", failing_google, "q")
+    breaker = circuit_breakers.get("google")
+    assert "SECRETKEY" not in breaker.snapshot()["last_error"]
+    breaker.record_failure(httpx.HTTPStatusError(
+        "403", request=httpx.Request("GET", KEYED_URL), response=httpx.Response(403)))
+    assert breaker.snapshot()["last_error"] == "HTTPStatusError: HTTP 403"
+
+    check = SystemCheck()
+    with patch.object(check, "check_env_vars", AsyncMock(return_value={})), \
+            patch.object(check, "check_external_dependencies", AsyncMock(return_value={})), \
+            patch.object(check, "check_api_connectivity", AsyncMock(return_value={"Google": "✅"})):
+        report = await check.run_full_diagnostics()
+    assert "SECRETKEY" not in json.dumps(report)
+    assert set(report["provider_circuits"]["google"]) == {"state", "health", "retry_in_s"}
+    assert "google: closed" in format_health_report(report)
@@ -0,0 +1,192 @@
+import asyncio
+import zlib
+import numpy as np
+import pytest
+from unittest.mock import patch
+from chromadb.errors import InvalidArgumentError
+from docx import Document
+import jarvis_doc_text_cache
+from jarvis_doc_chunks import DocumentChunkIndex, chunk_pages
+from jarvis_doc_index import DocumentIndex
+from jarvis_doc_text_cache import DocTextCache
+from jarvis_passages import tokenize
+from jarvis_rag import DocumentRAG
+from test_doc_text_cache import make_pdf
+
+FILLER = ("The committee reviewed general operating matters and routine housekeeping items "
+          "without reaching any notable decisions on the agenda. ")
+
+
+class HashingEmbedder:
+    """Deterministic bag-of-words embedding standing in for MiniLM."""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, texts):
+        self.batches.append(len(texts))
+        vectors = []
+        for text in texts:
+            v = np.zeros(256)
+            for word in tokenize(text):
+                v[zlib.crc32(word.encode()) % 256] += 1.0
+            vectors.append(v / (np.linalg.norm(v) or 1.0))
+        return vectors
+
+
+def make_docx(path, paragraphs):
+    doc = Document()
+    for text in paragraphs:
+        doc.add_paragraph(text)
+    doc.save(path)
+    return str(path)
+
+
+@pytest.fixture(autouse=True)
+def no_process_pool(monkeypatch):
+    monkeypatch.setattr(jarvis_doc_text_cache, "_get_pool", lambda: None)
+
+
+@pytest.fixture
+def text_cache(tmp_path):
+    cache = DocTextCache(str(tmp_path / "doc_text.sqlite3"))
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def embedder():
+    return HashingEmbedder()
+
+
+@pytest.fixture
+def chunks(tmp_path, text_cache, embedder):
+    return DocumentChunkIndex(str(tmp_path / "chroma"), embedding_function=embedder,
+                              text_cache=text_cache)
+
+
+@pytest.fixture
+def report(tmp_path):
+    paragraphs = [FILLER * 6 for _ in range(30)]
+    paragraphs[25] = ("Appendix C: the warranty on the hydraulic pump covers seals and valves "
+                      "for thirty six months from installation.")
+    return make_docx(tmp_path / "report.docx", paragraphs)
+
+
+@pytest.fixture
+def invoice(tmp_path):
+    return make_docx(tmp_path / "invoice.docx", [
+        FILLER * 3, "Invoice 7781: hydraulic pump replacement seals, total due 420 dollars.", FILLER * 3])
+
+
+def test_chunk_pages_keeps_page_numbers():
+    pages = ["a" * 10, "word " * 500]
+    result = chunk_pages(pages, max_chars=1000)
+    assert result[0] == (0, "a" * 10)
+    assert {page for page, _ in result[1:]} == {1}
+    assert all(len(text) <= 1000 for _, text in result)
+
+
+@pytest.mark.asyncio
+async def test_retrieves_late_sections_and_persists_embeddings(tmp_path, chunks, embedder, report):
+    context = await chunks.build_context("How long is the pump warranty?", [report], max_tokens=400)
+    assert "thirty six months" in context
+    assert context.startswith("--- DOCUMENT 1: report.docx ---")
+    assert "[Page" in context
+    assert len(context) < 2000
+    assert max(embedder.batches) <= 32 and len(embedder.batches) > 1
+
+    # A new process reuses the stored chunk embeddings; only the question is embedded
+    embedder.batches.clear()
+    reopened = DocumentChunkIndex(chunks.path, embedding_function=embedder,
+                                  text_cache=chunks.text_cache)
+    context = await reopened.build_context("pump warranty length", [report], max_tokens=400)
+    assert "thirty six months" in context
+    assert embedder.batches == [1]
+
+
+@pytest.mark.asyncio
+async def test_multi_document_questions_cover_every_document(chunks, report, invoice):
+    context = await chunks.build_context("hydraulic pump seals", [report, invoice], max_tokens=600)
+    assert "--- DOCUMENT 1: report.docx ---" in context
+    assert "--- DOCUMENT 2: invoice.docx ---" in context
+    assert "Invoice 7781" in context and "warranty" in context
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_keyword_ranking_without_embedding_model(tmp_path, text_cache, report):
+    index = DocumentChunkIndex(str(tmp_path / "chroma"), text_cache=text_cache)
+    with patch("chromadb.utils.embedding_functions.SentenceTransformerEmbeddingFunction",
+               side_effect=ValueError("sentence_transformers is not installed")):
+        context = await index.build_context("pump warranty", [report], max_tokens=300)
+    assert "thirty six months" in context
+    assert index.collection is None
+
+
+@pytest.mark.asyncio
+async def test_large_documents_are_embedded_in_background(chunks, report, monkeypatch):
+    monkeypatch.setattr("jarvis_doc_chunks.FOREGROUND_EMBED_CHUNKS", 2)
+    context = await chunks.build_context("pump warranty", [report], max_tokens=300)
+    assert "thirty six months" in context
+    await next(iter(chunks._pending.values()))
+    key, _ = await chunks.text_cache.pages(report)
+    assert chunks.is_indexed(key)
+
+
+@pytest.mark.asyncio
+async def test_rag_uses_chunks_for_questions_and_leading_text_for_summaries(tmp_path, chunks, report):
+    rag = DocumentRAG([str(tmp_path)], index=DocumentIndex(str(tmp_path / "index.sqlite3")),
+                      text_cache=chunks.text_cache, chunk_index=chunks)
+    answer = await rag.get_relevant_content([report], "What does the pump warranty cover?")
+    assert "thirty six months" in answer
+    summary = await rag.get_relevant_content([report], "Summarize this document.")
+    assert summary.startswith("The committee reviewed")
+    assert "thirty six months" not in summary
+    rag.index.close()
+
+
+@pytest.mark.asyncio
+async def test_chroma_errors_fall_back_to_leading_text(tmp_path, chunks, report):
+    rag = DocumentRAG([str(tmp_path)], index=DocumentIndex(str(tmp_path / "index.sqlite3")),
+                      text_cache=chunks.text_cache, chunk_index=chunks)
+    mismatch = InvalidArgumentError("Collection expecting embedding with dimension of 256, got 384")
+    with patch.object(chunks, "_query", side_effect=mismatch):
+        answer = await rag.get_relevant_content([report], "What does the pump warranty cover?")
+    assert answer.startswith("The committee reviewed")
+
+    # Background embedding failures are logged, not raised into the pre-extract worker
+    key, pages = await chunks.text_cache.pages(report)
+    with patch.object(chunks, "index_document", side_effect=mismatch):
+        await chunks.on_extracted(report, key, pages)
+    rag.index.close()
+
+
+@pytest.mark.asyncio
+async def test_large_pdf_is_answered_from_leading_pages_first(tmp_path, chunks, monkeypatch):
+    monkeypatch.setattr("jarvis_doc_chunks.MAX_DOCUMENT_CHARS", 3000)
+    pages = [f"Page {n} " + FILLER * 4 for n in range(40)]
+    pages[35] = "The warranty on the hydraulic pump covers seals for thirty six months"
+    pdf = str(tmp_path / "manual.pdf")
+    make_pdf(pdf, pages)
+    rag = DocumentRAG([str(tmp_path)], index=DocumentIndex(str(tmp_path / "index.sqlite3")),
+                      text_cache=chunks.text_cache, chunk_index=chunks)
+    worker = asyncio.create_task(chunks.text_cache.run_worker())
+    await asyncio.sleep(0)
+
+    # The first question only parses the leading pages; the worker does the rest
+    with patch.object(chunks.text_cache, "schedule", wraps=chunks.text_cache.schedule) as schedule:
+        context = await chunks.build_context("pump warranty", [pdf], max_tokens=400)
+    schedule.assert_called_with(pdf)
+    assert "Page 0" in context and "thirty six months" not in context
+    key, _ = await chunks.text_cache.pages(pdf, 3000)
+    assert not chunks.is_indexed(key)
+
+    for _ in range(200):
+        if chunks.is_indexed(key):
+            break
+        await asyncio.sleep(0.02)
+    assert chunks.text_cache.is_complete(key) and chunks.is_indexed(key)
+    assert "thirty six months" in await chunks.build_context("pump warranty", [pdf], max_tokens=400)
+    worker.cancel()
+    await asyncio.gather(worker, return_exceptions=True)
+    rag.index.close()
@@ -0,0 +1,102 @@
+import os
+import shutil
+import time
+import pytest
+from jarvis_doc_index import DocumentIndex
+
+
+def make_tree(root, layout):
+    for rel in layout:
+        path = os.path.join(root, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(b"x")
+
+
+def age_dirs(root, seconds=60):
+    """Backdates directory mtimes so they fall outside the racy window."""
+    past = time.time() - seconds
+    for dirpath, _, _ in os.walk(root):
+        os.utime(dirpath, (past, past))
+
+
+@pytest.fixture
+def index(tmp_path):
+    idx = DocumentIndex(str(tmp_path / "index.sqlite3"))
+    yield idx
+    idx.close()
+
+
+def test_scan_indexes_only_documents(tmp_path, index):
+    docs = tmp_path / "docs"
+    make_tree(docs, ["a/report.pdf", "a/notes.txt", "b/c/Thesis.DOCX", "image.png"])
+    stats = index.scan([str(docs)])
+    assert sorted(os.path.relpath(p, docs) for p in index.files([str(docs)])) == [
+        os.path.join("a", "report.pdf"), os.path.join("b", "c", "Thesis.DOCX")]
+    assert stats["files_added"] == 2
+    assert stats["dirs_scanned"] == 4
+
+
+def test_rescan_skips_unchanged_directories(tmp_path, index):
+    docs = tmp_path / "docs"
+    make_tree(docs, [f"d{i}/file{i}.pdf" for i in range(5)])
+    age_dirs(docs)
+    index.scan([str(docs)])
+    stats = index.scan([str(docs)])
+    assert stats["dirs_scanned"] == 0
+    assert stats["dirs_skipped"] == 6
+
+
+def test_rescan_picks_up_additions_and_removals(tmp_path, index):
+    docs = tmp_path / "docs"
+    make_tree(docs, ["keep/a.pdf", "keep/b.pdf", "gone/sub/c.pdf", "other/d.docx"])
+    age_dirs(docs)
+    index.scan([str(docs)])
+
+    os.remove(docs / "keep" / "b.pdf")
+    make_tree(docs, ["keep/new.docx", "fresh/deep/e.pdf"])
+    shutil.rmtree(docs / "gone")
+
+    stats = index.scan([str(docs)])
+    names = sorted(os.path.basename(p) for p in index.files([str(docs)]))
+    assert names == ["a.pdf", "d.docx", "e.pdf", "new.docx"]
+    assert stats["files_removed"] == 2
+    assert stats["files_added"] == 2
+    # "other" was not touched, so it was not listed again
+    assert stats["dirs_skipped"] >= 1
+
+
+def test_recently_changed_directories_are_rescanned(tmp_path, index):
+    docs = tmp_path / "docs"
+    make_tree(docs, ["a.pdf"])
+    index.scan([str(docs)])
+    # Same-second changes could hide behind an unchanged mtime, so the
+    # fresh directory is listed again
+    assert index.scan([str(docs)])["dirs_scanned"] == 1
+
+
+def test_index_persists_and_separates_roots(tmp_path):
+    first, second = tmp_path / "one", tmp_path / "one-two"
+    make_tree(first, ["x.pdf"])
+    make_tree(second, ["y.pdf"])
+    path = str(tmp_path / "index.sqlite3")
+    idx = DocumentIndex(path)
+    idx.scan([str(first), str(second)])
+    idx.close()
+
+    reopened = DocumentIndex(path)
+    assert [os.path.basename(p) for p in reopened.files([str(first)])] == ["x.pdf"]
+    assert reopened.last_scanned(str(first)) is not None
+    assert reopened.last_scanned(str(tmp_path / "never")) is None
+    reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_refresh_only_rescans_stale_roots(tmp_path, index):
+    docs = tmp_path / "docs"
+    make_tree(docs, ["a.pdf"])
+    assert len(await index.refresh([str(docs)], max_age=300)) == 1
+    make_tree(docs, ["b.pdf"])
+    # Scanned moments ago: the index is served as is
+    assert len(await index.refresh([str(docs)], max_age=300)) == 1
+    assert len(await index.refresh([str(docs)], max_age=0)) == 2
@@ -0,0 +1,157 @@
+import asyncio
+import os
+import time
+import pytest
+from unittest.mock import patch
+from docx import Document
+import jarvis_doc_text_cache
+from jarvis_doc_text_cache import DocTextCache, document_key, extract_pages, extract_pages_async
+from jarvis_doc_index import DocumentIndex
+from jarvis_rag import DocumentRAG
+
+
+def make_pdf(path, pages):
+    """Writes a minimal PDF with one line of Helvetica text per page."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    out += (f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+            f"startxref\n{xref}\n%%EOF\n").encode("latin-1")
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+@pytest.fixture(autouse=True)
+def no_process_pool(monkeypatch):
+    monkeypatch.setattr(jarvis_doc_text_cache, "_get_pool", lambda: None)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    c = DocTextCache(str(tmp_path / "doc_text.sqlite3"))
+    yield c
+    c.close()
+
+
+@pytest.fixture
+def pdf(tmp_path):
+    path = str(tmp_path / "manual.pdf")
+    make_pdf(path, [f"Page {n} of the pump manual" for n in range(1, 6)])
+    return path
+
+
+def test_extract_pages_stops_at_max_chars(pdf, tmp_path):
+    pages, complete = extract_pages(pdf)
+    assert complete and len(pages) == 5
+    assert "Page 3 of the pump manual" in pages[2]
+    pages, complete = extract_pages(pdf, max_chars=40)
+    assert not complete and len(pages) == 2
+
+    doc = Document()
+    for n in range(100):
+        doc.add_paragraph(f"Paragraph {n} " + "x" * 80)
+    docx_path = str(tmp_path / "notes.docx")
+    doc.save(docx_path)
+    sections, complete = extract_pages(docx_path)
+    assert complete and len(sections) > 1
+    assert all(len(s) <= jarvis_doc_text_cache.DOCX_SECTION_CHARS + 100 for s in sections)
+    assert "\n".join(sections).splitlines()[99].startswith("Paragraph 99")
+
+
+@pytest.mark.asyncio
+async def test_repeat_reads_skip_parsing(cache, pdf):
+    first = await cache.text(pdf, max_chars=None)
+    with patch("jarvis_doc_text_cache.extract_pages_async") as extract:
+        assert await cache.text(pdf, max_chars=None) == first
+        assert await cache.text(pdf, max_chars=30) == first[:30]
+    extract.assert_not_called()
+
+    # An edited file is a new version: parsed again, the old text dropped
+    make_pdf(pdf, ["Revised manual"])
+    os.utime(pdf, (time.time() + 5, time.time() + 5))
+    assert "Revised manual" in await cache.text(pdf, max_chars=None)
+    assert cache.recent_paths() == [pdf]
+    assert cache._db().execute("SELECT COUNT(*) FROM docs").fetchone()[0] == 1
+
+
+@pytest.mark.asyncio
+async def test_partial_extraction_is_completed_by_worker(cache, pdf):
+    text = await cache.text(pdf, max_chars=40)
+    assert len(text) == 40
+    stat = os.stat(pdf)
+    key = document_key(pdf, stat.st_size, stat.st_mtime)
+    assert not cache.is_complete(key)
+    assert cache.get(key, max_chars=200) is None
+
+    worker = asyncio.create_task(cache.run_worker())
+    await asyncio.sleep(0)
+    # The partly cached document is picked up from the recently used list
+    for _ in range(100):
+        if cache.is_complete(key):
+            break
+        await asyncio.sleep(0.02)
+    assert "Page 5" in cache.get(key)
+
+    other = pdf.replace("manual", "invoice")
+    make_pdf(other, ["Invoice total 42"])
+    assert cache.schedule(other)
+    for _ in range(100):
+        if cache.recent_paths()[0] == other:
+            break
+        await asyncio.sleep(0.02)
+    assert cache.recent_paths()[0] == other
+    worker.cancel()
+    await asyncio.gather(worker, return_exceptions=True)
+    assert not cache.schedule(other)
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = DocTextCache(str(tmp_path / "doc_text.sqlite3"), max_bytes=600)
+    for n in range(5):
+        cache.put(f"key{n}", f"/docs/{n}.pdf", [os.urandom(150).hex()], True)
+    assert cache.get("key0") is None
+    assert cache.get("key4") is not None
+    assert cache._total_bytes <= 600
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_extraction_runs_in_worker_process(pdf, monkeypatch):
+    monkeypatch.undo()
+    try:
+        pages, complete = await extract_pages_async(pdf)
+    finally:
+        jarvis_doc_text_cache.shutdown_doc_extract_pool()
+    assert complete and "Page 1" in pages[0]
+
+
+@pytest.mark.asyncio
+async def test_rag_reads_documents_through_cache(tmp_path, cache, pdf):
+    index = DocumentIndex(str(tmp_path / "index.sqlite3"))
+    rag = DocumentRAG([str(tmp_path)], index=index, text_cache=cache)
+    assert "Page 2" in await rag.get_document_content(pdf, 60)
+    broken = str(tmp_path / "broken.pdf")
+    with open(broken, "wb") as f:
+        f.write(b"not a pdf")
+    assert (await rag.get_document_content(broken)).startswith("Error reading PDF")
+    assert await rag.get_document_content(str(tmp_path / "a.txt")) == "Unsupported file format."
+    # Documents saved while watched are queued for pre-extraction
+    with patch.object(cache, "schedule") as schedule:
+        index.apply_events([("created", pdf, None, False), ("created", broken + ".txt", None, False)])
+    schedule.assert_called_once_with(pdf)
+    index.close()
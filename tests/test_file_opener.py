@@ -0,0 +1,70 @@
+import os
+import sys
+import time
+import pytest
+from unittest.mock import patch
+from jarvis_fs_watcher import IndexWatcher, normalize_path
+
+try:
+    import pygetwindow  # noqa: F401  pylint: disable=unused-import
+except NotImplementedError:
+    # PyGetWindow refuses to import off Windows; the opener then runs without it
+    sys.modules["pygetwindow"] = None
+
+from Jarvis_file_opener import FileIndex  # noqa: E402  pylint: disable=wrong-import-position
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return condition()
+
+
+@pytest.fixture
+def watcher():
+    w = IndexWatcher(batch_delay=0.05, reconcile_interval=3600)
+    yield w
+    w.stop()
+
+
+@pytest.fixture
+def docs(tmp_path):
+    root = tmp_path / "docs"
+    (root / "a").mkdir(parents=True)
+    (root / "a" / "report.pdf").write_bytes(b"%PDF")
+    return normalize_path(str(root))
+
+
+def test_file_index_replays_events_seen_during_walk(tmp_path, docs, watcher):
+    index = FileIndex(watcher)
+    index._walk([docs])
+    late = os.path.join(docs, "a", "late.mp3")
+    with open(late, "wb"):
+        pass
+    index._replay = []
+    index.apply_events([("created", late, None, False)])
+    # A walk that listed the folder before the file existed must not lose it
+    index._items.pop(late)
+    index._walk([docs])
+    assert late in {item["path"] for item in index.items()}
+
+    index.apply_events([("deleted", os.path.join(docs, "a"), None, True)])
+    assert index.items() == []
+
+
+@pytest.mark.asyncio
+async def test_file_index_stays_live_without_walking(docs, watcher):
+    index = FileIndex(watcher)
+    await index.refresh([docs])
+    added = os.path.join(docs, "a", "song.mp3")
+    with open(added, "wb"):
+        pass
+    assert wait_until(lambda: added in {i["path"] for i in index.items()})
+    os.rename(added, os.path.join(docs, "song-final.mp3"))
+    assert wait_until(lambda: {i["name"] for i in index.items()} == {"report.pdf", "song-final.mp3"})
+    with patch("Jarvis_file_opener._walk_dir") as walk:
+        await index.refresh([docs])
+    walk.assert_not_called()
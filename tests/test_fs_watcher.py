@@ -0,0 +1,91 @@
+import os
+import time
+import pytest
+from jarvis_doc_index import DocumentIndex
+from jarvis_fs_watcher import IndexWatcher, normalize_path
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return condition()
+
+
+@pytest.fixture
+def watcher():
+    w = IndexWatcher(batch_delay=0.05, reconcile_interval=3600)
+    yield w
+    w.stop()
+
+
+@pytest.fixture
+def docs(tmp_path):
+    root = tmp_path / "docs"
+    (root / "a").mkdir(parents=True)
+    (root / "a" / "report.pdf").write_bytes(b"%PDF")
+    return normalize_path(str(root))
+
+
+def test_doc_index_applies_create_delete_and_move_events(tmp_path, docs):
+    index = DocumentIndex(str(tmp_path / "index.sqlite3"))
+    index.scan([docs])
+    new = os.path.join(docs, "a", "thesis.docx")
+    with open(new, "wb") as f:
+        f.write(b"PK")
+    os.makedirs(os.path.join(docs, "b"))
+    nested = os.path.join(docs, "b", "plan.pdf")
+    with open(nested, "wb") as f:
+        f.write(b"%PDF")
+    index.apply_events([("created", new, None, False),
+                        ("created", os.path.join(docs, "b"), None, True),
+                        ("created", os.path.join(docs, "a", "notes.txt"), None, False)])
+    assert sorted(index.files([docs])) == sorted([
+        os.path.join(docs, "a", "report.pdf"), new, nested])
+
+    os.rename(os.path.join(docs, "b"), os.path.join(docs, "c"))
+    os.remove(new)
+    index.apply_events([("moved", os.path.join(docs, "b"), os.path.join(docs, "c"), True),
+                        ("deleted", new, None, False)])
+    assert sorted(index.files([docs])) == sorted([
+        os.path.join(docs, "a", "report.pdf"), os.path.join(docs, "c", "plan.pdf")])
+    # A reconciliation rescan agrees with the event-maintained index
+    stats = index.scan([docs])
+    assert stats["files_added"] == 0 and stats["files_removed"] == 0
+    index.close()
+
+
+def test_index_max_age_forces_one_scan_after_watching(tmp_path, docs, watcher):
+    index = DocumentIndex(str(tmp_path / "index.sqlite3"))
+    assert watcher.index_max_age([docs], index, ttl=300) < 1.0
+    assert watcher.is_watching(docs)
+    time.sleep(0.05)
+    assert watcher.index_max_age([docs], index, ttl=300) > 0.0
+    assert watcher.index_max_age(["/no/such/dir"], index, ttl=300) == 3600
+    watcher.stop()
+    assert not watcher.is_watching(docs)
+    index.close()
+
+
+@pytest.mark.asyncio
+async def test_watched_indexes_update_live_without_rescans(tmp_path, docs, watcher):
+    doc_index = DocumentIndex(str(tmp_path / "index.sqlite3"))
+    max_age = watcher.index_max_age([docs], doc_index, ttl=300)
+    await doc_index.refresh([docs], max_age=max_age)
+    scanned_at = doc_index.last_scanned(docs)
+
+    added = os.path.join(docs, "a", "minutes.pdf")
+    with open(added, "wb") as f:
+        f.write(b"%PDF")
+    assert wait_until(lambda: added in doc_index.files([docs]))
+
+    moved = os.path.join(docs, "a", "minutes-final.pdf")
+    os.rename(added, moved)
+    assert wait_until(lambda: moved in doc_index.files([docs]) and added not in doc_index.files([docs]))
+
+    max_age = watcher.index_max_age([docs], doc_index, ttl=300)
+    await doc_index.refresh([docs], max_age=max_age)
+    assert doc_index.last_scanned(docs) == scanned_at
+    doc_index.close()
@@ -1,7 +1,20 @@
 import pytest
 import asyncio
 from unittest.mock import AsyncMock, patch, MagicMock
-from jarvis_get_weather import get_weather, get_weather_via_search
+from jarvis_get_weather import (WEATHER_PREFETCH_INTERVAL, WEATHER_TTL, get_weather,
+                                get_weather_via_search, weather_cache)
+
+
+@pytest.fixture(autouse=True)
+def clear_weather_cache():
+    from jarvis_circuit import circuit_breakers
+    from jarvis_ratelimit import rate_limits
+    weather_cache.clear()
+    circuit_breakers.reset()
+    rate_limits.reset()
+    yield
+    weather_cache.clear()
+
 
 @pytest.mark.asyncio
 async def test_get_weather_success():
@@ -14,7 +27,7 @@ async def test_get_weather_success():
     }
     
     with patch("os.getenv", side_effect=lambda k, d=None: "test_key" if "API_KEY" in k or "CITY" in k else d):
-        with patch("requests.get", return_value=mock_response):
+        with patch("jarvis_get_weather.http_client.get", new_callable=AsyncMock, return_value=mock_response):
             result = await get_weather("London")
             assert isinstance(result, dict)
             assert result["status"] == "success"
@@ -30,7 +43,7 @@ async def test_get_weather_api_failure_search_fallback():
     mock_search_result = {"status": "success", "message": "Search Weather Info"}
     
     with patch("os.getenv", side_effect=lambda k, d=None: "test_key" if "API_KEY" in k else d):
-        with patch("requests.get", return_value=mock_response):
+        with patch("jarvis_get_weather.http_client.get", new_callable=AsyncMock, return_value=mock_response):
             with patch("jarvis_get_weather.search_internet", new_callable=AsyncMock) as mock_search:
                 mock_search.return_value = mock_search_result
                 result = await get_weather("London")
@@ -52,3 +65,105 @@ async def test_get_weather_via_search_success():
         result = await get_weather_via_search("London")
         assert result["status"] == "success"
         assert "Sunny 20C" in result["message"]
+
+@pytest.mark.asyncio
+async def test_get_weather_quota_opens_circuit():
+    from jarvis_circuit import circuit_breakers
+    circuit_breakers.reset()
+    mock_response = MagicMock()
+    mock_response.status_code = 429
+
+    with patch("os.getenv", side_effect=lambda k, d=None: "test_key" if "API_KEY" in k else d):
+        with patch("jarvis_get_weather.http_client.get", new_callable=AsyncMock,
+                   return_value=mock_response) as mock_get:
+            with patch("jarvis_get_weather.search_internet", new_callable=AsyncMock,
+                       return_value={"status": "success", "message": "Search Weather Info"}):
+                await get_weather("London")
+                result = await get_weather("London")
+    assert mock_get.await_count == 1
+    assert "Search Weather Info" in result["message"]
+    circuit_breakers.reset()
+
+
+def weather_response(city_temp=25):
+    response = MagicMock()
+    response.status_code = 200
+    response.json.return_value = {
+        "weather": [{"description": "clear sky"}],
+        "main": {"temp": city_temp, "humidity": 40},
+        "wind": {"speed": 3}
+    }
+    return response
+
+
+@pytest.mark.asyncio
+async def test_get_weather_answers_from_cache():
+    with patch("os.getenv", side_effect=lambda k, d=None: "test_key" if "API_KEY" in k else d):
+        with patch("jarvis_get_weather.http_client.get", new_callable=AsyncMock,
+                   return_value=weather_response()) as mock_get:
+            first = await get_weather("Lahore")
+            second = await get_weather("lahore ")
+    assert first is second
+    assert mock_get.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_get_weather_serves_stale_when_api_down():
+    weather_cache.put("current", "Lahore", {"status": "success", "message": "old", "temperature": 30})
+    weather_cache.ttl = 0
+    try:
+        failing = MagicMock(status_code=500)
+        with patch("os.getenv", side_effect=lambda k, d=None: "test_key" if "API_KEY" in k else d):
+            with patch("jarvis_get_weather.http_client.get", new_callable=AsyncMock,
+                       return_value=failing):
+                result = await get_weather("Lahore")
+    finally:
+        weather_cache.ttl = WEATHER_TTL
+    assert result["stale"] is True
+    assert result["temperature"] == 30
+
+
+@pytest.mark.asyncio
+async def test_fetch_weather_many_and_forecast():
+    from jarvis_get_weather import fetch_weather_many, get_weather_forecast
+    forecast = MagicMock(status_code=200)
+    forecast.json.return_value = {"list": [
+        {"dt_txt": "2026-01-01 12:00:00", "main": {"temp": 20},
+         "weather": [{"description": "rain"}], "pop": 0.8},
+        {"dt_txt": "2026-01-01 15:00:00", "main": {"temp": 24},
+         "weather": [{"description": "clouds"}], "pop": 0.1},
+    ]}
+
+    async def fake_get(url, **kwargs):
+        return forecast if url.endswith("/forecast") else weather_response()
+
+    with patch("os.getenv", side_effect=lambda k, d=None: "test_key" if "API_KEY" in k else d):
+        with patch("jarvis_get_weather.http_client.get", new_callable=AsyncMock,
+                   side_effect=fake_get) as mock_get:
+            fetched = await fetch_weather_many(["Lahore", "Karachi", "lahore"], include_forecast=True)
+            assert set(fetched) == {"Lahore", "Karachi"}
+            assert mock_get.await_count == 4
+
+            result = await get_weather_forecast("Karachi")
+            assert mock_get.await_count == 4
+    assert result["rain_chance"] == 80
+    assert result["min_temperature"] == 20 and result["max_temperature"] == 24
+
+
+@pytest.mark.asyncio
+async def test_weather_prefetch_loop_warms_home_city():
+    from agent_loops import start_weather_prefetch_loop
+    with patch("os.getenv", side_effect=lambda k, d=None: "test_key" if "API_KEY" in k else d):
+        with patch("jarvis_get_weather.get_current_city", new_callable=AsyncMock, return_value="Multan"), \
+                patch("jarvis_get_weather.http_client.get", new_callable=AsyncMock,
+                      return_value=weather_response()):
+            task = asyncio.create_task(start_weather_prefetch_loop(interval=60))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            await task
+    assert weather_cache.get("current", "multan")["city"] == "Multan"
+
+
+def test_prefetched_weather_outlives_prefetch_interval():
+    assert weather_cache.ttl == WEATHER_TTL
+    assert WEATHER_TTL > WEATHER_PREFETCH_INTERVAL
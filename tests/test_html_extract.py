@@ -0,0 +1,113 @@
+import pytest
+from unittest.mock import patch
+import jarvis_html_extract
+from jarvis_html_extract import (VisibleTextParser, available_backends, extract_links,
+                                 extract_text, extract_text_async, resolve_backend,
+                                 shutdown_extract_pool)
+
+ARTICLE = " ".join(["The quick brown fox jumps over the lazy dog."] * 8)
+
+PAGE = f"""<html><head><title>Fox News</title><style>p {{color: red}}</style>
+<script>var s = '</p>not text';</script></head>
+<body>
+<nav><a href="/">Home</a> <a href="/about">About</a></nav>
+<div id="cookie-banner">We use cookies. <button>Accept</button></div>
+<div class="share-buttons">Share on Twitter</div>
+<main><h1>Fox report</h1><p>{ARTICLE}</p><p>Second &amp; <b>final</b> paragraph.</p></main>
+<aside>Related stories</aside>
+<footer>Copyright 2026</footer>
+</body></html>"""
+
+DOM_BACKENDS = [name for name in available_backends() if name != "stream"]
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_backends_drop_boilerplate(backend):
+    text = extract_text(PAGE, backend=backend)
+    assert "Fox report" in text
+    assert ARTICLE in text
+    assert "Second & final paragraph." in text
+    for noise in ("Home", "cookies", "Share on", "Related", "Copyright", "not text", "color"):
+        assert noise not in text
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_state_classes_on_page_containers_keep_content(backend):
+    html = (PAGE.replace("<html>", '<html class="modal-open">')
+            .replace("<body>", '<body class="single has-sidebar">')
+            .replace("<main>", '<main id="main" class="no-sidebar">'))
+    text = extract_text(html, backend=backend)
+    assert ARTICLE in text
+    assert "Share on" not in text
+    nested = f'<body><div class="container has-sidebar"><p>{ARTICLE}</p></div></body>'
+    assert ARTICLE in extract_text(nested, backend=backend)
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_xhtml_with_xml_declaration(backend):
+    xhtml = '<?xml version="1.0" encoding="UTF-8"?>\n' + PAGE.replace(
+        "<html>", '<html xmlns="http://www.w3.org/1999/xhtml">')
+    assert ARTICLE in extract_text(xhtml, backend=backend)
+
+
+def test_lxml_parse_failure_falls_back_to_html_parser():
+    pytest.importorskip("lxml")
+    with patch("lxml.html.document_fromstring", side_effect=ValueError("bad page")):
+        assert ARTICLE in extract_text(PAGE, backend="lxml")
+
+
+@pytest.mark.parametrize("backend", DOM_BACKENDS)
+def test_dom_backends_prefer_main_content(backend):
+    text = extract_text(PAGE, backend=backend)
+    assert text.splitlines()[0] == "Fox report"
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_boilerplate_can_be_kept_and_text_is_capped(backend):
+    text = extract_text(PAGE, backend=backend, remove_boilerplate=False)
+    assert "Copyright 2026" in text
+    assert len(extract_text(PAGE, backend=backend, max_chars=30)) <= 30
+
+
+def test_stream_parser_self_closing_and_void_tags():
+    parser = VisibleTextParser(remove_boilerplate=True)
+    parser.feed("<p>one<br/>two</p><svg/><input class='cookie'><p>three</p>")
+    assert parser.text() == "one\ntwo\nthree"
+
+
+def test_parser_reports_full_and_ignores_later_text():
+    parser = VisibleTextParser(max_chars=20)
+    parser.feed("<p>" + "word " * 10 + "</p>")
+    assert parser.full
+    parser.feed("<p>ignored</p>")
+    assert "ignored" not in parser.text()
+
+
+def test_extract_links_skips_boilerplate_and_resolves_urls():
+    html = PAGE.replace("<h1>Fox report</h1>",
+                        "<h1>Fox report</h1><a href='story#top'>Full <b>story</b></a>"
+                        "<a href='https://other.test/x'>Other</a><a href='mailto:a@b.c'>Mail</a>"
+                        "<a href='/news/story'>Again</a>")
+    assert extract_links(html, "https://site.test/news/") == [
+        ("https://site.test/news/story", "Full story"), ("https://other.test/x", "Other")]
+    assert extract_links(html, "https://site.test/news/", limit=1) == [
+        ("https://site.test/news/story", "Full story")]
+
+
+def test_resolve_backend_falls_back_when_missing():
+    assert resolve_backend("html.parser") == "html.parser"
+    with patch("jarvis_html_extract.importlib.util.find_spec", return_value=None):
+        assert resolve_backend("lxml") == "stream"
+    assert resolve_backend("auto") in available_backends()
+
+
+@pytest.mark.asyncio
+async def test_extract_text_async_uses_pool_and_thread():
+    try:
+        assert "Fox report" in await extract_text_async(PAGE, backend="html.parser")
+        assert jarvis_html_extract._pool is not None
+    finally:
+        shutdown_extract_pool()
+    with patch("jarvis_html_extract.EXTRACT_WORKERS", 0):
+        assert "Fox report" in await extract_text_async(PAGE)
+    assert await extract_text_async("") == ""
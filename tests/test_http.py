@@ -0,0 +1,75 @@
+import pytest
+import asyncio
+import httpx
+from jarvis_http import SharedHTTPClient
+
+
+def make_client(handler, **kwargs):
+    return SharedHTTPClient(transport=httpx.MockTransport(handler), http2=False, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_client_is_reused_until_closed():
+    shared = make_client(lambda request: httpx.Response(200, json={"ok": True}))
+    first = shared.client
+    response = await shared.get("http://example.test/a")
+    assert response.json() == {"ok": True}
+    assert shared.client is first
+
+    await shared.aclose()
+    assert first.is_closed
+    assert shared.client is not first
+    await shared.aclose()
+
+
+@pytest.mark.asyncio
+async def test_requests_send_default_headers_and_methods():
+    seen = []
+
+    def handler(request):
+        seen.append((request.method, request.headers.get("user-agent")))
+        return httpx.Response(204)
+
+    shared = make_client(handler)
+    await shared.post("http://example.test/p", json={"a": 1})
+    await shared.head("http://example.test/h")
+    assert [m for m, _ in seen] == ["POST", "HEAD"]
+    assert all("Mozilla" in agent for _, agent in seen)
+    await shared.aclose()
+
+
+@pytest.mark.asyncio
+async def test_per_host_limit():
+    active = {"now": 0, "peak": 0}
+
+    class SlowTransport(httpx.AsyncBaseTransport):
+        async def handle_async_request(self, request):
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+            await asyncio.sleep(0.01)
+            active["now"] -= 1
+            return httpx.Response(200)
+
+    shared = SharedHTTPClient(transport=SlowTransport(), http2=False, per_host_limit=2)
+    await asyncio.gather(*(shared.get("http://one.test/") for _ in range(6)))
+    assert active["peak"] == 2
+    await shared.aclose()
+
+
+@pytest.mark.asyncio
+async def test_per_host_limit_holds_for_open_streams():
+    open_streams = {"now": 0, "peak": 0}
+    shared = make_client(lambda request: httpx.Response(200, content=b"body"), per_host_limit=2)
+
+    async def read_slowly():
+        async with shared.stream("GET", "http://one.test/page") as response:
+            open_streams["now"] += 1
+            open_streams["peak"] = max(open_streams["peak"], open_streams["now"])
+            await asyncio.sleep(0.01)
+            body = await response.aread()
+            open_streams["now"] -= 1
+            return body
+
+    assert await asyncio.gather(*(read_slowly() for _ in range(6))) == [b"body"] * 6
+    assert open_streams["peak"] == 2
+    await shared.aclose()
@@ -1,7 +1,6 @@
 import pytest
 import os
-import requests
-from unittest.mock import MagicMock, patch, mock_open
+from unittest.mock import AsyncMock, MagicMock, patch, mock_open
 from jarvis_image_gen import (
     generate_via_hf,
     generate_via_pollinations,
@@ -17,8 +16,9 @@ def mock_hf_client():
 
 
 @pytest.fixture
-def mock_requests():
-    with patch("jarvis_image_gen.requests") as mock:
+def mock_http():
+    with patch("jarvis_image_gen.http_client") as mock:
+        mock.get = AsyncMock()
         yield mock
 
 
@@ -41,38 +41,42 @@ def test_generate_via_hf_no_token():
         assert res is None
 
 
-def test_generate_via_pollinations_success(mock_requests):
+@pytest.mark.asyncio
+async def test_generate_via_pollinations_success(mock_http):
     mock_resp = MagicMock()
     mock_resp.status_code = 200
     mock_resp.content = b'\x89PNG\r\n\x1a\n'  # Valid PNG header
-    mock_requests.get.return_value = mock_resp
-    mock_requests.utils.quote = requests.utils.quote
+    mock_http.get.return_value = mock_resp
 
     with patch("os.makedirs"):
         with patch("builtins.open", mock_open()):
             with patch("os.startfile"):
-                res = generate_via_pollinations("test prompt")
+                res = await generate_via_pollinations("test prompt")
                 assert "Success" in res
 
 
-def test_generate_image_hf_first(mock_hf_client):
+@pytest.mark.asyncio
+async def test_generate_image_hf_first(mock_hf_client):
     with patch("jarvis_image_gen.generate_via_hf", return_value="Success HF"):
-        res = generate_image("test prompt")
+        res = await generate_image("test prompt")
         assert res['status'] == "success"
         assert "Success HF" in res['message']
 
 
-def test_generate_image_fallback_poll(mock_hf_client):
+@pytest.mark.asyncio
+async def test_generate_image_fallback_poll(mock_hf_client):
     with patch("jarvis_image_gen.generate_via_hf", return_value=None):
-        with patch("jarvis_image_gen.generate_via_pollinations", return_value="Success Poll"):
-            res = generate_image("test prompt")
+        with patch("jarvis_image_gen.generate_via_pollinations", new_callable=AsyncMock,
+                   return_value="Success Poll"):
+            res = await generate_image("test prompt")
             assert res['status'] == "success"
             assert "Success Poll" in res['message']
 
 
 @pytest.mark.asyncio
 async def test_tool_generate_image():
-    with patch("jarvis_image_gen.generate_image", return_value={"status": "success", "message": "Done"}) as mock_gen:
+    with patch("jarvis_image_gen.generate_image", new_callable=AsyncMock,
+               return_value={"status": "success", "message": "Done"}) as mock_gen:
         res = await tool_generate_image("test")
         assert res['status'] == "success"
         mock_gen.assert_called_once_with("test")
@@ -0,0 +1,73 @@
+import pytest
+from unittest.mock import patch
+from jarvis_intent_model import HashedNgramVectorizer, LinearIntentModel, load_intent_classifier
+from jarvis_reasoning import IntentAnalyzer
+
+TEXTS = [
+    "aaj mausam kaisa hai", "weather batao", "barish hogi kya", "temperature kitna hai",
+    "youtube pe gana chalao", "video play karo", "song play karo", "youtube kholo",
+    "theek hai", "shukriya", "ok cool", "bas aise hi"
+]
+TARGETS = [["weather_query"]] * 4 + [["youtube_control"]] * 4 + [[]] * 4
+
+
+@pytest.fixture(scope="module")
+def model():
+    return LinearIntentModel(["weather_query", "youtube_control"]).fit(TEXTS, TARGETS, epochs=200)
+
+
+def test_vectorizer_is_deterministic():
+    vec = HashedNgramVectorizer(n_features=1024)
+    rows, cols, vals = vec.transform(["hello jarvis", ""])
+    rows2, cols2, _ = HashedNgramVectorizer(n_features=1024).transform(["hello jarvis", ""])
+    assert list(cols) == list(cols2)
+    assert set(rows) == {0}
+    assert cols.max() < 1024
+    assert vals.shape == cols.shape
+
+
+def test_predict_many_batches(model):
+    results = model.predict_many(["mausam kaisa hai", "youtube pe video chalao", "theek hai"])
+    assert list(results[0]) == ["weather_query"]
+    assert list(results[1]) == ["youtube_control"]
+    assert results[2] == {}
+    assert model.predict_many([]) == []
+
+
+def test_save_load_roundtrip(model, tmp_path):
+    path = str(tmp_path / "intent.npz")
+    model.save(path)
+    loaded = LinearIntentModel.load(path)
+    assert loaded.labels == model.labels
+    assert loaded.predict_many(TEXTS) == model.predict_many(TEXTS)
+
+
+def test_linear_backend_keeps_schema(model):
+    analyzer = IntentAnalyzer(backend="linear")
+    analyzer._classifier = model
+    result = analyzer.analyze_intent("aaj mausam kaisa hai")
+    regex_result = IntentAnalyzer(backend="regex").analyze_intent("aaj mausam kaisa hai")
+    assert set(result) == set(regex_result)
+    assert result["primary_intent"] == "weather_query"
+    assert result["all_intents"] == ["weather_query"]
+
+    batch = analyzer.analyze_many(["theek hai", "song play karo"])
+    assert [r["primary_intent"] for r in batch] == ["general", "youtube_control"]
+
+
+def test_missing_model_falls_back_to_regex():
+    analyzer = IntentAnalyzer(backend="linear")
+    with patch("jarvis_reasoning.load_intent_classifier", return_value=None):
+        result = analyzer.analyze_intent("weather kaisa hai")
+    assert analyzer.backend == "regex"
+    assert result["primary_intent"] == "weather_query"
+
+
+def test_load_intent_classifier_never_trains_on_live_path(tmp_path):
+    path = str(tmp_path / "models" / "intent.npz")
+    with patch("jarvis_intent_model.train_from_file") as train:
+        assert load_intent_classifier(path) is None
+    train.assert_not_called()
+
+    LinearIntentModel(["greeting"]).save(path)
+    assert load_intent_classifier(path).labels == ["greeting"]
@@ -0,0 +1,73 @@
+import pytest
+import asyncio
+import json
+import time
+from unittest.mock import AsyncMock, patch
+from jarvis_location import LocationCache
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "location.json")
+
+
+def write_entry(path, city, age):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"city": city, "fetched_at": time.time() - age}, f)
+
+
+@pytest.mark.asyncio
+async def test_fresh_entry_is_served_without_lookup(cache_path):
+    write_entry(cache_path, "Karachi", age=60)
+    fetch = AsyncMock(return_value="Lahore")
+    assert await LocationCache(cache_path, ttl=3600).get(fetch) == "Karachi"
+    fetch.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_is_served_and_refreshed(cache_path):
+    write_entry(cache_path, "Karachi", age=7200)
+    fetch = AsyncMock(return_value="Islamabad")
+    cache = LocationCache(cache_path, ttl=3600)
+    assert await cache.get(fetch) == "Karachi"
+    await cache.refresh(fetch)
+    fetch.assert_awaited_once()
+    assert cache.is_fresh
+    # Persisted for the next start
+    assert LocationCache(cache_path).city == "Islamabad"
+
+
+@pytest.mark.asyncio
+async def test_empty_cache_does_not_block_when_not_waiting(cache_path):
+    started = asyncio.Event()
+
+    async def slow_fetch():
+        started.set()
+        await asyncio.sleep(0.05)
+        return "Multan"
+
+    cache = LocationCache(cache_path)
+    assert await cache.get(slow_fetch, wait=False) is None
+    await started.wait()
+    assert await cache.get(slow_fetch) == "Multan"
+
+
+@pytest.mark.asyncio
+async def test_failed_lookup_keeps_old_city(cache_path):
+    write_entry(cache_path, "Karachi", age=7200)
+    cache = LocationCache(cache_path, ttl=3600)
+    await cache.refresh(AsyncMock(return_value=None))
+    assert cache.city == "Karachi"
+    assert not cache.is_fresh
+
+
+@pytest.mark.asyncio
+async def test_get_current_city_no_wait_uses_default(tmp_path):
+    from jarvis_search import get_current_city
+    cache = LocationCache(str(tmp_path / "location.json"))
+    with patch("jarvis_search.location_cache", cache), \
+            patch("os.getenv", side_effect=lambda k, d=None: d), \
+            patch("jarvis_search.detect_city_via_ip", AsyncMock(return_value="Quetta")):
+        assert await get_current_city(wait=False) == "Lahore"
+        await asyncio.sleep(0.01)
+        assert await get_current_city(wait=False) == "Quetta"
@@ -0,0 +1,58 @@
+import random
+import re
+from jarvis_matcher import MultiPatternMatcher
+
+
+def test_literal_and_sequence_rules():
+    matcher = MultiPatternMatcher({
+        "code": [r"code.*likh", r"python"],
+        "greeting": [r"hello", r"hi", r"good.*morning"]
+    })
+    assert matcher.match("Python code likh do") == {"code": 2}
+    # "hi" is a plain substring rule, so it also matches inside "this"
+    assert matcher.match("this is it") == {"greeting": 1}
+    assert matcher.match("morning good") == {}
+    assert matcher.match("") == {}
+
+
+def test_prefix_atoms_share_a_position():
+    matcher = MultiPatternMatcher({"q": [r"how.*to"], "g": [r"kaise.*ho"]})
+    # "ho" is a prefix of "how"; both must be detected at the same offset
+    assert matcher.match("kaise how to") == {"q": 1, "g": 1}
+
+
+def test_word_boundaries():
+    matcher = MultiPatternMatcher({"jarvis": [r"\bjarvis\b"], "anna": [r"\banna\b"]})
+    assert matcher.match("Hey JARVIS, sun") == {"jarvis": 1}
+    assert matcher.match("jarvisx annabel") == {}
+    assert matcher.matched_labels("anna and jarvis") == ["jarvis", "anna"]
+
+
+def test_sequence_does_not_cross_newlines():
+    matcher = MultiPatternMatcher({"w": [r"research.*report"]})
+    assert matcher.match("research\nreport") == {}
+    assert matcher.match("x\nresearch the report") == {"w": 1}
+
+
+def test_unsupported_syntax_falls_back_to_regex():
+    matcher = MultiPatternMatcher({"num": [r"\d{3}"], "word": [r"abc"]})
+    assert matcher.match("abc 123") == {"num": 1, "word": 1}
+
+
+def test_matches_re_search_semantics():
+    groups = {
+        "a": [r"code.*likh", r"hi", r"ho", r"how.*to", r"why.*"],
+        "b": [r"\bjaan\b", r"don't", r"\bho.*kar\b", r"kar"],
+    }
+    matcher = MultiPatternMatcher(groups)
+    vocab = ["code", "likh", "hi", "ho", "how", "to", "why", "jaan", "don't",
+             "kar", "x", "_", "\n", " ", "jaanx"]
+    rnd = random.Random(3)
+    for _ in range(2000):
+        text = "".join(rnd.choice(vocab) for _ in range(rnd.randint(0, 8)))
+        expected = {}
+        for label, patterns in groups.items():
+            hits = sum(1 for p in patterns if re.search(p, text.lower()))
+            if hits:
+                expected[label] = hits
+        assert matcher.match(text) == expected, text
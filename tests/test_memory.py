@@ -40,6 +40,18 @@ def test_vector_memory_search(mock_chroma):
     results = vm.query_memory("query")
     assert results == ["result 1"]
 
+
+def test_vector_memory_search_with_scores(mock_chroma):
+    mock_client, mock_collection = mock_chroma
+    mock_collection.query.return_value = {
+        "documents": [["close", "far"]], "distances": [[0.0, 3.0]]}
+
+    vm = VectorMemory()
+    vm._ensure_initialized()
+
+    results = vm.query_memory("query", with_scores=True)
+    assert results == [("close", 1.0), ("far", 0.25)]
+
 @pytest.mark.asyncio
 async def test_conversation_memory_save_load():
     # Mock file operations to avoid real I/O
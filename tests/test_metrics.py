@@ -3,7 +3,7 @@ import threading
 from unittest.mock import MagicMock, patch
 
 import pytest
-from jarvis_metrics import MetricsCollector
+from jarvis_metrics import MetricsCollector, PerfStats
 
 @pytest.fixture
 def collector():
@@ -57,3 +57,34 @@ def test_stop(collector):
     collector.stop()
     assert collector.running is False
     assert collector.stop_event.is_set()
+
+
+def test_counters_and_hit_rate():
+    stats = PerfStats()
+    assert stats.hit_rate("cache.hit", "cache.miss") == 0.0
+    stats.incr("cache.hit", 3)
+    stats.incr("cache.miss")
+    assert stats.count("cache.hit") == 3
+    assert stats.hit_rate("cache.hit", "cache.miss") == 0.75
+
+
+def test_percentiles_bounded_window():
+    stats = PerfStats(max_samples=100)
+    for i in range(1, 201):
+        stats.observe("latency", float(i))
+    pct = stats.percentiles("latency")
+    # Only the last 100 samples (101..200) are kept
+    assert pct["p50"] == 150.0
+    assert pct["p99"] == 199.0
+    assert stats.percentiles("missing") == {}
+
+
+def test_snapshot_and_reset():
+    stats = PerfStats()
+    stats.incr("a")
+    stats.observe("t", 0.5)
+    snap = stats.snapshot()
+    assert snap["counters"] == {"a": 1}
+    assert snap["timings"]["t"]["p50"] == 0.5
+    stats.reset()
+    assert stats.snapshot() == {"counters": {}, "timings": {}}
@@ -0,0 +1,70 @@
+from jarvis_page_cache import PageCache
+
+
+def make_cache(tmp_path, **kwargs):
+    return PageCache(str(tmp_path / "pages.sqlite3"), **kwargs)
+
+
+def test_put_and_get_round_trip_with_validators(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put("http://a.test", "Some text", 4000, etag='"abc"', last_modified="Tue, 01 Sep 2026")
+    entry = cache.get("http://a.test", 4000)
+    assert entry["text"] == "Some text"
+    assert cache.is_fresh(entry)
+    assert cache.conditional_headers(entry) == {
+        "If-None-Match": '"abc"', "If-Modified-Since": "Tue, 01 Sep 2026"}
+    assert cache.get("http://b.test", 4000) is None
+    cache.close()
+
+
+def test_entry_persists_across_instances(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put("http://a.test", "Persisted", 4000)
+    cache.close()
+    reopened = make_cache(tmp_path)
+    assert reopened.get("http://a.test", 4000)["text"] == "Persisted"
+    assert reopened.total_bytes == len("Persisted")
+    reopened.close()
+
+
+def test_truncated_entry_does_not_serve_larger_request(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put("http://cut.test", "x" * 100, 100)
+    cache.put("http://short.test", "short page", 100)
+    assert cache.get("http://cut.test", 50)["text"] == "x" * 50
+    assert cache.get("http://cut.test", 1000) is None
+    # The whole page fit under the old cap, so it is complete
+    assert cache.get("http://short.test", 1000)["text"] == "short page"
+    cache.close()
+
+
+def test_evicts_least_recently_used_pages_over_size_cap(tmp_path):
+    cache = make_cache(tmp_path, max_bytes=250)
+    cache.put("http://1.test", "a" * 100, 4000)
+    cache.put("http://2.test", "b" * 100, 4000)
+    cache.get("http://1.test", 4000)  # 1 is now more recently used than 2
+    cache.put("http://3.test", "c" * 100, 4000)
+    assert cache.get("http://2.test", 4000) is None
+    assert cache.get("http://1.test", 4000) is not None
+    assert cache.get("http://3.test", 4000) is not None
+    assert cache.total_bytes == 200
+    cache.close()
+
+
+def test_touch_refreshes_fetch_time(tmp_path):
+    cache = make_cache(tmp_path, fresh_ttl=60)
+    cache.put("http://a.test", "text", 4000)
+    cache._db().execute("UPDATE pages SET fetched_at = 0")
+    assert not cache.is_fresh(cache.get("http://a.test", 4000))
+    cache.touch("http://a.test")
+    assert cache.is_fresh(cache.get("http://a.test", 4000))
+    cache.close()
+
+
+def test_links_are_stored_only_when_collected(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put("http://a.test", "text", 4000)
+    cache.put("http://b.test", "text", 4000, links=[("http://c.test", "C page")])
+    assert cache.get("http://a.test", 4000)["links"] is None
+    assert cache.get("http://b.test", 4000)["links"] == [("http://c.test", "C page")]
+    cache.close()
@@ -0,0 +1,69 @@
+from jarvis_context_budget import estimate_tokens
+from jarvis_passages import (
+    BM25, build_research_context, chunk_text, estimated_similarity, minhash_signature,
+    rank_passages, select_passages, tokenize)
+
+FILLER = "General site text about many unrelated things and other topics."
+
+
+def test_chunk_text_groups_lines_and_splits_long_ones():
+    text = "\n".join(["Short line one.", "Short line two."] + ["Sentence number %d here." % i
+                                                             for i in range(100)])
+    long_line = " ".join(["word"] * 400)
+    chunks = chunk_text(text + "\n" + long_line, max_chars=200)
+    assert chunks[0].startswith("Short line one.\nShort line two.")
+    assert all(len(chunk) <= 200 for chunk in chunks)
+    assert sum(chunk.count("word") for chunk in chunks) == 400
+
+
+def test_bm25_prefers_passages_with_rare_query_terms():
+    docs = [tokenize("the cricket match in lahore was exciting"),
+            tokenize("the weather in lahore is hot"),
+            tokenize("stock markets fell sharply")]
+    scores = BM25(docs).scores(tokenize("lahore cricket"))
+    assert scores[0] > scores[1] > scores[2] == 0.0
+
+
+def test_minhash_estimates_shingle_overlap():
+    base = tokenize(" ".join(f"token{i}" for i in range(100)))
+    near = base[:95] + ["other"] * 5
+    unrelated = tokenize(" ".join(f"other{i}" for i in range(100)))
+    assert estimated_similarity(minhash_signature(base), minhash_signature(near)) > 0.8
+    assert estimated_similarity(minhash_signature(base), minhash_signature(unrelated)) < 0.1
+
+
+def test_rank_drops_near_duplicates_across_sources():
+    article = ("Solar panel output in Pakistan grew by forty percent last year as net "
+               "metering rules changed and import duties on panels were reduced.")
+    sources = [("http://a.test", f"{FILLER}\n\n{article}"),
+               ("http://b.test", f"{article} Reported by agency.")]
+    ranked = rank_passages("solar panels pakistan", sources, max_chars=150)
+    texts = [p["text"] for p in ranked]
+    assert sum("Solar panel output" in t for t in texts) == 1
+    assert "Solar panel output" in ranked[0]["text"]
+
+
+def test_select_passages_fits_budget_with_headers():
+    sources = [(f"http://{i}.test", "\n".join(
+        f"Paragraph {j} of page {i} discusses electric cars and battery prices {i * 100 + j}."
+        for j in range(40))) for i in range(3)]
+    selected = select_passages("electric car battery prices", sources, max_tokens=200)
+    assert selected
+    total = sum(estimate_tokens(p["text"]) for p in selected) + sum(
+        estimate_tokens(f"--- SOURCE {i + 1}: http://{i}.test ---")
+        for i in {p["source"] for p in selected})
+    assert total <= 200
+
+
+def test_build_context_groups_passages_by_source_in_page_order():
+    intro = "Karachi is a large coastal city. " + " ".join(f"Fact {i}." for i in range(120))
+    detail = "Karachi rainfall record broken as rainfall totals doubled. " * 8
+    unrelated = " ".join(f"Item {i} about shipping." for i in range(120))
+    sources = [("http://a.test", f"{intro}\n{detail}"),
+               ("http://b.test", f"{unrelated}\nRainfall in Karachi reached a record level.")]
+    context = build_research_context("karachi rainfall", sources, max_tokens=600)
+    assert context.startswith("--- SOURCE 1: http://a.test ---\nKarachi is a large coastal city.")
+    assert context.index("Karachi is a large") < context.index("Karachi rainfall record")
+    assert "--- SOURCE 2: http://b.test ---" in context
+    assert "Item 0 about shipping" not in context
+    assert estimate_tokens(context) <= 600
@@ -0,0 +1,20 @@
+import os
+import pytest
+from jarvis_doc_index import DocumentIndex
+from jarvis_rag import DocumentRAG
+
+
+@pytest.mark.asyncio
+async def test_find_document_uses_persistent_index(tmp_path):
+    docs = tmp_path / "docs"
+    (docs / "work").mkdir(parents=True)
+    (docs / "work" / "Annual Budget 2026.pdf").write_bytes(b"%PDF")
+    (docs / "work" / "holiday.docx").write_bytes(b"PK")
+    index = DocumentIndex(str(tmp_path / "index.sqlite3"))
+    rag = DocumentRAG([str(docs)], index=index)
+
+    found = await rag.find_document("annual budget")
+    assert found == os.path.join(str(docs), "work", "Annual Budget 2026.pdf")
+    assert await rag.find_document("zzzz qqqq") is None
+    assert index.last_scanned(str(docs)) is not None
+    index.close()
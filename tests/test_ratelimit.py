@@ -0,0 +1,124 @@
+import pytest
+import asyncio
+from unittest.mock import AsyncMock, patch
+from jarvis_metrics import perf_stats
+from jarvis_ratelimit import RateLimitError, RateLimiterRegistry, SingleFlight, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_burst_and_refill():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, capacity=3, clock=clock)
+    assert [bucket.try_acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.try_acquire() == pytest.approx(0.5)
+    clock.now += 0.5
+    assert bucket.try_acquire() == 0.0
+    clock.now += 100
+    assert [bucket.try_acquire() for _ in range(4)][-1] > 0  # capped at capacity
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_waits_then_gives_up():
+    bucket = TokenBucket(rate=50.0, capacity=1)
+    assert await bucket.acquire() == 0.0
+    assert await bucket.acquire(max_wait=1.0) > 0
+    with pytest.raises(RateLimitError):
+        await bucket.acquire(max_wait=0.001)
+
+
+@pytest.mark.asyncio
+async def test_single_flight_coalesces_concurrent_calls():
+    flights = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    results = await asyncio.gather(*(flights.do("k", fetch) for _ in range(5)))
+    assert calls == [1]
+    assert [r for r, _ in results] == ["result"] * 5
+    assert [shared for _, shared in results].count(False) == 1
+    assert not flights.in_flight("k")
+
+    # A finished flight is not reused
+    await flights.do("k", fetch)
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_single_flight_cancels_only_when_all_waiters_leave():
+    flights = SingleFlight()
+    started = asyncio.Event()
+    cancelled = []
+
+    async def slow():
+        started.set()
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    first = asyncio.create_task(flights.do("k", slow))
+    second = asyncio.create_task(flights.do("k", slow))
+    await started.wait()
+    first.cancel()
+    await asyncio.sleep(0.01)
+    assert not cancelled
+    second.cancel()
+    await asyncio.sleep(0.01)
+    assert cancelled == [True]
+
+
+@pytest.mark.asyncio
+async def test_registry_run_counts_coalesced_and_rejected():
+    perf_stats.reset()
+    registry = RateLimiterRegistry(max_wait=0.0)
+    fetch = AsyncMock(return_value="ok")
+
+    async def slow_fetch():
+        await asyncio.sleep(0.02)
+        return await fetch()
+
+    with patch.dict("jarvis_ratelimit.PROVIDER_RATES", {"svc": (0.001, 1)}):
+        results = await asyncio.gather(registry.run("svc", "q", slow_fetch),
+                                       registry.run("svc", "q", slow_fetch))
+        assert results == ["ok", "ok"]
+        fetch.assert_awaited_once()
+        with pytest.raises(RateLimitError):
+            await registry.run("svc", None, fetch)
+
+    stats = registry.stats()["svc"]
+    assert stats["coalesced"] == 1
+    assert stats["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicate_searches_send_one_request(tmp_path):
+    from jarvis_search import search_internet
+    from jarvis_search_cache import SearchCache
+    cache = SearchCache(str(tmp_path / "cache.sqlite3"))
+
+    async def ddg(query):
+        await asyncio.sleep(0.05)
+        return {"status": "success", "message": "DDG"}
+
+    mock_ddg = AsyncMock(side_effect=ddg)
+    with patch("jarvis_search.search_cache", cache), \
+            patch("jarvis_search.TAVILY_API_KEY", None), \
+            patch("jarvis_search.GOOGLE_SEARCH_API_KEY", None), \
+            patch("jarvis_search.search_duckduckgo", mock_ddg):
+        results = await asyncio.gather(search_internet("Weather Lahore"),
+                                       search_internet("weather lahore?"))
+    assert [r["message"] for r in results] == ["DDG", "DDG"]
+    mock_ddg.assert_awaited_once()
+    cache.close()
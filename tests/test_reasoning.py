@@ -80,3 +80,47 @@ async def test_process_with_advanced_reasoning_async():
     assert result["is_agentic"] is True
     assert "generated_response" in result
     assert "plan" in result
+
+
+def test_detect_wake_words():
+    from jarvis_reasoning import detect_wake_words
+    assert detect_wake_words("hey jarvis weather batao") == (True, False)
+    assert detect_wake_words("babu kaise ho") == (False, True)
+    assert detect_wake_words("jarvisx annabel") == (False, False)
+
+
+def test_intent_scan_reused_for_same_text():
+    analyzer = IntentAnalyzer()
+    text = "jarvis mausam kaisa hai"
+    first = analyzer.scan(text)
+    assert analyzer.scan(text) is first
+    assert "wake_jarvis" in first
+    assert analyzer.analyze_intent(text)["primary_intent"] == "weather_query"
+
+
+@pytest.mark.asyncio
+async def test_reasoning_runs_each_analysis_once_per_turn():
+    from jarvis_reasoning import reasoning_cache, intent_analyzer, context_analyzer
+    reasoning_cache.clear()
+    text = "research robots aur report bana do jaldi"
+    history = [{"role": "user", "content": "hello"}]
+    with patch.object(intent_analyzer, "analyze_intent", wraps=intent_analyzer.analyze_intent) as intent_spy, \
+            patch.object(context_analyzer, "analyze_context", wraps=context_analyzer.analyze_context) as context_spy:
+        await analyze_user_intent(text)
+        result = await process_with_advanced_reasoning(text, history)
+        await generate_smart_response(text, result["intent_analysis"], history)
+        assert intent_spy.call_count == 1
+        assert context_spy.call_count == 1
+    assert result["context_analysis"]["urgency_level"] == "high"
+
+
+def test_reasoning_cache_is_lru():
+    from jarvis_reasoning import ReasoningCache
+    cache = ReasoningCache(max_size=2)
+    first = cache.get("one")
+    cache.get("two")
+    assert cache.get("one") is first
+    cache.get("three")  # evicts "two", the least recently used
+    assert cache.get("one") is first
+    assert len(cache._items) == 2
+    assert "two" not in cache._items
@@ -0,0 +1,64 @@
+import json
+import pytest
+from jarvis_reasoning_eval import (
+    iter_batches, iter_json_array, iter_user_messages, run_evaluation
+)
+
+
+@pytest.fixture
+def store(tmp_path):
+    conversations = [
+        {"messages": [{"role": "user", "content": "jarvis aaj mausam kaisa hai"}]},
+        {"messages": [{"role": "assistant", "content": "Lahore mein 30 degree hai"}]},
+        {"messages": [{"role": "user", "content": "research karke report banao"}]},
+        {"messages": [{"role": "user", "content": "main naraz hoon"}]},
+        {"messages": [{"role": "user", "content": "   "}]},
+    ]
+    path = tmp_path / "User_memory.json"
+    path.write_text(json.dumps(conversations, indent=2), encoding="utf-8")
+    return str(path)
+
+
+def test_iter_json_array_streams_small_chunks(tmp_path):
+    path = tmp_path / "data.json"
+    items = [{"a": i, "text": "x" * i} for i in range(50)] + [12345, "end"]
+    path.write_text(json.dumps(items), encoding="utf-8")
+    assert list(iter_json_array(str(path), chunk_size=7)) == items
+
+
+def test_iter_json_array_rejects_non_array(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text('{"a": 1}', encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(iter_json_array(str(path)))
+
+
+def test_iter_user_messages_filters_role(store):
+    messages = list(iter_user_messages([store]))
+    assert messages == [
+        ("jarvis aaj mausam kaisa hai", False),
+        ("research karke report banao", True),
+        ("main naraz hoon", True),
+    ]
+
+
+def test_iter_batches():
+    assert list(iter_batches(iter(range(5)), 2)) == [[0, 1], [2, 3], [4]]
+
+
+def test_run_evaluation_report(store):
+    report = run_evaluation([store], workers=0, batch_size=2)
+    assert report["utterances"] == 3
+    assert report["batches"] == 2
+    assert report["primary_intents"]["weather_query"]["count"] == 1
+    assert report["primary_intents"]["complex_workflow"]["count"] == 1
+    assert report["moods"]["upset"] == 1
+    assert report["agentic_plans"] == 1
+    assert set(report["timing_us"]) >= {"p50", "p90", "p99"}
+
+
+def test_run_evaluation_process_pool_matches_inline(store):
+    inline = run_evaluation([store], workers=0, batch_size=1)
+    pooled = run_evaluation([store], workers=2, batch_size=1)
+    assert pooled["primary_intents"] == inline["primary_intents"]
+    assert pooled["moods"] == inline["moods"]
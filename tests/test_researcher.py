@@ -0,0 +1,249 @@
+import asyncio
+import time
+import pytest
+import httpx
+from unittest.mock import patch
+from jarvis_crawler import CrawlScheduler
+from jarvis_http import SharedHTTPClient
+from jarvis_page_cache import PageCache
+from jarvis_researcher import perform_web_research, run_web_research, scrape_url, stream_web_research
+
+
+def make_client(handler):
+    return SharedHTTPClient(transport=httpx.MockTransport(handler), http2=False)
+
+
+@pytest.fixture(autouse=True)
+def fast_crawl_scheduler():
+    with patch("jarvis_researcher.crawl_scheduler", CrawlScheduler(host_delay=0)) as scheduler:
+        yield scheduler
+
+
+@pytest.fixture(autouse=True)
+def isolated_page_cache(tmp_path):
+    cache = PageCache(str(tmp_path / "page_cache.sqlite3"))
+    with patch("jarvis_researcher.page_cache", cache):
+        yield cache
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_scrape_stops_reading_once_enough_text():
+    chunks_sent = []
+
+    async def body():
+        yield b"<html><body>"
+        for i in range(1000):
+            chunks_sent.append(i)
+            yield f"<p>Paragraph {i} with some filler text.</p>".encode()
+
+    shared = make_client(lambda request: httpx.Response(
+        200, headers={"content-type": "text/html; charset=utf-8"}, content=body()))
+    with patch("jarvis_researcher.http_client", shared):
+        text = await scrape_url("http://example.test/big", max_chars=200, backend="stream")
+    await shared.aclose()
+    assert text.startswith("Paragraph 0 with some filler text.")
+    assert len(text) <= 200
+    assert len(chunks_sent) < 20
+
+
+@pytest.mark.asyncio
+async def test_scrape_respects_byte_cap_and_charset():
+    page = ("<p>" + "é" * 50 + "</p>").encode("latin-1") + b"<p>" + b"x" * 5000 + b"</p>"
+    shared = make_client(lambda request: httpx.Response(
+        200, headers={"content-type": "text/html; charset=iso-8859-1"}, content=page))
+    with patch("jarvis_researcher.http_client", shared):
+        text = await scrape_url("http://example.test/latin", max_bytes=100, max_chars=10000,
+                               backend="stream")
+    await shared.aclose()
+    assert text.startswith("é" * 50)
+    assert len(text) < 100
+
+
+@pytest.mark.asyncio
+async def test_scrape_skips_binary_and_reports_errors_as_empty():
+    def handler(request):
+        if request.url.path == "/file.pdf":
+            return httpx.Response(200, headers={"content-type": "application/pdf"}, content=b"%PDF")
+        return httpx.Response(404)
+
+    shared = make_client(handler)
+    with patch("jarvis_researcher.http_client", shared), \
+            patch("jarvis_researcher.asyncio.sleep"):
+        assert await scrape_url("http://example.test/file.pdf") == ""
+        assert await scrape_url("http://example.test/missing") == ""
+    await shared.aclose()
+
+
+@pytest.mark.parametrize("backend", ["html.parser", "lxml"])
+@pytest.mark.asyncio
+async def test_scrape_with_dom_backend_caps_bytes(backend):
+    page = b"<html><body><nav>Menu</nav><p>" + b"word " * 2000 + b"</p></body></html>"
+    shared = make_client(lambda request: httpx.Response(
+        200, headers={"content-type": "text/html"}, content=page))
+    with patch("jarvis_researcher.http_client", shared), \
+            patch("jarvis_html_extract.EXTRACT_WORKERS", 0):
+        text = await scrape_url("http://example.test/page", max_bytes=500, backend=backend)
+    await shared.aclose()
+    assert text.startswith("word word")
+    assert "Menu" not in text
+    assert len(text) < 500
+
+
+@pytest.mark.asyncio
+async def test_scrape_reuses_fresh_cached_page(isolated_page_cache):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, headers={"content-type": "text/html"},
+                              content=b"<p>Cached body</p>")
+
+    shared = make_client(handler)
+    with patch("jarvis_researcher.http_client", shared):
+        first = await scrape_url("http://example.test/page", backend="stream")
+        second = await scrape_url("http://example.test/page", backend="stream")
+    await shared.aclose()
+    assert first == second == "Cached body"
+    assert len(requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_scrape_revalidates_stale_page_with_conditional_get(isolated_page_cache):
+    isolated_page_cache.fresh_ttl = 0
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, headers={"content-type": "text/html", "etag": '"v1"',
+                                            "last-modified": "Mon, 05 Oct 2026 10:00:00 GMT"},
+                              content=b"<p>Original body</p>")
+
+    shared = make_client(handler)
+    with patch("jarvis_researcher.http_client", shared):
+        assert await scrape_url("http://example.test/page", backend="stream") == "Original body"
+        assert await scrape_url("http://example.test/page", backend="stream") == "Original body"
+    await shared.aclose()
+    assert len(requests) == 2
+    assert requests[1].headers["if-modified-since"] == "Mon, 05 Oct 2026 10:00:00 GMT"
+
+
+@pytest.mark.asyncio
+async def test_scrape_serves_stale_page_when_fetch_fails(isolated_page_cache):
+    isolated_page_cache.put("http://example.test/page", "Old body", 4000)
+    isolated_page_cache.fresh_ttl = 0
+    shared = make_client(lambda request: httpx.Response(503))
+    with patch("jarvis_researcher.http_client", shared), \
+            patch("jarvis_researcher.asyncio.sleep"):
+        assert await scrape_url("http://example.test/page") == "Old body"
+    await shared.aclose()
+
+
+@pytest.mark.asyncio
+async def test_research_sends_ranked_passages_instead_of_page_prefixes():
+    intro = "".join(f"<p>Menu entry {i} and intro text for section {i}.</p>" for i in range(300))
+    answer = "<p>" + "Quantum chips need cooling close to absolute zero. " * 10 + "</p>"
+    pages = {"/a": intro + answer, "/b": answer + "<p>Short footer.</p>"}
+
+    def handler(request):
+        return httpx.Response(200, headers={"content-type": "text/html"},
+                              content=pages[request.url.path].encode())
+
+    shared = make_client(handler)
+    with patch("jarvis_researcher.http_client", shared), \
+            patch("jarvis_html_extract.EXTRACT_WORKERS", 0), \
+            patch("jarvis_researcher.get_search_urls",
+                  return_value=["http://example.test/a", "http://example.test/b"]):
+        result = await perform_web_research("quantum chips cooling")
+    await shared.aclose()
+    # The answer sits past the old 4000-character cut, and is sent once, not per source
+    assert result.count("Quantum chips need cooling") == 10
+    assert "Menu entry 299" not in result
+    assert len(result) < 8000
+
+
+@pytest.mark.asyncio
+async def test_research_returns_arrived_sources_at_deadline():
+    async def handler(request):
+        if request.url.path == "/slow":
+            await asyncio.sleep(10)
+        return httpx.Response(200, headers={"content-type": "text/html"},
+                              content=f"<p>Content from {request.url.path}</p>".encode())
+
+    updates = []
+
+    async def on_progress(update):
+        updates.append(update)
+
+    shared = make_client(handler)
+    with patch("jarvis_researcher.http_client", shared), \
+            patch("jarvis_html_extract.EXTRACT_WORKERS", 0), \
+            patch("jarvis_researcher.get_search_urls",
+                  return_value=["http://example.test/slow", "http://example.test/fast"]):
+        start = time.perf_counter()
+        result = await run_web_research("content", deadline=0.5, on_progress=on_progress)
+        elapsed = time.perf_counter() - start
+    await shared.aclose()
+    assert elapsed < 2
+    assert "Content from /fast" in result
+    assert "/slow" not in result
+    assert [(u["url"], u["found"], u["total"]) for u in updates] == [
+        ("http://example.test/fast", 1, 2)]
+    assert "Content from /fast" in updates[0]["preview"]
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_sources_in_completion_order():
+    async def fake_scrape(url, **_):
+        await asyncio.sleep({"a": 0.05, "b": 0.0, "c": 0.02}[url])
+        return {"text": f"text {url}", "links": []}
+
+    with patch("jarvis_researcher.scrape_page", fake_scrape):
+        updates = [u async for u in stream_web_research(["a", "b", "c"], deadline=5)]
+    assert [u["url"] for u in updates] == ["b", "c", "a"]
+    assert [u["completed"] for u in updates] == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_progress_callback_errors_do_not_break_research():
+    async def broken(_update):
+        raise RuntimeError("ui gone")
+
+    async def fake_scrape(url, **_):
+        return {"text": "Useful research text.", "links": []}
+
+    with patch("jarvis_researcher.scrape_page", fake_scrape), \
+            patch("jarvis_researcher.get_search_urls", return_value=["http://a.test"]):
+        result = await run_web_research("research", on_progress=broken)
+    assert "Useful research text." in result
+
+
+@pytest.mark.asyncio
+async def test_multi_hop_research_follows_relevant_links():
+    pages = {
+        "/start": "<p>Overview of fusion.</p><nav><a href='/menu-fusion'>Fusion menu</a></nav>"
+                  "<p><a href='/fusion-reactor-design'>Fusion reactor design</a> "
+                  "<a href='/about'>About us</a></p>",
+        "/fusion-reactor-design": "<p>Tokamak magnets confine the fusion plasma.</p>",
+        "/about": "<p>We are a magazine.</p>",
+        "/menu-fusion": "<p>Menu page.</p>",
+    }
+    fetched = []
+
+    def handler(request):
+        fetched.append(request.url.path)
+        return httpx.Response(200, headers={"content-type": "text/html"},
+                              content=pages[request.url.path].encode())
+
+    shared = make_client(handler)
+    with patch("jarvis_researcher.http_client", shared), \
+            patch("jarvis_html_extract.EXTRACT_WORKERS", 0), \
+            patch("jarvis_researcher.get_search_urls", return_value=["http://example.test/start"]):
+        shallow = await run_web_research("fusion reactor", depth=0)
+        deep = await run_web_research("fusion reactor", depth=1)
+    await shared.aclose()
+    assert "Tokamak" not in shallow
+    assert "Tokamak magnets confine the fusion plasma." in deep
+    assert "/about" not in fetched and "/menu-fusion" not in fetched
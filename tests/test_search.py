@@ -2,6 +2,21 @@ import pytest
 import asyncio
 from unittest.mock import AsyncMock, patch, MagicMock
 from jarvis_search import get_current_city, search_tavily, search_google, search_duckduckgo, get_formatted_datetime, search_internet
+from jarvis_search_cache import SearchCache
+from jarvis_circuit import OPEN, circuit_breakers
+from jarvis_location import LocationCache
+
+
+@pytest.fixture(autouse=True)
+def isolated_search_cache(tmp_path):
+    cache = SearchCache(str(tmp_path / "search_cache.sqlite3"))
+    circuit_breakers.reset()
+    with patch("jarvis_search.search_cache", cache), \
+            patch("jarvis_search.location_cache", LocationCache(str(tmp_path / "location.json"))):
+        yield cache
+    cache.close()
+    circuit_breakers.reset()
+
 
 @pytest.mark.asyncio
 async def test_get_current_city_env():
@@ -14,7 +29,7 @@ async def test_get_current_city_api():
     mock_response = MagicMock()
     mock_response.json.return_value = {"city": "DetectionCity"}
     with patch("os.getenv", return_value=None):
-        with patch("requests.get", return_value=mock_response):
+        with patch("jarvis_search.http_client.get", new_callable=AsyncMock, return_value=mock_response):
             city = await get_current_city()
             assert city == "DetectionCity"
 
@@ -24,7 +39,7 @@ async def test_get_current_city_fallback():
     def mock_getenv(key, default=None):
         return default
     with patch("os.getenv", side_effect=mock_getenv):
-        with patch("requests.get", side_effect=ValueError("API Error")):
+        with patch("jarvis_search.http_client.get", new_callable=AsyncMock, side_effect=ValueError("API Error")):
             city = await get_current_city()
             assert city == "Lahore"
 
@@ -37,7 +52,7 @@ async def test_search_tavily_success():
     mock_response.raise_for_status = MagicMock()
     
     with patch("jarvis_search.TAVILY_API_KEY", "test_key"):
-        with patch("requests.post", return_value=mock_response):
+        with patch("jarvis_search.http_client.post", new_callable=AsyncMock, return_value=mock_response):
             result = await search_tavily("test query")
             assert result["status"] == "success"
             assert "T1" in result["message"]
@@ -52,7 +67,7 @@ async def test_search_google_success():
     
     with patch("jarvis_search.GOOGLE_SEARCH_API_KEY", "test_key"):
         with patch("jarvis_search.SEARCH_ENGINE_ID", "test_id"):
-            with patch("requests.get", return_value=mock_response):
+            with patch("jarvis_search.http_client.get", new_callable=AsyncMock, return_value=mock_response):
                 result = await search_google("test query")
                 assert result["status"] == "success"
                 assert "G1" in result["message"]
@@ -85,3 +100,84 @@ async def test_get_formatted_datetime():
     assert "day" in result
     assert "date" in result
     assert "time" in result
+
+
+def stub_provider(result, delay, calls, name):
+    async def provider(query):
+        calls.append(name)
+        await asyncio.sleep(delay)
+        return result
+    return provider
+
+
+@pytest.mark.asyncio
+async def test_hedged_search_fast_primary_wins():
+    from jarvis_search import hedged_search
+    calls = []
+    providers = [
+        ("tavily", stub_provider({"status": "success", "message": "T"}, 0.01, calls, "tavily")),
+        ("google", stub_provider({"status": "success", "message": "G"}, 0.01, calls, "google")),
+    ]
+    result = await hedged_search("q", providers, hedge_delay=0.2)
+    assert result["message"] == "T"
+    assert calls == ["tavily"]
+
+
+@pytest.mark.asyncio
+async def test_hedged_search_slow_primary_is_hedged_and_cancelled():
+    from jarvis_search import hedged_search
+    from jarvis_metrics import perf_stats
+    perf_stats.reset()
+    calls = []
+    slow = stub_provider({"status": "success", "message": "T"}, 5, calls, "tavily")
+    fast = stub_provider({"status": "success", "message": "G"}, 0.01, calls, "google")
+    start = asyncio.get_running_loop().time()
+    result = await hedged_search("q", [("tavily", slow), ("google", fast)], hedge_delay=0.05)
+    assert result["message"] == "G"
+    assert asyncio.get_running_loop().time() - start < 1
+    assert perf_stats.count("search.hedge_fired") == 1
+    assert perf_stats.count("search.cancelled") == 1
+    assert perf_stats.count("search.win.google") == 1
+
+
+@pytest.mark.asyncio
+async def test_hedged_search_failure_starts_next_immediately():
+    from jarvis_search import hedged_search, search_stats
+    from jarvis_metrics import perf_stats
+    perf_stats.reset()
+    calls = []
+    providers = [
+        ("tavily", stub_provider({"status": "error", "message": "down"}, 0, calls, "tavily")),
+        ("google", stub_provider({"status": "not_found"}, 0, calls, "google")),
+        ("duckduckgo", stub_provider({"status": "success", "message": "D"}, 0, calls, "duckduckgo")),
+    ]
+    result = await hedged_search("q", providers, hedge_delay=10)
+    assert result["message"] == "D"
+    assert calls == ["tavily", "google", "duckduckgo"]
+    stats = search_stats()
+    assert stats["wins"]["duckduckgo"] == 1
+    assert stats["win_rate"]["duckduckgo"] == 1.0
+    assert "p50" in stats["latency_s"]
+
+
+@pytest.mark.asyncio
+async def test_hedged_search_all_fail_returns_last_error():
+    from jarvis_search import hedged_search
+    calls = []
+    providers = [("duckduckgo", stub_provider({"status": "error", "message": "nope"}, 0, calls, "d"))]
+    result = await hedged_search("q", providers)
+    assert result == {"status": "error", "message": "nope"}
+
+
+@pytest.mark.asyncio
+async def test_search_skips_provider_with_open_circuit():
+    tavily = AsyncMock(return_value={"status": "error", "message": "429 Too Many Requests"})
+    ddg = AsyncMock(return_value={"status": "success", "message": "DDG"})
+    with patch("jarvis_search.TAVILY_API_KEY", "key"), \
+            patch("jarvis_search.GOOGLE_SEARCH_API_KEY", None), \
+            patch("jarvis_search.search_tavily", tavily), \
+            patch("jarvis_search.search_duckduckgo", ddg):
+        assert (await search_internet("first query"))["message"] == "DDG"
+        assert circuit_breakers.get("tavily").state == OPEN
+        assert (await search_internet("second query"))["message"] == "DDG"
+    tavily.assert_awaited_once()
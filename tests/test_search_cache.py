@@ -0,0 +1,89 @@
+import pytest
+import asyncio
+from unittest.mock import AsyncMock, patch
+from jarvis_metrics import perf_stats
+from jarvis_search_cache import SearchCache, normalize_query, search_cache_stats
+
+
+@pytest.fixture
+def cache(tmp_path):
+    perf_stats.reset()
+    c = SearchCache(str(tmp_path / "cache.sqlite3"), memory_size=2)
+    yield c
+    c.close()
+
+
+def test_normalize_query():
+    assert normalize_query("  Weather   LAHORE? ") == "weather lahore"
+    assert normalize_query("Jarvis, zara weather batao Lahore ka") == "weather lahore"
+    assert normalize_query("the") == "the"
+
+
+@pytest.mark.asyncio
+async def test_miss_then_hit_with_normalized_key(cache):
+    fetch = AsyncMock(return_value={"status": "success", "message": "30C"})
+    first = await cache.cached("search", "Weather Lahore", fetch)
+    second = await cache.cached("search", "weather   lahore!", fetch)
+    assert first == second
+    fetch.assert_awaited_once()
+    stats = search_cache_stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_failed_results_are_not_cached(cache):
+    fetch = AsyncMock(return_value={"status": "error"})
+    await cache.cached("search", "q", fetch, should_cache=lambda r: r["status"] == "success")
+    await cache.cached("search", "q", fetch, should_cache=lambda r: r["status"] == "success")
+    assert fetch.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_entries_persist_on_disk(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    first = SearchCache(path)
+    await first.store("search_urls", "python asyncio", ["https://a", "https://b"])
+    first.close()
+
+    second = SearchCache(path)
+    age, value = await second.lookup("search_urls", "Python AsyncIO")
+    assert value == ["https://a", "https://b"]
+    assert age >= 0
+    second.close()
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_served_while_refreshing(cache):
+    await cache.store("search", "news", "old")
+    ident = ("search", "news")
+    stored_at, value = cache._memory[ident]
+    with patch.dict("jarvis_search_cache.SEARCH_CACHE_TTLS", {"search": (10, 100)}):
+        cache._memory[ident] = (stored_at - 50, value)
+        fetch = AsyncMock(return_value="new")
+        assert await cache.cached("search", "news", fetch) == "old"
+        await asyncio.sleep(0.05)
+        fetch.assert_awaited_once()
+        assert await cache.cached("search", "news", fetch) == "new"
+    assert perf_stats.count("search_cache.stale_hit") == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_entry_is_refetched(cache):
+    await cache.store("search", "news", "old")
+    ident = ("search", "news")
+    stored_at, value = cache._memory[ident]
+    with patch.dict("jarvis_search_cache.SEARCH_CACHE_TTLS", {"search": (10, 10)}):
+        cache._memory[ident] = (stored_at - 50, value)
+        fetch = AsyncMock(return_value="new")
+        assert await cache.cached("search", "news", fetch) == "new"
+
+
+@pytest.mark.asyncio
+async def test_memory_lru_is_bounded(cache):
+    for q in ("a1", "b2", "c3"):
+        await cache.store("search", q, q)
+    assert len(cache._memory) == 2
+    # Evicted entries still come back from disk
+    _, value = await cache.lookup("search", "a1")
+    assert value == "a1"
@@ -20,8 +20,9 @@ def mock_pg():
 
 
 @pytest.fixture
-def mock_requests():
-    with patch("jarvis_vision.requests") as mock:
+def mock_http():
+    with patch("jarvis_vision.http_client") as mock:
+        mock.post = AsyncMock()
         yield mock
 
 
@@ -51,7 +52,7 @@ async def test_analyze_via_google():
 
 
 @pytest.mark.asyncio
-async def test_analyze_via_openrouter(mock_requests):
+async def test_analyze_via_openrouter(mock_http):
     perceiver = ScreenPerceiver()
     with patch("os.getenv", return_value="fake_key"):
         mock_resp = MagicMock()
@@ -59,7 +60,7 @@ async def test_analyze_via_openrouter(mock_requests):
         mock_resp.json.return_value = {
             "choices": [{"message": {"content": "Fallback analysis"}}]
         }
-        mock_requests.post.return_value = mock_resp
+        mock_http.post.return_value = mock_resp
 
         mock_img = Image.new('RGB', (10, 10))
         res = await perceiver.analyze_via_openrouter("test prompt", mock_img)
@@ -96,3 +97,20 @@ async def test_analyze_screen_tool():
         res = await analyze_screen("What is this?")
         assert res['status'] == "success"
         assert "Everything looks good" in res['message']
+
+
+@pytest.mark.asyncio
+async def test_analyze_content_skips_gemini_while_circuit_open(mock_pg, mock_genai):
+    from jarvis_circuit import circuit_breakers
+    circuit_breakers.reset()
+    perceiver = ScreenPerceiver()
+    mock_pg.screenshot.return_value = Image.new('RGB', (10, 10))
+
+    with patch.object(ScreenPerceiver, 'analyze_via_google',
+                      side_effect=ValueError("429 RESOURCE_EXHAUSTED")) as m_google:
+        with patch.object(ScreenPerceiver, 'analyze_via_openrouter', new_callable=AsyncMock,
+                          return_value="Fallback result"):
+            assert await perceiver.analyze_content() == "Fallback result"
+            assert await perceiver.analyze_content() == "Fallback result"
+    assert m_google.call_count == 1
+    circuit_breakers.reset()
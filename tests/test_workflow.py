@@ -0,0 +1,112 @@
+import pytest
+import asyncio
+import json
+import time
+from jarvis_workflow import WorkflowError, WorkflowExecutor, execute_workflow, workflow_executor
+from jarvis_reasoning import WorkflowPlanner
+
+
+async def slow_echo(value, delay=0.1):
+    await asyncio.sleep(delay)
+    return value
+
+
+async def combine(parts):
+    return " + ".join(parts)
+
+
+async def fail():
+    raise RuntimeError("boom")
+
+
+@pytest.fixture
+def executor():
+    return WorkflowExecutor(actions={"echo": slow_echo, "combine": combine, "fail": fail},
+                            default_timeout=1.0)
+
+
+@pytest.mark.asyncio
+async def test_independent_steps_run_concurrently(executor):
+    steps = [
+        {"id": "a", "action": "echo", "args": {"value": "x", "delay": 0.2}},
+        {"id": "b", "action": "echo", "args": {"value": "y", "delay": 0.2}},
+        {"id": "c", "action": "echo", "args": {"value": "z", "delay": 0.2}},
+        {"id": "d", "action": "combine", "args": {"parts": ["$a", "$b", "$c"]},
+         "depends_on": ["a", "b", "c"]},
+    ]
+    start = time.perf_counter()
+    result = await executor.run(steps)
+    assert time.perf_counter() - start < 0.5
+    assert result["status"] == "success"
+    assert result["steps"]["d"]["output"] == "x + y + z"
+
+
+@pytest.mark.asyncio
+async def test_inline_reference_substitution(executor):
+    steps = [
+        {"id": "a", "action": "echo", "args": {"value": "Lahore", "delay": 0}},
+        {"id": "b", "action": "echo", "args": {"value": "Weather in ${a}", "delay": 0},
+         "depends_on": ["a"]},
+    ]
+    result = await executor.run(steps)
+    assert result["steps"]["b"]["output"] == "Weather in Lahore"
+
+
+@pytest.mark.asyncio
+async def test_timeout_and_failure_skip_dependents(executor):
+    steps = [
+        {"id": "slow", "action": "echo", "args": {"value": 1, "delay": 2}, "timeout": 0.05},
+        {"id": "bad", "action": "fail"},
+        {"id": "ok", "action": "echo", "args": {"value": "fine", "delay": 0}},
+        {"id": "after", "action": "combine", "args": {"parts": ["$slow"]}, "depends_on": ["slow"]},
+    ]
+    result = await executor.run(steps)
+    assert result["status"] == "partial_success"
+    assert result["steps"]["slow"]["error"] == "timeout"
+    assert result["steps"]["bad"]["error"] == "boom"
+    assert result["steps"]["ok"]["status"] == "success"
+    assert result["steps"]["after"]["status"] == "skipped"
+
+
+@pytest.mark.asyncio
+async def test_skips_reach_dependents_declared_before_failed_step(executor):
+    steps = [
+        {"id": "c", "action": "combine", "args": {"parts": ["$b"]}, "depends_on": ["b"]},
+        {"id": "b", "action": "combine", "args": {"parts": ["$a"]}, "depends_on": ["a"]},
+        {"id": "a", "action": "fail"},
+    ]
+    result = await executor.run(steps)
+    assert result["status"] == "error"
+    assert result["steps"]["a"]["error"] == "boom"
+    assert result["steps"]["b"]["status"] == "skipped"
+    assert result["steps"]["c"]["status"] == "skipped"
+
+
+@pytest.mark.parametrize("steps, message", [
+    ([], "no steps"),
+    ([{"id": "a", "action": "nope"}], "Unknown action"),
+    ([{"id": "a", "action": "fail", "depends_on": ["x"]}], "unknown step"),
+    ([{"id": "a", "action": "fail", "depends_on": ["b"]},
+      {"id": "b", "action": "fail", "depends_on": ["a"]}], "cycle"),
+])
+def test_validate_rejects_bad_workflows(executor, steps, message):
+    with pytest.raises(WorkflowError, match=message):
+        executor.validate(steps)
+
+
+@pytest.mark.asyncio
+async def test_execute_workflow_tool(monkeypatch):
+    monkeypatch.setattr(workflow_executor, "actions", {"echo": slow_echo})
+    result = await execute_workflow(json.dumps(
+        [{"id": "a", "action": "echo", "args": {"value": "hi", "delay": 0}}]))
+    assert result["steps"]["a"]["output"] == "hi"
+
+    result = await execute_workflow("not json")
+    assert result["status"] == "error"
+
+
+def test_planner_declares_dependencies():
+    plan = WorkflowPlanner().create_plan("complex_workflow", "research and email it")
+    assert [step["id"] for step in plan] == ["s1", "s2", "s3"]
+    assert plan[0]["depends_on"] == []
+    assert plan[2]["depends_on"] == ["s2"]